@@ -3,13 +3,14 @@ import shutil
 import sys
 import unittest
 import tempfile
+import time
 
 import numpy
 
 from mayavi import mlab
 from mayavi.core.engine import Engine
 from mayavi.core.off_screen_engine import OffScreenEngine
-from mayavi.tools.figure import savefig, screenshot
+from mayavi.tools.figure import Capture, savefig, screenshot
 
 from common import TestCase
 
@@ -101,6 +102,49 @@ class TestMlabSavefigUnitTest(unittest.TestCase):
             # Then
             self.assertEqual(data.shape, (sz[1], sz[0], 4))
 
+    def test_capture(self):
+        # Given
+        engine = Engine()
+        self.setup_engine_and_figure(engine)
+        create_quiver3d()
+        expected = screenshot(mode='rgb')
+
+        # When
+        capture = Capture(depth=True)
+        image, depth = capture()
+
+        # Then
+        numpy.testing.assert_array_equal(image, expected)
+        self.assertEqual(depth.shape, image.shape[:2])
+        self.assertTrue(depth.min() >= 0.0 and depth.max() <= 1.0)
+
+        # When
+        view = Capture(flip=False)()
+
+        # Then
+        numpy.testing.assert_array_equal(view[::-1], expected)
+
+    def test_benchmark_capture(self):
+        """Compare the captures per second of screenshot and Capture."""
+        engine = OffScreenEngine()
+        self.setup_engine_and_figure(engine)
+        self.figure.scene.set_size((640, 480))
+        create_quiver3d()
+        n = 100
+        print()
+        cases = [
+            ('screenshot', lambda: numpy.ascontiguousarray(screenshot())),
+            ('Capture', Capture()),
+            ('Capture(flip=False)', Capture(flip=False)),
+            ('Capture(depth=True)', Capture(depth=True)),
+        ]
+        for name, func in cases:
+            t1 = time.perf_counter()
+            for i in range(n):
+                func()
+            dt = time.perf_counter() - t1
+            print("%s: %.1f captures per second" % (name, n/dt))
+
 
 class TestMlabSavefig(TestCase):
 
@@ -0,0 +1,84 @@
+"""Test and benchmark recording movies with the MovieMaker."""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy
+
+from mayavi import mlab
+from mayavi.core.off_screen_engine import OffScreenEngine
+
+from common import TestCase
+
+
+class TestMovieMakerUnitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.engine = engine = OffScreenEngine()
+        engine.start()
+        self.addCleanup(engine.stop)
+        self.figure = mlab.figure(engine=engine, size=(640, 480))
+        self.addCleanup(mlab.close, self.figure)
+
+    def record(self, n_frames, **traits):
+        x, y = numpy.mgrid[-3:3:200j, -3:3:200j]
+        surf = mlab.surf(x, y, numpy.sin(x*y), figure=self.figure)
+        mm = self.figure.scene.movie_maker
+        mm.trait_set(directory=self.temp_dir, **traits)
+        t1 = time.perf_counter()
+        with mm.record_movie():
+            for i in range(n_frames):
+                surf.mlab_source.scalars = numpy.sin(x*y + 0.1*i)
+                mm.animation_step()
+        fps = (n_frames + 1)/(time.perf_counter() - t1)
+        mlab.clf(self.figure)
+        return mm, fps
+
+    def test_background_write(self):
+        mm, fps = self.record(5, background_write=True)
+        dir = os.path.join(self.temp_dir, mm._subdir)
+        self.assertEqual(len(os.listdir(dir)), 6)
+        self.assertIsNone(mm._writer)
+
+    def test_stream_to_file(self):
+        mm, fps = self.record(5, filename='movie.y4m')
+        fname = os.path.join(self.temp_dir, mm._subdir, 'movie.y4m')
+        with open(fname, 'rb') as f:
+            data = f.read()
+        self.assertEqual(data.count(b'FRAME\n'), 6)
+
+    def test_benchmark_fps(self):
+        print()
+        for filename in ('anim%05d.png', 'anim%05d.jpg'):
+            for background in (False, True):
+                mm, fps = self.record(50, filename=filename,
+                                      background_write=background)
+                print("%s background_write=%s: %.1f frames per second" %
+                      (filename[-3:], background, fps))
+        mm, fps = self.record(50, filename='movie.rgb')
+        print("rgb stream: %.1f frames per second" % fps)
+
+
+class TestMovieMaker(TestCase):
+
+    def test(self):
+        self.main()
+
+    def do(self):
+        suite = unittest.TestLoader().loadTestsFromTestCase(
+            TestMovieMakerUnitTest)
+
+        result = unittest.TextTestRunner().run(suite)
+
+        if result.errors or result.failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    t = TestMovieMaker()
+    t.test()
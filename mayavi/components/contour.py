@@ -5,15 +5,23 @@ minimum and maximum value or explicitly specify the contours.  This
 component may be used for any input data.  The component also provides
 a convenient option to create "filled contours".
 
+The contours of image data and unstructured grids are computed with the
+specialized, multi-threaded, VTK filters when these are available, see
+the `backend` trait.
+
 """
 # Author: Prabhu Ramachandran <prabhu@aero.iitb.ac.in>
 # Copyright (c) 2005-2020, Enthought, Inc.
 # License: BSD Style.
 
+# Standard library imports.
+import numpy as np
+
 # Enthought library imports.
 from traits.api import Instance, List, Tuple, Bool, Range, \
-                                 Float, Property
+                                 Float, Property, Enum, Int, Str, Dict
 from tvtk.api import tvtk
+from tvtk import vtk_module as vtk
 
 # Local imports.
 from mayavi.core.module_manager import DataSetHelper
@@ -21,6 +29,53 @@ from mayavi.core.component import Component
 from mayavi.core.common import error
 from mayavi.components.common \
      import get_module_source, convert_to_poly_data
+from mayavi.core.utils import get_new_output
+
+
+# The TVTK classes of the contour filters used by the backends.
+BACKEND_CLASSES = {'contour_filter': 'ContourFilter',
+                   'flying_edges_3d': 'FlyingEdges3D',
+                   'flying_edges_2d': 'FlyingEdges2D',
+                   'contour_grid': 'ContourGrid',
+                   'smp_contour_grid': 'SMPContourGrid'}
+
+
+def get_contour_backend(data, backend='auto'):
+    """Return the name of the backend to use to contour the given
+    dataset.  With the 'auto' `backend`, Flying Edges is used for image
+    data and `vtkContourGrid` for unstructured grids made of linear
+    cells.  The generic 'contour_filter' is used when the requested
+    backend is not available or cannot handle the data.
+    """
+    if backend == 'contour_filter':
+        return backend
+    if backend == 'slabs' and data.is_a('vtkImageData') and \
+            data.point_data.scalars is not None and \
+            min(data.dimensions) > 1:
+        return backend
+    if backend in ('auto', 'flying_edges') and data.is_a('vtkImageData') \
+            and data.point_data.scalars is not None:
+        dims = data.dimensions
+        if min(dims) > 1:
+            name = 'flying_edges_3d'
+        elif dims[2] == 1 and min(dims[:2]) > 1:
+            # vtkFlyingEdges2D only handles images in the XY plane.
+            name = 'flying_edges_2d'
+        else:
+            name = None
+        if name is not None and hasattr(tvtk, BACKEND_CLASSES[name]):
+            return name
+    if backend in ('auto', 'contour_grid', 'smp_contour_grid') and \
+            data.is_a('vtkUnstructuredGrid'):
+        name = 'contour_grid' if backend == 'auto' else backend
+        cell_types = data.cell_types_array
+        linear = cell_types is not None and all(
+            vtk.vtkCellTypes.IsLinear(int(t))
+            for t in np.unique(cell_types.to_array())
+        )
+        if linear and hasattr(tvtk, BACKEND_CLASSES[name]):
+            return name
+    return 'contour_filter'
 
 
 ######################################################################
@@ -92,6 +147,33 @@ class Contour(Component):
         desc='if the contour range is updated automatically'
     )
 
+    # The VTK filter used to compute the contours.  'auto' uses Flying
+    # Edges for image data and vtkContourGrid for unstructured grids,
+    # which produce the same output as the generic vtkContourFilter,
+    # faster.  'smp_contour_grid' uses the multi-threaded
+    # vtkSMPContourGrid for unstructured grids, which does not compute
+    # the normals nor interpolate the other point data arrays.  'slabs'
+    # splits 3D image data in slabs contoured by `n_workers` processes,
+    # which only pays off for very large volumes and does not
+    # interpolate the other point data arrays either.  Filled contours
+    # always use vtkBandedPolyDataContourFilter.
+    backend = Enum('auto', 'contour_filter', 'flying_edges',
+                   'contour_grid', 'smp_contour_grid', 'slabs',
+                   desc='the VTK filter used to compute the contours')
+
+    # The backend currently used, see `BACKEND_CLASSES`.
+    active_backend = Property(Str, depends_on='_active_backend')
+
+    # The number of threads used by the multi-threaded VTK filters, 0
+    # uses the default of VTK.  Note that this is a global setting
+    # which is only honored by the threaded SMP backends of VTK and may
+    # not be changed after the first use by some of them.
+    smp_threads = Int(0, desc='the number of threads used by VTK')
+
+    # The number of processes used by the 'slabs' backend, 0 uses one
+    # per CPU.
+    n_workers = Int(0, desc='the number of processes used for slabs')
+
     ########################################
     # The component's view is picked up from ui/contour.py
 
@@ -123,13 +205,20 @@ class Contour(Component):
     _fill_cont_filt = Instance(tvtk.BandedPolyDataContourFilter, args=(),
                                kw={'clipping': 1, 'scalar_mode': 'value'})
 
+    # The name of the backend used for the (unfilled) contours.
+    _active_backend = Str('contour_filter')
+
+    # The contour filters of the other backends, created when needed.
+    _backend_filters = Dict
+
     ######################################################################
     # `object` interface
     ######################################################################
     def __get_pure_state__(self):
         d = super(Contour, self).__get_pure_state__()
         # These traits are dynamically created.
-        for name in ('_data_min', '_data_max', '_default_contour'):
+        for name in ('_data_min', '_data_max', '_default_contour',
+                     '_active_backend', '_backend_filters'):
             d.pop(name, None)
 
         return d
@@ -167,9 +256,21 @@ class Contour(Component):
         sends a `data_changed` event.
         """
         self._update_ranges()
+        if self.active_backend == 'slabs':
+            # This filter is not updated by the VTK pipeline.
+            self.contour_filter.update()
         # Propagage the data changed event.
         self.data_changed = True
 
+    def stop(self):
+        """Invoked when this object is removed from the mayavi
+        pipeline, stops the worker processes of the 'slabs' backend.
+        """
+        slabs = self._backend_filters.get('slabs')
+        if slabs is not None:
+            slabs.close()
+        super(Contour, self).stop()
+
     def has_output_port(self):
         """ The contour filter has an output port."""
         return True
@@ -251,9 +352,11 @@ class Contour(Component):
             return
         if self.auto_contours:
             minc, maxc = self.minimum_contour, self.maximum_contour
-            self.contour_filter.generate_values(self.number_of_contours,
-                                                min(minc, maxc),
-                                                max(minc, maxc))
+            cf = self.contour_filter
+            cf.generate_values(self.number_of_contours,
+                               min(minc, maxc),
+                               max(minc, maxc))
+            cf.update()
             self.data_changed = True
 
     def _filled_contours_changed(self, val):
@@ -264,23 +367,75 @@ class Contour(Component):
         self._auto_contours_changed(self.auto_contours)
         self.outputs = [cf]
 
+    def _backend_changed(self):
+        if self._has_input() and not self.filled_contours:
+            self._filled_contours_changed(False)
+
+    def _smp_threads_changed(self, value):
+        if value > 0:
+            vtk.vtkSMPTools.Initialize(value)
+
+    def _n_workers_changed(self, value):
+        slabs = self._backend_filters.get('slabs')
+        if slabs is not None:
+            slabs.n_workers = value
+
+    def _get_active_backend(self):
+        if self.filled_contours:
+            return 'banded_contour_filter'
+        return self._active_backend
+
     def _get_contour_filter(self):
         if self.filled_contours:
             return self._fill_cont_filt
         else:
+            return self._get_backend_filter(self._active_backend)
+
+    def _get_backend_filter(self, name):
+        if name == 'contour_filter':
             return self._cont_filt
+        cf = self._backend_filters.get(name)
+        if cf is None and name == 'slabs':
+            # Imported here as this pulls in multiprocessing.
+            from mayavi.components.slab_contour import SlabContourFilter
+            cf = SlabContourFilter(self.n_workers)
+            self._backend_filters[name] = cf
+        elif cf is None:
+            cf = getattr(tvtk, BACKEND_CLASSES[name])()
+            generic = self._cont_filt
+            if hasattr(cf, 'interpolate_attributes'):
+                cf.interpolate_attributes = True
+            for trait in ('compute_normals', 'compute_scalars',
+                          'compute_gradients'):
+                if hasattr(cf, trait):
+                    # vtkContourFilter uses -1 to compute the normals
+                    # when it can.
+                    value = getattr(generic, trait)
+                    setattr(cf, trait, value != 0)
+            self._backend_filters[name] = cf
+        return cf
 
     def _set_contour_input(self):
         """Sets the input to the appropriate contour filter and
         returns the currently used contour filter.
         """
         inp = self.inputs[0].outputs[0]
-        cf = self.contour_filter
         if self.filled_contours:
+            cf = self.contour_filter
             inp = convert_to_poly_data(inp)
             self.configure_input(cf, inp)
         else:
+            old = self._active_backend
+            backend = get_contour_backend(get_new_output(inp), self.backend)
+            self._active_backend = backend
+            cf = self.contour_filter
             self.configure_input(cf, inp)
+            if backend != old:
+                # Set the contours on the new filter.
+                if self.auto_contours:
+                    self._do_auto_contours()
+                else:
+                    self._contours_changed(self.contours)
         cf.update()
         return cf
 
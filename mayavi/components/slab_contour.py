@@ -0,0 +1,353 @@
+"""Process-parallel isosurfaces of large image data.
+
+The volume is split along its last axis into slabs which are contoured
+in a `concurrent.futures` process pool.  The scalars are handed to the
+worker processes through shared memory (or a memory mapped file when
+`multiprocessing.shared_memory` is not available) so they are not
+pickled.  Each slab is read with one extra plane on either side so that
+the normals on the slab boundaries are the ones of the whole volume, and
+the triangles are then merged, sharing the points on the boundaries.
+
+The contours are computed in index space, where the points on a plane
+shared by two slabs are exactly equal, and transformed to the origin
+and spacing of the image afterwards.
+
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.common import configure_input_data
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def split_extent(n_planes, n_slabs):
+    """Split the cells between `n_planes` planes into at most `n_slabs`
+    ranges and return a list of the (first, last) planes of each slab.
+    """
+    n_slabs = max(1, min(n_slabs, n_planes - 1))
+    bounds = np.unique(np.linspace(0, n_planes - 1, n_slabs + 1).round())
+    bounds = bounds.astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class SharedArray(object):
+    """A copy of an array in memory shared with other processes.
+
+    The `descriptor` is a small picklable tuple from which the worker
+    processes get the array with `attach`.  Call `close` when done.
+    """
+
+    def __init__(self, array):
+        array = np.asarray(array)
+        self.shape, self.dtype = array.shape, array.dtype
+        self._shm = self._file_name = None
+        if shared_memory is not None:
+            self._shm = shared_memory.SharedMemory(
+                create=True, size=max(array.nbytes, 1)
+            )
+            name = self._shm.name
+            data = np.ndarray(array.shape, array.dtype, buffer=self._shm.buf)
+        else:
+            fd, name = tempfile.mkstemp(suffix='.dat')
+            os.close(fd)
+            self._file_name = name
+            data = np.memmap(name, array.dtype, 'w+', shape=array.shape)
+        data[...] = array
+        del data
+        kind = 'memmap' if self._shm is None else 'shm'
+        self.descriptor = (kind, name, self.shape, self.dtype.str)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+        if self._file_name is not None:
+            os.remove(self._file_name)
+            self._file_name = None
+
+
+def attach(descriptor):
+    """Return the shared array and the object holding its memory for the
+    descriptor of a `SharedArray`.
+    """
+    kind, name, shape, dtype = descriptor
+    if kind == 'shm':
+        shm = shared_memory.SharedMemory(name=name)
+        return np.ndarray(shape, dtype, buffer=shm.buf), shm
+    return np.memmap(name, dtype, 'r', shape=shape), None
+
+
+def contour_slab(descriptor, dimensions, slab, values, compute_normals=True):
+    """Contour the cells between the planes `slab` of the shared scalars
+    of an image of the given `dimensions`, in index space.
+
+    Return the points, the triangles, the scalars and the gradients (or
+    None) of the contours.
+    """
+    scalars, shm = attach(descriptor)
+    try:
+        nx, ny, nz = dimensions
+        first, last = slab
+        # Add a plane on either side for the gradients.
+        start, stop = max(first - 1, 0), min(last + 1, nz - 1)
+        size = nx*ny
+        data = tvtk.ImageData(dimensions=(nx, ny, stop - start + 1),
+                              origin=(0, 0, start))
+        data.point_data.scalars = scalars[start*size:(stop + 1)*size]
+        if hasattr(tvtk, 'FlyingEdges3D'):
+            cf = tvtk.FlyingEdges3D()
+        else:
+            cf = tvtk.ContourFilter()
+        cf.trait_set(compute_normals=False, compute_scalars=True,
+                     compute_gradients=compute_normals)
+        configure_input_data(cf, data)
+        cf.number_of_contours = len(values)
+        for i, value in enumerate(values):
+            cf.set_value(i, value)
+        cf.update()
+        output = cf.output
+        if output.number_of_points == 0:
+            empty = np.empty((0, 3), np.float32)
+            return (empty, np.empty((0, 3), int), np.empty(0, np.float32),
+                    empty if compute_normals else None)
+        points = output.points.to_array()
+        triangles = output.polys.to_array().reshape(-1, 4)[:, 1:]
+        # Keep the triangles of the cells of this slab, the ones in the
+        # extra planes belong to the neighbouring slabs.
+        cell = np.floor(points[triangles, 2].mean(axis=1))
+        cell = np.minimum(cell, nz - 2)
+        triangles = triangles[(cell >= first) & (cell < last)]
+        used, triangles = np.unique(triangles, return_inverse=True)
+        triangles = triangles.reshape(-1, 3)
+        pd = output.point_data
+        gradients = None
+        if compute_normals:
+            gradients = pd.get_array('Gradients').to_array()[used]
+        return (points[used], triangles, pd.scalars.to_array()[used],
+                gradients)
+    finally:
+        del scalars
+        if shm is not None:
+            shm.close()
+
+
+def merge_slabs(results, boundaries):
+    """Merge the results of `contour_slab`, the points on the planes at
+    the `boundaries` between the slabs are shared.  Return the points,
+    the triangles, the scalars and the gradients.
+    """
+    offsets = np.cumsum([0] + [len(r[0]) for r in results])
+    points = np.concatenate([r[0] for r in results])
+    triangles = np.concatenate(
+        [r[1] + offset for r, offset in zip(results, offsets)]
+    )
+    scalars = np.concatenate([r[2] for r in results])
+    gradients = None
+    if all(r[3] is not None for r in results):
+        gradients = np.concatenate([r[3] for r in results])
+
+    n_points = len(points)
+    index = np.arange(n_points)
+    on_boundary = np.nonzero(np.isin(points[:, 2], boundaries))[0]
+    if len(on_boundary) > 0:
+        _, first, inverse = np.unique(points[on_boundary], axis=0,
+                                      return_index=True,
+                                      return_inverse=True)
+        index[on_boundary] = on_boundary[first][inverse.ravel()]
+    keep = index == np.arange(n_points)
+    new_index = np.cumsum(keep) - 1
+    triangles = new_index[index][triangles]
+    if gradients is not None:
+        gradients = gradients[keep]
+    return points[keep], triangles, scalars[keep], gradients
+
+
+def _make_executor(n_workers):
+    """Return a pool of `n_workers` processes.  They are spawned rather
+    than forked since a fork of a process running VTK or a GUI toolkit
+    may deadlock.
+    """
+    return ProcessPoolExecutor(max_workers=n_workers,
+                               mp_context=multiprocessing.get_context('spawn'))
+
+
+def contour_image_data(data, values, n_workers=None, n_slabs=None,
+                       compute_normals=True, executor=None):
+    """Contour the point scalars of the given `tvtk.ImageData` at the
+    given `values` with a pool of `n_workers` processes (by default one
+    per CPU) and return a `tvtk.PolyData`.
+
+    The volume is split in `n_slabs` slabs, two per worker by default.
+    An existing `concurrent.futures.ProcessPoolExecutor` may be given as
+    the `executor`.  The output has the same points and triangles as
+    the one of `vtkFlyingEdges3D`, the other point data arrays are not
+    interpolated.
+    """
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    if n_slabs is None:
+        n_slabs = 2*n_workers
+    dimensions = tuple(data.dimensions)
+    source = data.point_data.scalars
+    name = source.name
+    scalars = source.to_array()
+    if scalars.ndim > 1:
+        scalars = scalars[:, 0]
+    slabs = split_extent(dimensions[2], n_slabs)
+    values = [float(v) for v in values]
+
+    shared = SharedArray(scalars)
+    own_executor = executor is None
+    if own_executor:
+        executor = _make_executor(n_workers)
+    try:
+        futures = [executor.submit(contour_slab, shared.descriptor,
+                                   dimensions, slab, values, compute_normals)
+                   for slab in slabs]
+        results = [f.result() for f in futures]
+    finally:
+        if own_executor:
+            executor.shutdown()
+        shared.close()
+
+    boundaries = [slab[0] for slab in slabs[1:]]
+    points, triangles, scalars, gradients = merge_slabs(results, boundaries)
+
+    spacing = np.array(data.spacing)
+    output = tvtk.PolyData()
+    output.points = (points*spacing + data.origin).astype(points.dtype)
+    polys = tvtk.CellArray()
+    polys.from_array(triangles)
+    output.polys = polys
+    output.point_data.scalars = scalars
+    output.point_data.scalars.name = name
+    if gradients is not None:
+        # The gradients are in index space.
+        normals = -gradients/spacing
+        norm = np.sqrt((normals*normals).sum(axis=1))
+        norm[norm == 0] = 1.0
+        normals /= norm[:, None]
+        output.point_data.normals = normals.astype(np.float32)
+        output.point_data.normals.name = 'Normals'
+    return output
+
+
+###############################################################################
+# `SlabContourFilter` class.
+###############################################################################
+class SlabContourFilter(object):
+    """Stands in for a VTK contour filter in the `Contour` component and
+    contours image data with `contour_image_data`.
+
+    Like a contour filter, the input is set with `input_connection`, the
+    values with `set_value` or `generate_values`, and the contours are
+    computed by `update`.  The output is given by a
+    `tvtk.TrivialProducer` so the filter can be connected to the rest of
+    the pipeline through its `output_port`.
+    """
+
+    def __init__(self, n_workers=0, compute_normals=True):
+        self.n_workers = n_workers
+        self.compute_normals = compute_normals
+        self.input_connection = None
+        self.producer = tvtk.TrivialProducer()
+        self._values = []
+        self._executor = None
+        self._executor_workers = 0
+        self._key = None
+
+    # ---- Contour filter interface -------
+    def _get_number_of_contours(self):
+        return len(self._values)
+
+    def _set_number_of_contours(self, n):
+        n = int(n)
+        self._values = (self._values + [0.0]*n)[:n]
+
+    number_of_contours = property(_get_number_of_contours,
+                                  _set_number_of_contours)
+
+    def set_value(self, i, value):
+        if i >= len(self._values):
+            self.number_of_contours = i + 1
+        self._values[i] = float(value)
+
+    def get_value(self, i):
+        return self._values[i]
+
+    def generate_values(self, n, start, end):
+        self._values = list(np.linspace(start, end, n))
+
+    def set_input_data(self, data):
+        producer = tvtk.TrivialProducer()
+        producer.set_output(data)
+        self.input_connection = producer.output_port
+
+    @property
+    def output_port(self):
+        return self.producer.output_port
+
+    @property
+    def output(self):
+        return self.producer.get_output_data_object(0)
+
+    def is_a(self, name):
+        return self.producer.is_a(name)
+
+    def update(self):
+        """Compute the contours if the input or the values changed."""
+        port = self.input_connection
+        if port is None:
+            return
+        producer = port.producer
+        producer.update()
+        data = producer.get_output_data_object(port.index)
+        scalars = data.point_data.scalars
+        scalars_time = None if scalars is None else scalars.m_time
+        key = (data, data.m_time, scalars_time, tuple(self._values),
+               self.compute_normals)
+        if key == self._key:
+            return
+        if len(self._values) == 0 or scalars is None:
+            output = tvtk.PolyData()
+        else:
+            output = contour_image_data(
+                data, self._values, self._get_n_workers(),
+                compute_normals=self.compute_normals,
+                executor=self._get_executor()
+            )
+        self.producer.set_output(output)
+        self.producer.update()
+        self._key = key
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # ---- Private interface -------
+    def _get_n_workers(self):
+        return self.n_workers or os.cpu_count() or 1
+
+    def _get_executor(self):
+        n_workers = self._get_n_workers()
+        if n_workers != self._executor_workers:
+            self.close()
+        if self._executor is None:
+            self._executor = _make_executor(n_workers)
+            self._executor_workers = n_workers
+        return self._executor
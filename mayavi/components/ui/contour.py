@@ -39,6 +39,12 @@ view = View(Group(Item(name='filled_contours',
                         Item(name='_data_max',
                              label='Data maximum'),
                              visible_when='not auto_update_range',
-                  )
+                  ),
+                  Item(name='backend',
+                       visible_when='not filled_contours'),
+                  Item(name='active_backend', style='readonly'),
+                  Item(name='smp_threads'),
+                  Item(name='n_workers',
+                       visible_when="backend == 'slabs'"),
                )
            )
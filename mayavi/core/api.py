@@ -3,6 +3,7 @@ from .registry import registry
 from .metadata import SourceMetadata
 from .pipeline_info import PipelineInfo
 from .pipeline_base import PipelineBase
+from .data_store import DataStore
 from .engine import Engine
 from .null_engine import NullEngine
 from .off_screen_engine import OffScreenEngine
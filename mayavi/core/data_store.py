@@ -0,0 +1,125 @@
+"""A content addressed store for the data saved along with a
+visualization.
+
+When a visualization is saved with a `DataStore`, the data of the sources
+is written once to a file in the store named after the hash of its
+contents and only a reference to it is saved in the state.  Scenes
+sharing the same data therefore share the files and the data is read
+only once when they are loaded.
+
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+
+
+# The store used when saving or loading a visualization.
+_active_store = None
+
+
+def get_active_data_store():
+    """Return the `DataStore` used to save or load the current
+    visualization, or `None` if the data is saved inline.
+    """
+    return _active_store
+
+
+@contextmanager
+def active_data_store(store):
+    """A context manager that makes the given `DataStore` (or directory
+    name) the active store while saving or loading a visualization.
+    Passing `None` saves the data inline.
+    """
+    global _active_store
+    if isinstance(store, str):
+        store = DataStore(store)
+    old = _active_store
+    _active_store = store
+    try:
+        yield store
+    finally:
+        _active_store = old
+
+
+class DataStore(object):
+    """A directory of data files, each named after the SHA-256 hash of
+    its contents.
+
+    Besides the files, the store keeps two caches that are used by the
+    objects saving data in it: one from a token identifying a given
+    version of an object to the key of its data, so unchanged objects
+    are not serialized again, and one from a key to the object created
+    from the data, so the data is decoded only once.
+    """
+
+    # The extension of the data files.
+    extension = '.dat'
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._keys = {}
+        self._objects = {}
+
+    def put(self, data):
+        """Save the given bytes (or buffer) and return their key.  Data
+        that is already in the store is not written again.
+        """
+        key = hashlib.sha256(data).hexdigest()
+        fname = self._get_file_name(key)
+        if not os.path.exists(fname):
+            if not os.path.isdir(self.path):
+                os.makedirs(self.path)
+            # Write to a temporary file first so that a partially written
+            # file never has a valid name.
+            fh, tmp_name = tempfile.mkstemp(dir=self.path)
+            try:
+                with os.fdopen(fh, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_name, fname)
+            except Exception:
+                os.remove(tmp_name)
+                raise
+        return key
+
+    def open(self, key):
+        """Return a read-only memory map of the data with the given key.
+        The caller should close it when done.
+        """
+        fname = self._get_file_name(key)
+        if not os.path.exists(fname):
+            raise IOError('No data with key %s in the data store %s.'
+                          % (key, self.path))
+        with open(fname, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def get_key(self, token):
+        """Return the key of the data saved for the given `token` or
+        `None`.
+        """
+        return self._keys.get(token)
+
+    def set_key(self, token, key):
+        self._keys[token] = key
+
+    def get_object(self, key):
+        """Return the object created from the data with the given key
+        or `None`.
+        """
+        return self._objects.get(key)
+
+    def set_object(self, key, obj):
+        self._objects[key] = obj
+
+    def clear_cache(self):
+        """Forget the cached keys and objects, the files are kept."""
+        self._keys.clear()
+        self._objects.clear()
+
+    def _get_file_name(self, key):
+        return os.path.join(self.path, key + self.extension)
@@ -28,6 +28,7 @@ from tvtk.common import is_old_pipeline
 from mayavi.core.base import Base
 from mayavi.core.scene import Scene
 from mayavi.core.common import error, process_ui_events
+from mayavi.core.data_store import active_data_store
 from mayavi.core.registry import registry
 from mayavi.core.adder_node import AdderNode, SceneAdderNode
 from mayavi.preferences.api import preference_manager
@@ -246,35 +247,33 @@ class Engine(HasStrictTraits):
         self.add_filter(mod, obj=obj)
 
     @recordable
-    def save_visualization(self, file_or_fname):
+    def save_visualization(self, file_or_fname, data_store=None):
         """Given a file or a file name, this saves the current
         visualization to the file.
+
+        If a `DataStore` or a directory name is given as `data_store`,
+        the data of the sources is saved once in the store and only
+        referred to in the file.  The same store must then be given to
+        `load_visualization`.
         """
         # Save the state of VTK's global warning display.
         o = vtk.vtkObject
         w = o.GetGlobalWarningDisplay()
         o.SetGlobalWarningDisplay(0) # Turn it off.
         try:
-            #FIXME: This is for streamline seed point widget position which
-            #does not get serialized correctly
-            if is_old_pipeline():
-                state_pickler.dump(self, file_or_fname)
-            else:
-                state = state_pickler.get_state(self)
-                st = state.scenes[0].children[0].children[0].children[4]
-                l_pos = st.seed.widget.position
-                st.seed.widget.position = [pos.item() for pos in l_pos]
-                saved_state = state_pickler.dumps(state)
-                file_or_fname.write(saved_state)
-        except (IndexError, AttributeError):
-            state_pickler.dump(self, file_or_fname)
+            with active_data_store(data_store):
+                self._save_state(file_or_fname)
         finally:
             # Reset the warning state.
             o.SetGlobalWarningDisplay(w)
 
     @recordable
-    def load_visualization(self, file_or_fname):
-        """Given a file/file name this loads the visualization."""
+    def load_visualization(self, file_or_fname, data_store=None):
+        """Given a file/file name this loads the visualization.
+
+        The `data_store` is the `DataStore` or directory name given to
+        `save_visualization` if any.
+        """
         # Save the state of VTK's global warning display.
         o = vtk.vtkObject
         w = o.GetGlobalWarningDisplay()
@@ -284,18 +283,19 @@ class Engine(HasStrictTraits):
             state = state_pickler.load_state(file_or_fname)
             state_pickler.update_state(state)
             # Add the new scenes.
-            for scene_state in state.scenes:
-                self.new_scene()
-                scene = self.scenes[-1]
-                # Disable rendering initially.
-                if scene.scene is not None:
-                    scene.scene.disable_render = True
-                # Update the state.
-                state_pickler.update_state(scene_state)
-                scene.__set_pure_state__(scene_state)
-                # Setting the state will automatically reset the
-                # disable_render.
-                scene.render()
+            with active_data_store(data_store):
+                for scene_state in state.scenes:
+                    self.new_scene()
+                    scene = self.scenes[-1]
+                    # Disable rendering initially.
+                    if scene.scene is not None:
+                        scene.scene.disable_render = True
+                    # Update the state.
+                    state_pickler.update_state(scene_state)
+                    scene.__set_pure_state__(scene_state)
+                    # Setting the state will automatically reset the
+                    # disable_render.
+                    scene.render()
         finally:
             # Reset the warning state.
             o.SetGlobalWarningDisplay(w)
@@ -507,6 +507,23 @@ class Engine(HasStrictTraits):
     ######################################################################
     # Non-public interface
     ######################################################################
+    def _save_state(self, file_or_fname):
+        """Save the state of the engine to the given file or file name."""
+        try:
+            #FIXME: This is for streamline seed point widget position which
+            #does not get serialized correctly
+            if is_old_pipeline():
+                state_pickler.dump(self, file_or_fname)
+            else:
+                state = state_pickler.get_state(self)
+                st = state.scenes[0].children[0].children[0].children[4]
+                l_pos = st.seed.widget.position
+                st.seed.widget.position = [pos.item() for pos in l_pos]
+                saved_state = state_pickler.dumps(state)
+                file_or_fname.write(saved_state)
+        except (IndexError, AttributeError):
+            state_pickler.dump(self, file_or_fname)
+
     def _on_select(self, object):
         """Called by the EngineTree when an object on the view is
         selected.  This basically sets the current object and current
@@ -8,6 +8,8 @@ sources derive.
 
 # Standard library imports.
 import re
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from os.path import split, join, isfile
 from glob import glob
 
@@ -112,6 +114,93 @@ class NoUITimer(object):
         return self._is_active
 
 
+class TimestepPrefetcher(object):
+    """Reads files of a time series in a pool of background threads and
+    keeps the results in an LRU cache with a memory budget.
+
+    To read a file, `make_task(file_name)` is called in the calling
+    thread.  This must return a function which is called in a background
+    thread and returns a tuple of the result and its size in bytes.  The
+    result is typically a VTK reader whose output has been updated.
+    Results are evicted from the cache (least recently used first) when
+    the total size exceeds `memory_budget` bytes.
+    """
+
+    def __init__(self, make_task, max_workers=2,
+                 memory_budget=512*1024*1024):
+        self.make_task = make_task
+        self.max_workers = max_workers
+        self.memory_budget = memory_budget
+        # The total size of the cached results in bytes.
+        self.nbytes = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = {}
+        self._cache = OrderedDict()
+
+    def __contains__(self, file_name):
+        return file_name in self._cache or file_name in self._futures
+
+    def prefetch(self, file_names):
+        """Start reading the given files in the background unless they
+        are already read or being read.
+        """
+        self._collect()
+        for name in file_names:
+            if name not in self:
+                task = self.make_task(name)
+                self._futures[name] = self._executor.submit(task)
+
+    def take(self, file_name):
+        """Remove and return the result for the given file or None if the
+        file was not prefetched.  If the file is still being read, this
+        waits for it.
+        """
+        future = self._futures.pop(file_name, None)
+        if future is not None:
+            self._add(file_name, future.result())
+        self._collect()
+        if file_name not in self._cache:
+            return None
+        result, nbytes = self._cache.pop(file_name)
+        self.nbytes -= nbytes
+        return result
+
+    def put(self, file_name, result, nbytes):
+        """Add a result that is no longer in use back to the cache."""
+        self._add(file_name, (result, nbytes))
+
+    def clear(self):
+        """Clear the cache and cancel any pending reads."""
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        self._cache.clear()
+        self.nbytes = 0
+
+    def shutdown(self):
+        """Clear the cache and stop the background threads."""
+        self.clear()
+        self._executor.shutdown(wait=False)
+
+    def _collect(self):
+        """Move the finished reads into the cache."""
+        done = [k for k, f in self._futures.items() if f.done()]
+        for name in done:
+            future = self._futures.pop(name)
+            if not future.cancelled() and future.exception() is None:
+                self._add(name, future.result())
+
+    def _add(self, file_name, value):
+        if file_name in self._cache:
+            self.nbytes -= self._cache[file_name][1]
+        self._cache[file_name] = value
+        self.nbytes += value[1]
+        # Evict the least recently used results but keep the last one.
+        while self.nbytes > self.memory_budget and len(self._cache) > 1:
+            name, (result, nbytes) = self._cache.popitem(last=False)
+            self.nbytes -= nbytes
+
+
 ######################################################################
 # `FileDataSource` class.
 ######################################################################
@@ -141,6 +230,14 @@ class FileDataSource(Source):
 
     update_files = Button('Rescan files')
 
+    # The number of timesteps to read ahead in background threads while
+    # stepping through a time series.  Zero disables this.
+    prefetch = Int(0, desc='the number of timesteps read in advance')
+
+    # The maximum memory in MB used to cache the timesteps read ahead.
+    prefetch_memory = Float(512.0,
+                            desc='the memory budget (MB) of read timesteps')
+
     base_file_name=Str('', desc="the base name of the file",
                        enter_set=True, auto_set=False,
                        editor=FileEditor())
@@ -162,6 +259,8 @@ class FileDataSource(Source):
                                        label='Delay'),
                                   Item(name='loop'),
                               ),
+                              Item(name='prefetch',
+                                   visible_when='object._supports_prefetch'),
                               visible_when='len(object.file_list) > 1'
                           ),
                           Item(name='update_files', show_label=False),
@@ -180,13 +279,20 @@ class FileDataSource(Source):
     _timer = Any
     _in_update_files = Any(False)
 
+    # The `TimestepPrefetcher` used when `prefetch` is non-zero.
+    _prefetcher = Any
+
+    # If the reader implements `_make_read_task`, `prefetch` is ignored
+    # otherwise.
+    _supports_prefetch = Bool(False)
+
     ######################################################################
     # `object` interface
     ######################################################################
     def __get_pure_state__(self):
         d = super(FileDataSource, self).__get_pure_state__()
         # These are obtained dynamically, so don't pickle them.
-        for x in ['file_list', 'timestep', 'play']:
+        for x in ['file_list', 'timestep', 'play', '_prefetcher']:
             d.pop(x, None)
         return d
 
@@ -236,12 +342,61 @@ class FileDataSource(Source):
         file_list = self.file_list
         if len(file_list) > 0:
             self.file_path = FilePath(file_list[value])
+            if self.prefetch > 0 and self._supports_prefetch:
+                self._prefetch_timesteps(value)
         else:
             self.file_path = FilePath('')
         if self.sync_timestep:
             for sibling in self._find_sibling_datasets():
                 sibling.timestep = value
 
+    def _make_read_task(self, file_name):
+        """Return a function that reads the given file in a background
+        thread and returns a tuple of the result and its size in bytes.
+        The result is returned by `_get_prefetched` when the timestep is
+        shown.  Subclasses that support prefetching must override this
+        and set `_supports_prefetch`.
+        """
+        raise NotImplementedError
+
+    def _get_prefetched(self, file_name):
+        """Remove and return the result of the read task for the given
+        file from the cache if it was prefetched, else return None.
+        """
+        prefetcher = self._prefetcher
+        if prefetcher is None:
+            return None
+        return prefetcher.take(file_name)
+
+    def _prefetch_timesteps(self, timestep):
+        """Start reading the `prefetch` timesteps following `timestep`."""
+        if self._prefetcher is None:
+            self._prefetcher = TimestepPrefetcher(
+                self._make_read_task,
+                max_workers=min(self.prefetch, 4),
+                memory_budget=self.prefetch_memory*1024*1024
+            )
+        file_list = self.file_list
+        n_files = len(file_list)
+        names = []
+        for i in range(1, min(self.prefetch, n_files - 1) + 1):
+            i += timestep
+            if i >= n_files:
+                if not self.loop:
+                    break
+                i = i % n_files
+            names.append(file_list[i])
+        self._prefetcher.prefetch(names)
+
+    def _prefetch_changed(self, value):
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+            self._prefetcher = None
+
+    def _prefetch_memory_changed(self, value):
+        if self._prefetcher is not None:
+            self._prefetcher.memory_budget = value*1024*1024
+
     def _base_file_name_changed(self, value):
         self._update_files_fired()
         try:
@@ -320,6 +475,9 @@ class FileDataSource(Source):
             file_list = get_file_list(fname)
             if len(file_list) == 0:
                 file_list = [fname]
+            if self._prefetcher is not None:
+                # The files may have changed on disk.
+                self._prefetcher.clear()
             self.file_list = file_list
             for sibling in siblings:
                 sibling.update_files = True
@@ -5,18 +5,25 @@
 # Copyright (c) 2005-2020, Enthought, Inc.
 # License: BSD Style.
 
+import base64
+import gzip
 import os.path
+import pickle
 import sys
 import subprocess
 import warnings
+from collections.abc import Mapping
+from functools import lru_cache
+
+import numpy as np
 
 # Enthought library imports.
 from traits.api import Instance, Range, Bool, Array, \
      Str, Property, Enum, Button
 from traits.etsconfig.api import ETSConfig
 from traitsui.api import FileEditor, auto_close_message
-from apptools.persistence import state_pickler
 from tvtk.api import tvtk
+from tvtk.array_handler import vtk2array
 
 # Local imports.
 from mayavi.core.base import Base
@@ -29,8 +36,50 @@ from mayavi.core import lut
 lut_image_dir = os.path.dirname(lut.__file__)
 pylab_luts_file = os.path.join(lut_image_dir, 'pylab_luts.pkl')
 
+
+class PylabLUTs(Mapping):
+    """A read-only mapping from the names of the pylab colormaps to their
+    (256, 4) array of RGBA values.
+
+    The file saved by `state_pickler` is read once but each colormap is
+    only decoded when it is first used.
+    """
+    def __init__(self, file_name):
+        with open(file_name, 'rb') as f:
+            try:
+                state = pickle.load(f)
+            except Exception as e:
+                raise ValueError(str(e))
+        try:
+            self._states = state['data']
+            if not all(s['type'] == 'numeric'
+                       for s in self._states.values()):
+                raise TypeError()
+        except (KeyError, TypeError, AttributeError):
+            raise ValueError('unexpected contents')
+        self._luts = {}
+
+    def __getitem__(self, name):
+        lut = self._luts.get(name)
+        if lut is None:
+            # This is how the state_pickler saves numpy arrays.
+            data = self._states[name]['data']
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            lut = pickle.loads(gzip.decompress(base64.decodebytes(data)),
+                               encoding='bytes')
+            self._luts[name] = lut
+        return lut
+
+    def __iter__(self):
+        return iter(self._states)
+
+    def __len__(self):
+        return len(self._states)
+
+
 try:
-    pylab_luts = state_pickler.load_state(pylab_luts_file)
+    pylab_luts = PylabLUTs(pylab_luts_file)
 except (IOError, ValueError) as exception:
     # IOError: failed to open file
     # ValueError: pickled file is built from an OS w/ different
@@ -50,17 +99,50 @@ except (IOError, ValueError) as exception:
 #################################################################
 # Utility functions.
 #################################################################
+def lut_to_table(lut_lst):
+    """Convert the passed list or array of RGBA values between 0 and 1 to
+    an array of unsigned bytes as used by VTK."""
+    values = np.clip(np.asarray(lut_lst, dtype=float), 0.0, 1.0)
+    return (values*255.0 + 0.5).astype(np.uint8)
+
+
+def set_lut_table(vtk_lut, table):
+    """Set the colors of the tvtk.LookupTable (`vtk_lut`) from an
+    (n_colors, 4) array of unsigned bytes, which are copied into the
+    table of the lookup table."""
+    n_col = len(table)
+    obj = tvtk.to_vtk(vtk_lut)
+    obj.SetNumberOfColors(n_col)
+    obj.ForceBuild()
+    vtk2array(obj.GetTable())[:n_col] = table
+    # Setting a value through VTK marks the table as set by hand, so it
+    # is not rebuilt from the ranges, and updates the special colors.
+    obj.SetTableValue(n_col - 1, *(table[-1]/255.0))
+    return vtk_lut
+
+
 def set_lut(vtk_lut, lut_lst):
     """Setup the tvtk.LookupTable (`vtk_lut`) using the passed list of
     lut values."""
-    n_col = len(lut_lst)
-    vtk_lut.number_of_colors = n_col
-    vtk_lut.build()
-    for i in range(0, n_col):
-        lt = lut_lst[i]
-        vtk_lut.set_table_value(i, lt[0], lt[1], lt[2], lt[3])
+    return set_lut_table(vtk_lut, lut_to_table(lut_lst))
+
+
+@lru_cache(maxsize=256)
+def get_pylab_lut_table(name, reverse=False, number_of_colors=256):
+    """Return the table of unsigned bytes of the named pylab colormap,
+    reversed if asked and subsampled to about the number of colors.
+    The tables are cached and shared so they are read-only.
+    """
+    lut = pylab_luts[name]
+    if reverse:
+        lut = lut[::-1, :]
+    n_total = len(lut)
+    if not number_of_colors >= n_total:
+        lut = lut[::int(round(n_total/float(number_of_colors)))]
+    table = lut_to_table(lut)
+    table.flags.writeable = False
+    return table
 
-    return vtk_lut
 
 def check_lut_first_line(line, file_name=''):
     """Check the line to see if this is a valid LUT file."""
@@ -78,34 +160,41 @@ def check_lut_first_line(line, file_name=''):
     else:
         return n_color
 
-def parse_lut_file(file_name):
+def read_lut_file(file_name):
     """Parse the file specified by its name `file_name` for a LUT and
-    return the list of parsed values."""
-
-    input = open(file_name, "r")
-
-    line = input.readline()
-    n_color = check_lut_first_line(line, file_name)
-
-    lut = []
-    for line in input.readlines():
-        entr = line.split()
-        if len(entr) != 4:
-            errmsg="Error: insufficient or too much data in line "\
-                    "-- \"%s\""%(entr)
-            raise IOError(errmsg)
-
-        tmp = []
-        for color in entr:
+    return the parsed values as an (n_colors, 4) array."""
+
+    with open(file_name, "r") as input:
+        line = input.readline()
+        check_lut_first_line(line, file_name)
+        lines = input.read().splitlines()
+
+    tokens = ' '.join(lines).split()
+    if len(tokens) != 4*len(lines):
+        for line in lines:
+            entr = line.split()
+            if len(entr) != 4:
+                errmsg="Error: insufficient or too much data in line "\
+                        "-- \"%s\""%(entr)
+                raise IOError(errmsg)
+    try:
+        values = np.array(tokens, dtype=float)
+    except ValueError:
+        for color in tokens:
             try:
-                tmp.append(float(color))
-            except:
+                float(color)
+            except ValueError:
                 raise IOError(
                     "Unknown entry '%s'in lookup table input."%color
                 )
-        lut.append(tmp)
+        raise
+    return values.reshape(-1, 4)
 
-    return lut
+
+def parse_lut_file(file_name):
+    """Parse the file specified by its name `file_name` for a LUT and
+    return the list of parsed values."""
+    return read_lut_file(file_name).tolist()
 
 
 def lut_mode_list():
@@ -291,14 +380,10 @@ class LUTManager(Base):
 
         reverse = self.reverse_lut
         if value in pylab_luts:
-            lut = pylab_luts[value]
-            if reverse:
-                lut = lut[::-1, :]
-            n_total = len(lut)
-            n_color = self.number_of_colors
-            if not n_color >= n_total:
-                lut = lut[::int(round(n_total/float(n_color)))]
-            self.load_lut_from_list(lut.tolist())
+            table = get_pylab_lut_table(value, reverse,
+                                        self.number_of_colors)
+            self.lut = set_lut_table(self.lut, table)
+            self.render()
             #self.lut.force_build()
             return
         elif value == 'blue-red':
@@ -352,15 +437,12 @@ class LUTManager(Base):
         elif self.lut_mode in pylab_luts:
             # We can't interpolate these LUTs, as they are defined from a
             # table. We hack around this limitation
-            reverse = self.reverse_lut
-            lut = pylab_luts[self.lut_mode]
-            if reverse:
-                lut = lut[::-1, :]
-            n_total = len(lut)
-            if value > n_total:
+            if value > len(pylab_luts[self.lut_mode]):
                 return
-            lut = lut[::int(round(n_total/float(value)))]
-            self.load_lut_from_list(lut.tolist())
+            table = get_pylab_lut_table(self.lut_mode, self.reverse_lut,
+                                        value)
+            self.lut = set_lut_table(self.lut, table)
+            self.render()
         else:
             lut = self.lut
             lut.number_of_table_values = value
@@ -461,14 +543,14 @@ class LUTManager(Base):
             else:
                 f.close()
                 try:
-                    lut_list = parse_lut_file(file_name)
+                    lut_list = read_lut_file(file_name)
                 except IOError as err_msg:
                     msg = "Sorry could not parse LUT file: %s\n"%file_name
-                    msg += err_msg
+                    msg += str(err_msg)
                     error(msg)
                 else:
                     if self.reverse_lut:
-                        lut_list.reverse()
+                        lut_list = lut_list[::-1]
                     self.lut = set_lut(self.lut, lut_list)
                     self.render()
 
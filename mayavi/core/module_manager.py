@@ -10,7 +10,7 @@ import numpy
 
 # Enthought library imports.
 from traits.api import List, Instance, Trait, TraitPrefixList, \
-                                 HasTraits, Str
+                                 HasTraits, Str, Range
 from apptools.persistence.state_pickler import set_state
 
 # Local imports
@@ -99,6 +99,14 @@ class ModuleManager(Base):
         desc='specify the data type used by the lookup tables',
     )
 
+    # Compute the data ranges using only every `range_sample_step`
+    # value of the data.  This speeds up updates of large time varying
+    # data but the ranges may be smaller than the actual ones.
+    range_sample_step = Range(
+        1, 1000, 1,
+        desc='the sampling step used to compute the data ranges'
+    )
+
     # The scalar lookup table manager.
     scalar_lut_manager = Instance(LUTManager, args=(), record=True)
 
@@ -151,7 +159,7 @@ class ModuleManager(Base):
             return
 
         input = self.source.outputs[0]
-        helper = DataSetHelper(input)
+        helper = DataSetHelper(input, sample_step=self.range_sample_step)
 
         self._setup_scalar_data(helper)
         self._setup_vector_data(helper)
@@ -280,6 +288,10 @@ class ModuleManager(Base):
     def _lut_data_mode_changed(self, value):
         self.update()
 
+    def _range_sample_step_changed(self, value):
+        if self.source is not None:
+            self.update()
+
     def _setup_scalar_data(self, helper):
         """Computes the scalar range and an appropriate name for the
         lookup table."""
@@ -23,6 +23,7 @@ view = View(Group(Item('scalar_lut_manager', style='custom'),
             Group(Item('lut_data_mode',
                        style='custom',
                        editor = EnumEditor(values=LUT_DATA_MODE_TYPES)),
+                  Item('range_sample_step'),
                   label='ModuleManager',
                   selected=False),
             )
@@ -1,3 +1,5 @@
+from collections import OrderedDict
+
 import numpy as np
 import vtk
 from vtk.numpy_interface import dataset_adapter as dsa
@@ -26,14 +28,65 @@ def get_new_output(input, update=True):
         return result
 
 
+# Cache of the ranges computed for data arrays.  The key is the address
+# of the VTK array, the attribute type and the sampling step and the value
+# is the MTime of the array and the range.  Since the MTime is a global
+# counter, a new array at the same address never matches an old entry.
+_range_cache = OrderedDict()
+_RANGE_CACHE_SIZE = 256
+
+
+def clear_range_cache():
+    """Clear the cache of the data ranges computed by `DataSetHelper`.
+    """
+    _range_cache.clear()
+
+
+def _compute_range(x, attr, sample_step=1):
+    """Compute the range of the scalars/vectors in the data array `x`
+    ignoring any NaNs.  If `sample_step` is more than one only every
+    `sample_step` tuple is used.  For vectors the range of the magnitude
+    is returned and the lower limit is zero if there are no NaNs.
+    """
+    if sample_step > 1:
+        x = x[::sample_step]
+    if attr == 'scalars':
+        if sample_step > 1:
+            x0 = x[:, 0] if x.ndim > 1 else x
+            lo, hi = np.min(x0), np.max(x0)
+        else:
+            # This is a single pass and VTK caches the result.
+            lo, hi = x.VTKObject.GetRange()
+        if np.isnan(lo) or np.isnan(hi) or lo > hi:
+            return [float(np.nanmin(x)), float(np.nanmax(x))]
+        return [float(lo), float(hi)]
+    else:
+        x = np.asarray(x, dtype=float)
+        mag2 = np.einsum('ij,ij->i', x, x)
+        hi = np.max(mag2)
+        if np.isnan(hi):
+            return [float(np.sqrt(np.nanmin(mag2))),
+                    float(np.sqrt(np.nanmax(mag2)))]
+        return [0.0, float(np.sqrt(hi))]
+
+
 class DataSetHelper(object):
-    def __init__(self, input):
+    """Helper to compute the ranges, center and bounds of a dataset.
+
+    The ranges computed by `get_range` are cached for each data array
+    until the array is modified.  If `sample_step` is more than one the
+    ranges are computed from every `sample_step` value of the arrays.
+    This is much faster for large data and is useful for interactive use
+    but the range may be smaller than the actual one.
+    """
+    def __init__(self, input, sample_step=1):
         self.dataset = dsa.WrapDataObject(
             tvtk.to_vtk(get_new_output(input, update=True))
         )
         self._composite = isinstance(self.dataset, dsa.CompositeDataSet)
         self._scalars = None
         self._vectors = None
+        self.sample_step = max(int(sample_step), 1)
 
     def _find_attr_name_for_composite_data(self, attr, mode):
         prop = 'PointData' if mode == 'point' else 'CellData'
@@ -80,21 +133,25 @@ class DataSetHelper(object):
                 max_norm = np.sqrt(algs.max(algs.sum(x*x, axis=1)))
                 res = [0.0, max_norm]
         else:
-            has_nan = np.isnan(x).any()
-            if attr == 'scalars':
-                if has_nan:
-                    res = [float(np.nanmin(x)), float(np.nanmax(x))]
-                else:
-                    res = list(x.GetRange())
-            else:
-                if has_nan:
-                    d_mag = np.sqrt((x*x).sum(axis=1))
-                    res = [float(np.nanmin(d_mag)),
-                           float(np.nanmax(d_mag))]
-                else:
-                    res = [0.0, x.GetMaxNorm()]
+            res = self._get_cached_range(x, attr)
         return name, res
 
+    def _get_cached_range(self, x, attr):
+        vtk_arr = x.VTKObject
+        step = self.sample_step
+        key = (vtk_arr.__this__, attr, step)
+        mtime = vtk_arr.GetMTime()
+        cached = _range_cache.get(key)
+        if cached is not None and cached[0] == mtime:
+            _range_cache.move_to_end(key)
+            return list(cached[1])
+        res = _compute_range(x, attr, step)
+        _range_cache[key] = (mtime, tuple(res))
+        _range_cache.move_to_end(key)
+        while len(_range_cache) > _RANGE_CACHE_SIZE:
+            _range_cache.popitem(last=False)
+        return res
+
     def get_center(self):
         """Return the center of the data.
         """
@@ -3,7 +3,7 @@
 # License: BSD Style.
 
 # Enthought library imports.
-from tvtk.tools.tvtk_doc import TVTKFilterChooser, TVTK_FILTERS
+from tvtk.tools import tvtk_doc
 
 # Local imports.
 from mayavi.filters.filter_base import FilterBase
@@ -63,7 +63,7 @@ class UserDefined(FilterBase):
     # Non-public interface.
     ######################################################################
     def _choose_filter(self):
-        chooser = TVTKFilterChooser()
+        chooser = tvtk_doc.TVTKFilterChooser()
         chooser.edit_traits(kind='livemodal')
         obj = chooser.object
         if obj is None:
@@ -73,7 +73,7 @@ class UserDefined(FilterBase):
     def _check_object(self, obj):
         if obj is None:
             return False
-        if obj.__class__.__name__ in TVTK_FILTERS:
+        if obj.__class__.__name__ in tvtk_doc.TVTK_FILTERS:
             return True
         return False
 
@@ -83,20 +83,20 @@ class Script(HasTraits):
         """
         return self.engine.new_scene()
 
-    def load_visualization(self, fname):
+    def load_visualization(self, fname, data_store=None):
         """Given a file/file name this loads the visualization.
         """
         try:
-            self.engine.load_visualization(fname)
+            self.engine.load_visualization(fname, data_store=data_store)
         except:
             exception()
 
-    def save_visualization(self, fname):
+    def save_visualization(self, fname, data_store=None):
         """Given a file or a file name, this saves the current
         visualization to the file.
         """
         try:
-            self.engine.save_visualization(fname)
+            self.engine.save_visualization(fname, data_store=data_store)
         except:
             exception()
 
@@ -11,7 +11,7 @@ from vtk.util import vtkConstants
 
 # Enthought library imports
 from traits.api import (Instance, Trait, Str, Bool, Button, DelegatesTo, List,
-                        Int, OBJECT_IDENTITY_COMPARE)
+                        Int, Dict, OBJECT_IDENTITY_COMPARE)
 from traitsui.api import View, Group, Item
 from tvtk.api import tvtk
 from tvtk.array_handler import array2vtk, get_vtk_array_type
@@ -132,6 +132,11 @@ class ArraySource(Source):
     # Specify the order of dimensions. The default is: [0, 1, 2]
     dimensions_order = List(Int, [0, 1, 2])
 
+    # The VTK arrays that hold a copy of the scalar/vector data, keyed on
+    # 'scalars'/'vectors'.  When new data of the same shape and type is
+    # set, it is copied into these instead of creating new arrays.
+    _vtk_buffers = Dict
+
     # Our view.
     view = View(Group(Item(name='transpose_input_array'),
                       Item(name='scalar_name'),
@@ -165,6 +170,7 @@ class ArraySource(Source):
     def __get_pure_state__(self):
         d = super(ArraySource, self).__get_pure_state__()
         d.pop('image_data', None)
+        d.pop('_vtk_buffers', None)
         return d
 
     ######################################################################
@@ -234,12 +240,64 @@ class ArraySource(Source):
     def _image_data_changed(self, value):
         self.configure_input_data(self.change_information_filter, value)
 
+    def _get_vtk_layout(self, data, kind):
+        """Return a view of the given scalar/vector `data` laid out in the
+        order VTK needs (without flattening it).
+        """
+        if kind == 'scalars':
+            if self.transpose_input_array:
+                return np.transpose(data)
+            return data
+        if len(data.shape) == 3:
+            data = np.reshape(data, data.shape[:2] + (1, 3))
+        if self.transpose_input_array:
+            return np.transpose(data, (2, 1, 0, 3))
+        return data
+
+    def _save_vtk_buffer(self, data, kind):
+        """Remember the VTK array just set for `data` if it holds a copy
+        of the data so it may be updated in-place later.
+        """
+        self._vtk_buffers.pop(kind, None)
+        vtk_arr = getattr(self.image_data.point_data, kind)
+        buffer = vtk_arr.to_array()
+        if np.may_share_memory(buffer, data):
+            # VTK uses the user's data, this must not be overwritten.
+            return
+        self._vtk_buffers[kind] = (
+            tvtk.to_vtk(vtk_arr), buffer, data.shape, data.dtype
+        )
+
+    def _update_in_place(self, data, kind):
+        """Copy `data` into the existing VTK array if it has the same shape
+        and type as the previous data.  Returns True if this was done.
+        """
+        info = self._vtk_buffers.get(kind)
+        if info is None:
+            return False
+        vtk_arr, buffer, shape, dtype = info
+        pd = tvtk.to_vtk(self.image_data.point_data)
+        current = pd.GetScalars() if kind == 'scalars' else pd.GetVectors()
+        if current is not vtk_arr or data.shape != shape or \
+                data.dtype != dtype:
+            return False
+        layout = self._get_vtk_layout(data, kind)
+        np.copyto(np.reshape(buffer, layout.shape), layout)
+        vtk_arr.Modified()
+        self.image_data.modified()
+        self.change_information_filter.update()
+        self.data_changed = True
+        return True
+
     def _scalar_data_changed(self, data):
         img_data = self.image_data
         if data is None:
             img_data.point_data.scalars = None
+            self._vtk_buffers.pop('scalars', None)
             self.data_changed = True
             return
+        if self._update_in_place(data, 'scalars'):
+            return
         dims = list(data.shape)
         if len(dims) == 2:
             dims.append(1)
@@ -256,11 +314,11 @@ class ArraySource(Source):
             else:
                 update_extent = [0, dims[dim0]-1, 0, dims[dim1]-1, 0, dims[dim2]-1]
                 self.change_information_filter.set_update_extent(update_extent)
-        if self.transpose_input_array:
-            img_data.point_data.scalars = np.ravel(np.transpose(data))
-        else:
-            img_data.point_data.scalars = np.ravel(data)
+        img_data.point_data.scalars = np.ravel(
+            self._get_vtk_layout(data, 'scalars')
+        )
         img_data.point_data.scalars.name = self.scalar_name
+        self._save_vtk_buffer(data, 'scalars')
         # This is very important and if not done can lead to a segfault!
         typecode = data.dtype
         if is_old_pipeline():
@@ -281,8 +339,12 @@ class ArraySource(Source):
         img_data = self.image_data
         if data is None:
             img_data.point_data.vectors = None
+            self._vtk_buffers.pop('vectors', None)
             self.data_changed = True
             return
+        if self._update_in_place(data, 'vectors'):
+            return
+        orig_data = data
         dims = list(data.shape)
         if len(dims) == 3:
             dims.insert(2, 1)
@@ -305,6 +367,7 @@ class ArraySource(Source):
             data_t = data
         img_data.point_data.vectors = np.reshape(data_t, (sz//3, 3))
         img_data.point_data.vectors.name = self.vector_name
+        self._save_vtk_buffer(orig_data, 'vectors')
         if is_old_pipeline():
             img_data.update() # This sets up the extents correctly.
         else:
@@ -326,6 +389,7 @@ class ArraySource(Source):
             self.data_changed = True
 
     def _transpose_input_array_changed(self, value):
+        self._vtk_buffers.clear()
         if self.scalar_data is not None:
             self._scalar_data_changed(self.scalar_data)
         if self.vector_data is not None:
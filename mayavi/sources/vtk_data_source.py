@@ -1,6 +1,6 @@
 """This source manages a VTK dataset given to it.  When this source is
 pickled or persisted, it saves the data given to it in the form of a
-gzipped string.
+compressed binary string.
 """
 # Author: Prabhu Ramachandran <prabhu_r@users.sf.net>
 # Copyright (c) 2005-2020, Enthought, Inc.
@@ -9,6 +9,7 @@ gzipped string.
 import sys
 import os
 import tempfile
+import zlib
 
 import numpy as np
 
@@ -21,10 +22,12 @@ from apptools.persistence.state_pickler \
 # Local imports.
 from tvtk.api import tvtk
 from tvtk import messenger
-from tvtk.array_handler import array2vtk
+from tvtk import vtk_module as vtk
+from tvtk.array_handler import array2vtk, vtk2array
 from tvtk.common import is_old_pipeline, configure_input_data
 from mayavi.core.source import Source
 from mayavi.core.common import handle_children_state
+from mayavi.core.data_store import get_active_data_store
 from mayavi.core.trait_defs import DEnum
 from mayavi.core.pipeline_info import (PipelineInfo,
                                        get_tvtk_dataset_name)
@@ -62,6 +65,105 @@ def write_dataset_to_string(data):
     return sdata
 
 
+def read_dataset_from_string(sdata):
+    """Given an ASCII string produced by `write_dataset_to_string`,
+    return the dataset.
+    """
+    r = tvtk.DataSetReader(read_from_input_string=1, input_string=sdata)
+    warn = r.global_warning_display
+    r.global_warning_display = 0
+    r.update()
+    r.global_warning_display = warn
+    return r.output
+
+
+# The header of the strings produced by `write_dataset_to_bytes`.  The
+# ASCII data saved by older versions is gzipped and never starts with
+# this.
+BINARY_HEADER = b'MAYAVI_VTK_BINARY\n'
+
+
+def write_dataset_to_bytes(data, level=1):
+    """Given a dataset, convert the dataset to a zlib compressed binary
+    string that can be stored for persistence.  The `level` is the
+    zlib compression level.
+
+    Returns `None` if the dataset cannot be converted, in which case
+    `write_dataset_to_string` should be used instead.
+    """
+    communicator = getattr(vtk, 'vtkCommunicator', None)
+    if communicator is None:
+        return None
+    buffer = vtk.vtkCharArray()
+    if not communicator.MarshalDataObject(tvtk.to_vtk(data), buffer):
+        return None
+    header = BINARY_HEADER + data.class_name.encode('ascii') + b'\n'
+    return header + zlib.compress(vtk2array(buffer), level)
+
+
+def read_dataset_from_bytes(z):
+    """Given a string (or any buffer) produced by
+    `write_dataset_to_bytes`, return the dataset.
+    """
+    z = memoryview(z)
+    header = bytes(z[:len(BINARY_HEADER) + 256])
+    header_end = header.index(b'\n', len(BINARY_HEADER))
+    class_name = header[len(BINARY_HEADER):header_end].decode('ascii')
+    raw = zlib.decompress(z[header_end + 1:])
+    raw = np.frombuffer(raw, np.int8)
+    buffer = array2vtk(raw, vtk.vtkCharArray())
+    data = getattr(vtk, class_name)()
+    if not vtk.vtkCommunicator.UnMarshalDataObject(buffer, data):
+        raise ValueError('Unable to read the %s dataset.' % class_name)
+    return tvtk.to_tvtk(data)
+
+
+# The header of the references to the data saved in a `DataStore`.
+REFERENCE_HEADER = b'MAYAVI_DATA_REFERENCE\n'
+
+
+def save_dataset_to_store(data, store):
+    """Save the dataset in the given `DataStore` unless it was already
+    saved and return a reference to it.
+    """
+    vtk_obj = tvtk.to_vtk(data)
+    token = ('vtk_dataset', vtk_obj.__this__, vtk_obj.GetMTime())
+    key = store.get_key(token)
+    if key is None:
+        z = write_dataset_to_bytes(data)
+        if z is None:
+            z = gzip_string(write_dataset_to_string(data).encode('ascii'))
+        key = store.put(z)
+        store.set_key(token, key)
+    return REFERENCE_HEADER + key.encode('ascii')
+
+
+def load_dataset_from_store(reference, store):
+    """Given a reference returned by `save_dataset_to_store`, return the
+    dataset.  The data is read only once from the store, the datasets
+    returned for the same reference share it.
+    """
+    key = reference[len(REFERENCE_HEADER):].decode('ascii')
+    data = store.get_object(key)
+    if data is None:
+        mm = store.open(key)
+        try:
+            if mm[:len(BINARY_HEADER)] == BINARY_HEADER:
+                data = read_dataset_from_bytes(mm)
+            else:
+                data = read_dataset_from_string(
+                    gunzip_string(mm[:]).decode('ascii')
+                )
+        finally:
+            mm.close()
+        store.set_object(key, data)
+    # Every source gets its own dataset so attributes can be changed
+    # independently.
+    result = type(data)()
+    result.shallow_copy(data)
+    return result
+
+
 ######################################################################
 # `VTKDataSource` class
 ######################################################################
@@ -69,7 +171,7 @@ class VTKDataSource(Source):
 
     """This source manages a VTK dataset given to it.  When this
     source is pickled or persisted, it saves the data given to it in
-    the form of a gzipped string.
+    the form of a compressed binary string.
 
     Note that if the VTK dataset has changed internally and you need
     to notify the mayavi pipeline to flush the data just call the
@@ -162,29 +264,39 @@ class VTKDataSource(Source):
             d.pop('_' + name + '_list', None)
             d.pop('_' + name + '_name', None)
         data = self.data
-        if data is not None:
-            sdata = write_dataset_to_string(data)
-            if sys.version_info[0] > 2:
-                z = gzip_string(sdata.encode('ascii'))
-            else:
-                z = gzip_string(sdata)
+        store = get_active_data_store()
+        if data is not None and store is not None:
+            d['data'] = save_dataset_to_store(data, store)
+        elif data is not None:
+            z = write_dataset_to_bytes(data)
+            if z is None:
+                sdata = write_dataset_to_string(data)
+                if sys.version_info[0] > 2:
+                    z = gzip_string(sdata.encode('ascii'))
+                else:
+                    z = gzip_string(sdata)
             d['data'] = z
         return d
 
     def __set_pure_state__(self, state):
         z = state.data
         if z is not None:
-            if sys.version_info[0] > 2:
-                d = gunzip_string(z).decode('ascii')
+            if isinstance(z, bytes) and z.startswith(REFERENCE_HEADER):
+                store = get_active_data_store()
+                if store is None:
+                    raise IOError(
+                        'The data of this visualization is saved in a '
+                        'separate data store, pass it to load_visualization.'
+                    )
+                self.data = load_dataset_from_store(z, store)
+            elif isinstance(z, bytes) and z.startswith(BINARY_HEADER):
+                self.data = read_dataset_from_bytes(z)
             else:
-                d = gunzip_string(z)
-            r = tvtk.DataSetReader(read_from_input_string=1,
-                                   input_string=d)
-            warn = r.global_warning_display
-            r.global_warning_display = 0
-            r.update()
-            r.global_warning_display = warn
-            self.data = r.output
+                if sys.version_info[0] > 2:
+                    d = gunzip_string(z).decode('ascii')
+                else:
+                    d = gunzip_string(z)
+                self.data = read_dataset_from_string(d)
         # Now set the remaining state without touching the children.
         set_state(self, state, ignore=['children', 'data'])
         # Setup the children.
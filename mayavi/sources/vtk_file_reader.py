@@ -65,6 +65,7 @@ class VTKFileReader(VTKXMLFileReader):
             self.name = 'No VTK file'
             return
         else:
+            self._use_prefetched_reader(value)
             self.reader.file_name = value
             self.update()
 
@@ -175,6 +175,9 @@ class VTKXMLFileReader(FileDataSource):
     # Toggles if this is the first time this object has been used.
     _first = Bool(True)
 
+    # The timesteps may be read in advance, see `_make_read_task`.
+    _supports_prefetch = Bool(True)
+
     ######################################################################
     # `object` interface
     ######################################################################
@@ -223,6 +226,10 @@ class VTKXMLFileReader(FileDataSource):
         if not self.running:
             return
 
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown()
+            self._prefetcher = None
+
         # Call the parent method to do its thing.
         super(VTKXMLFileReader, self).stop()
 
@@ -285,6 +292,34 @@ class VTKXMLFileReader(FileDataSource):
     ######################################################################
     # Non-public interface
     ######################################################################
+    def _make_read_task(self, file_name):
+        # Use a new reader with the same settings as ours.
+        reader = self.reader.__class__()
+        reader.__setstate__(self.reader.__getstate__())
+        reader.file_name = file_name
+
+        def _read():
+            reader.update()
+            return reader, self._get_reader_nbytes(reader)
+        return _read
+
+    def _get_reader_nbytes(self, reader):
+        output = tvtk.to_vtk(reader).GetOutputDataObject(0)
+        return output.GetActualMemorySize()*1024
+
+    def _use_prefetched_reader(self, file_name):
+        """Swap in the reader that read `file_name` in the background if
+        there is one.  The current reader is cached for later use.
+        """
+        reader = self._get_prefetched(file_name)
+        if reader is None:
+            return
+        old = self.reader
+        self.reader = reader
+        old_name = old.file_name
+        if old_name and old.get_output_data_object(0) is not None:
+            self._prefetcher.put(old_name, old, self._get_reader_nbytes(old))
+
     def _file_path_changed(self, fpath):
         value = fpath.get()
         if len(value) == 0:
@@ -293,6 +328,7 @@ class VTKXMLFileReader(FileDataSource):
             if self.reader is None:
                 d_type = find_file_data_type(fpath.get())
                 self.reader = eval('tvtk.XML%sReader()'%d_type)
+            self._use_prefetched_reader(value)
             reader = self.reader
             reader.file_name = value
             reader.update()
@@ -366,5 +402,7 @@ class VTKXMLFileReader(FileDataSource):
         return ret
 
     def _refresh_fired(self):
+        if self._prefetcher is not None:
+            self._prefetcher.clear()
         self.reader.modified()
         self.update_data()
@@ -9,6 +9,10 @@ import os.path
 
 from traits.api import HasTraits, Any, Event, Callable
 
+# Used by the tests which only measure performance.
+from tvtk.tests.common import benchmark, report
+
+
 def fixpath(filename):
     """Given a relative file path it sets the path relative to this
     directory.  This allows us to run the tests from other directories
@@ -7,13 +7,17 @@ Tests for the ArraySource class.
 
 import unittest
 import pickle
+import time
 import numpy
 
 # Enthought library imports.
 from traits.api import TraitError
+from mayavi import mlab
+from mayavi.core.registry import registry
 from mayavi.sources.array_source import ArraySource
 from mayavi.modules.outline import Outline
 from mayavi.modules.surface import Surface
+from mayavi.tests.common import benchmark, report
 
 
 class TestArraySource(unittest.TestCase):
@@ -294,5 +298,144 @@ class TestArraySourceAttributes(unittest.TestCase):
         self.assertEqual(src.image_data.point_data.get_array('s2'), None)
 
 
+class TestArraySourceInPlace(unittest.TestCase):
+    def setUp(self):
+        self.src = ArraySource()
+
+    def _get_vtk_arrays(self):
+        pd = self.src.image_data.point_data
+        return pd.scalars._vtk_obj, pd.vectors._vtk_obj
+
+    def _check_data(self, s, v):
+        src = self.src
+        pd = src.image_data.point_data
+        s_expect = numpy.ravel(numpy.transpose(s))
+        v_expect = numpy.reshape(numpy.transpose(v, (2, 1, 0, 3)), (-1, 3))
+        self.assertTrue(numpy.all(pd.scalars.to_array() == s_expect))
+        self.assertTrue(numpy.all(pd.vectors.to_array() == v_expect))
+        self.assertEqual(pd.scalars.range, (s.min(), s.max()))
+
+    def test_same_shape_updates_in_place(self):
+        """Test if data of the same shape and type is copied in-place."""
+        src = self.src
+        s = numpy.random.random((3, 4, 5))
+        v = numpy.random.random((3, 4, 5, 3))
+        src.trait_set(scalar_data=s, vector_data=v)
+        self._check_data(s, v)
+        vtk_arrays = self._get_vtk_arrays()
+        events = []
+        src.on_trait_change(lambda: events.append(1), 'data_changed')
+
+        s_copy = s.copy()
+        s1 = s + 1.0
+        v1 = v + 1.0
+        src.trait_set(scalar_data=s1, vector_data=v1)
+        self._check_data(s1, v1)
+        self.assertEqual(len(events), 2)
+        s_arr, v_arr = self._get_vtk_arrays()
+        self.assertIs(s_arr, vtk_arrays[0])
+        self.assertIs(v_arr, vtk_arrays[1])
+        self.assertEqual(tuple(src.image_data.dimensions), (3, 4, 5))
+        # The user's data is not changed.
+        self.assertTrue(numpy.all(s == s_copy))
+
+        # Changing the shape or type creates new arrays.
+        s2 = numpy.random.random((3, 4, 5)).astype('f')
+        src.scalar_data = s2
+        self._check_data(s2, v1)
+        self.assertIsNot(self._get_vtk_arrays()[0], vtk_arrays[0])
+        src.trait_set(scalar_data=None, vector_data=None)
+        src.scalar_data = numpy.random.random((2, 3, 4))
+        self.assertEqual(tuple(src.image_data.dimensions), (2, 3, 4))
+
+    def test_2d_vectors_in_place(self):
+        """Test if 2D vector data is updated in-place correctly."""
+        src = self.src
+        v = numpy.random.random((3, 4, 3))
+        src.vector_data = v
+        v_arr = src.image_data.point_data.vectors._vtk_obj
+        v1 = v*2
+        src.vector_data = v1
+        pd = src.image_data.point_data
+        self.assertIs(pd.vectors._vtk_obj, v_arr)
+        expect = numpy.reshape(numpy.transpose(v1, (1, 0, 2)), (-1, 3))
+        self.assertTrue(numpy.all(pd.vectors.to_array() == expect))
+
+    def test_no_transpose_does_not_overwrite_user_data(self):
+        """Test if data shared with VTK is never written to."""
+        src = self.src
+        src.transpose_input_array = False
+        s = numpy.random.random((3, 4, 5))
+        src.scalar_data = s
+        s_copy = s.copy()
+        s1 = numpy.random.random((3, 4, 5))
+        src.scalar_data = s1
+        self.assertTrue(numpy.all(s == s_copy))
+        scalars = src.image_data.point_data.scalars.to_array()
+        self.assertTrue(numpy.all(scalars == numpy.ravel(s1)))
+
+    def test_transpose_change(self):
+        """Test if changing transpose_input_array re-lays out the data."""
+        src = self.src
+        s = numpy.random.random((3, 4, 5))
+        src.scalar_data = s
+        src.transpose_input_array = False
+        scalars = src.image_data.point_data.scalars.to_array()
+        self.assertTrue(numpy.all(scalars == numpy.ravel(s)))
+
+    def test_pickle(self):
+        """Test if the cached arrays are not pickled."""
+        src = self.src
+        src.scalar_data = numpy.random.random((3, 4, 5))
+        state = src.__get_pure_state__()
+        self.assertNotIn('_vtk_buffers', state)
+
+
+class TestArraySourceBenchmark(unittest.TestCase):
+    def setUp(self):
+        self.backend = mlab.options.backend
+        mlab.options.backend = 'test'
+
+    def tearDown(self):
+        mlab.options.backend = self.backend
+        for engine in list(registry.engines):
+            registry.unregister_engine(engine)
+
+    @benchmark
+    def test_benchmark_contour3d_scalars(self):
+        """Benchmark the frames/sec when animating contour3d scalars."""
+        n = 128
+        x, y, z = numpy.ogrid[-1:1:n*1j, -1:1:n*1j, -1:1:n*1j]
+        r = x*x + y*y + z*z
+        frames = [r + 0.1*i for i in range(2)]
+        c = mlab.contour3d(r, contours=[0.5])
+        ms = c.mlab_source
+        m_data = ms.m_data
+        for in_place in (False, True):
+            n_frames = 10
+            t1 = time.perf_counter()
+            for i in range(n_frames):
+                if not in_place:
+                    m_data._vtk_buffers.clear()
+                ms.scalars = frames[i % 2]
+            dt = time.perf_counter() - t1
+            report("contour3d %d^3 (in_place=%s): %.1f frames/sec" %
+                   (n, in_place, n_frames/dt))
+        mlab.close(all=True)
+
+        # The source alone.
+        src = ArraySource(scalar_data=frames[0])
+        for in_place in (False, True):
+            n_frames = 10
+            t1 = time.perf_counter()
+            for i in range(n_frames):
+                if not in_place:
+                    src._vtk_buffers.clear()
+                src.scalar_data = frames[(i + 1) % 2]
+            dt = time.perf_counter() - t1
+            report("ArraySource %d^3 (in_place=%s): %.1f frames/sec" %
+                   (n, in_place, n_frames/dt))
+
+
 if __name__ == '__main__':
     unittest.main()
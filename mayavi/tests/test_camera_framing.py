@@ -0,0 +1,189 @@
+"""
+Tests for the framing of the view from the geometry of the objects.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tvtk.api import tvtk
+from mayavi.tools import camera
+from mayavi.tests.common import benchmark, report
+
+
+class FakeScene(object):
+    def __init__(self, renderer):
+        self.renderer = self._renderer = renderer
+        self.camera = renderer.active_camera
+        self.background = (0.0, 0.0, 0.0)
+        self.disable_render = False
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+
+    def reset_zoom(self):
+        self.renderer.reset_camera()
+        self.render()
+
+
+class FakeFigure(object):
+    def __init__(self, size=(400, 300)):
+        self.renderer = tvtk.Renderer()
+        self.window = tvtk.RenderWindow(size=size, off_screen_rendering=True)
+        self.window.add_renderer(self.renderer)
+        self.scene = FakeScene(self.renderer)
+
+    def add_sphere(self, **kw):
+        source = tvtk.SphereSource(theta_resolution=30, phi_resolution=30)
+        mapper = tvtk.PolyDataMapper(input_connection=source.output_port)
+        actor = tvtk.Actor(mapper=mapper, **kw)
+        self.renderer.add_actor(actor)
+        return source, actor
+
+
+def world_points(source, actor):
+    source.update()
+    points = source.output.points.to_array()
+    matrix = actor.matrix.to_array()
+    return points.dot(matrix[:3, :3].T) + matrix[:3, 3]
+
+
+def fit_ratio(extent, focus):
+    x_min, x_max, y_min, y_max, w, h = extent
+    x_focus, y_focus = focus
+    return max((x_focus - x_min) / x_focus, (x_max - x_focus) / (w - x_focus),
+               (y_focus - y_min) / y_focus, (y_max - y_focus) / (h - y_focus))
+
+
+class TestProjectedBounds(unittest.TestCase):
+    def setUp(self):
+        camera.clear_bounds_cache()
+        self.figure = FakeFigure()
+        self.source, self.actor = self.figure.add_sphere(
+            position=(1, 2, 3), orientation=(10, 20, 30), scale=(1, 2, 1)
+        )
+        self.figure.renderer.reset_camera()
+
+    def test_projection_matches_world_to_display(self):
+        ren = self.figure.renderer
+        points = world_points(self.source, self.actor)[::37]
+        x, y = camera._project(ren, points)
+        for point, xp, yp in zip(points, x, y):
+            ren.world_point = list(point) + [1.0]
+            ren.world_to_display()
+            np.testing.assert_allclose(ren.display_point[:2], (xp, yp))
+
+    def test_extent(self):
+        boxes = camera.get_projected_bounds(self.figure)
+        exact = camera.get_projected_bounds(self.figure, max_points=10**6)
+        self.assertEqual(boxes[4:], (400.0, 300.0))
+        x, y = camera._project(self.figure.renderer,
+                               world_points(self.source, self.actor))
+        np.testing.assert_allclose(exact[:4], (x.min(), x.max(),
+                                               y.min(), y.max()))
+        # The bounding box is larger than the object.
+        self.assertTrue(boxes[0] < exact[0] and boxes[1] > exact[1])
+        self.assertTrue(boxes[2] < exact[2] and boxes[3] > exact[3])
+        sampled = camera.get_projected_bounds(self.figure, max_points=50)
+        self.assertTrue(exact[0] <= sampled[0] and sampled[1] <= exact[1])
+
+    def test_nothing_visible(self):
+        self.actor.visibility = False
+        self.assertIsNone(camera.get_projected_bounds(self.figure))
+        self.actor.visibility = True
+        # An object behind the camera cannot be projected.
+        self.figure.renderer.active_camera.position = (1, 2, 3)
+        self.assertIsNone(camera.get_projected_bounds(self.figure))
+
+    def test_bounds_cache(self):
+        actor = tvtk.to_vtk(self.actor)
+        with mock.patch.object(camera, '_sample_points',
+                               wraps=camera._sample_points) as sample:
+            bounds, points = camera.get_prop_bounds(actor, 100)
+            self.assertEqual(camera.get_prop_bounds(actor, 100)[0], bounds)
+            self.assertEqual(sample.call_count, 1)
+            self.assertTrue(len(points) <= 100)
+            self.assertTrue(np.all(points >= np.array(bounds[::2]) - 1e-6))
+            self.assertTrue(np.all(points <= np.array(bounds[1::2]) + 1e-6))
+
+            # Changes upstream of the mapper and to the actor are seen.
+            self.source.radius = 2.0
+            bounds2 = camera.get_prop_bounds(actor, 100)[0]
+            self.assertEqual(sample.call_count, 2)
+            self.assertAlmostEqual(bounds2[1] - bounds2[0],
+                                   4*(bounds[1] - bounds[0]), places=6)
+            self.actor.position = (0, 0, 0)
+            bounds3 = camera.get_prop_bounds(actor, 100)[0]
+            self.assertEqual(sample.call_count, 3)
+            self.assertEqual(bounds3, actor.GetBounds())
+
+
+class TestViewAuto(unittest.TestCase):
+    def setUp(self):
+        camera.clear_bounds_cache()
+        self.figure = FakeFigure()
+        self.figure.add_sphere(scale=(4, 1, 1))
+        self.figure.add_sphere(position=(0, 2, 1))
+
+    def test_geometry_framing(self):
+        f = self.figure
+        with mock.patch('mayavi.tools.figure.screenshot') as screenshot:
+            camera.view(30, 60, distance='auto', figure=f)
+        self.assertFalse(screenshot.called)
+        self.assertEqual(f.scene.renders, 1)
+
+        # The objects fill the frame, with a margin of about 10%, the
+        # perspective makes the closer objects a little larger.
+        extent = camera.get_projected_bounds(f, max_points=10**6)
+        cen = f.renderer.compute_visible_prop_bounds()
+        cen = (np.array(cen[1::2]) + cen[::2]) * 0.5
+        x, y = camera._project(f.renderer, cen)
+        ratio = fit_ratio(extent, (x[0], y[0]))
+        self.assertTrue(0.85 < ratio < 0.98, ratio)
+
+    def test_pixel_fallback(self):
+        f = self.figure
+        image = np.zeros((300, 400, 4))
+        image[30:100, 100:300] = 1.0
+        with mock.patch.object(camera, 'get_projected_bounds',
+                               return_value=None), \
+                mock.patch('mayavi.tools.figure.screenshot',
+                           return_value=image) as screenshot:
+            camera.view(30, 60, distance='auto', figure=f)
+            extent = camera.get_outline_bounds(figure=f)
+        self.assertIs(screenshot.call_args[1]['figure'], f)
+        self.assertEqual(extent, (100, 299, 30, 99, 400.0, 300.0))
+        self.assertEqual(f.scene.renders, 2)
+
+    @benchmark
+    def test_benchmark_framing(self):
+        """Benchmark the framing from the geometry against the pixels of
+        a screenshot at several window sizes."""
+        for size in ((640, 480), (1920, 1080), (3840, 2160)):
+            f = FakeFigure(size)
+            f.add_sphere(scale=(4, 1, 1))
+            f.renderer.reset_camera()
+            image = np.zeros((size[1], size[0], 4))
+            image[size[1]//4:size[1]//2, size[0]//3:size[0]//2] = 1.0
+            n = 20
+            with mock.patch('mayavi.tools.figure.screenshot',
+                            return_value=image):
+                t1 = time.perf_counter()
+                for i in range(n):
+                    camera.get_outline_bounds(figure=f)
+                t2 = time.perf_counter()
+            for i in range(n):
+                camera.get_projected_bounds(f, max_points=camera._FIT_POINTS)
+            t3 = time.perf_counter()
+            report("%dx%d: pixels %.2f ms (without the readback), "
+                   "geometry %.2f ms"
+                   % (size + (1e3*(t2 - t1)/n, 1e3*(t3 - t2)/n)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for the VTK filters used by the Contour component.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import time
+import unittest
+
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.common import configure_input_data
+from mayavi.components.contour import get_contour_backend
+from mayavi.core.null_engine import NullEngine
+from mayavi.modules.iso_surface import IsoSurface
+from mayavi.sources.vtk_data_source import VTKDataSource
+from mayavi.tests.common import benchmark, report
+
+
+def make_image_data(n=20, dims=None):
+    dims = dims or (n, n, n)
+    x, y, z = np.ogrid[[slice(-1, 1, d*1j) if d > 1 else slice(0, 0, 1j)
+                        for d in dims]]
+    s = x*x + y*y + z*z
+    data = tvtk.ImageData(dimensions=dims, spacing=(0.1, 0.2, 0.3))
+    data.point_data.scalars = s.ravel(order='F')
+    data.point_data.scalars.name = 's'
+    other = tvtk.FloatArray(name='other')
+    other.from_array(np.sin(3*s).ravel(order='F'))
+    data.point_data.add_array(other)
+    return data
+
+
+def to_unstructured_grid(data):
+    f = tvtk.AppendFilter()
+    configure_input_data(f, data)
+    f.update()
+    return f.output
+
+
+def to_structured_grid(image):
+    sgrid = tvtk.StructuredGrid(dimensions=image.dimensions)
+    points = [image.get_point(i) for i in range(image.number_of_points)]
+    sgrid.points = np.array(points)
+    sgrid.point_data.shallow_copy(image.point_data)
+    return sgrid
+
+
+def contour_with(filter_class, data, values, **kw):
+    cf = filter_class(**kw)
+    configure_input_data(cf, data)
+    cf.number_of_contours = len(values)
+    for i, v in enumerate(values):
+        cf.set_value(i, v)
+    cf.update()
+    return cf.output
+
+
+def get_array_names(output):
+    pd = output.point_data
+    return set(pd.get_array_name(i) for i in range(pd.number_of_arrays))
+
+
+def sorted_points(output):
+    points = output.points.to_array()
+    return points[np.lexsort(points.T[::-1])]
+
+
+class TestContourBackends(unittest.TestCase):
+    def setUp(self):
+        e = NullEngine()
+        e.start()
+        e.new_scene()
+        self.e = e
+
+    def tearDown(self):
+        self.e.stop()
+
+    def contour(self, data, values=(0.5,), **kw):
+        src = VTKDataSource(data=data)
+        self.e.add_source(src)
+        iso = IsoSurface()
+        iso.contour.trait_set(**kw)
+        self.e.add_module(iso)
+        iso.contour.contours = list(values)
+        return iso.contour
+
+    def check_output(self, contour, data, values=(0.5,)):
+        output = contour.outputs[0].output
+        expected = contour_with(tvtk.ContourFilter, data, values)
+        self.assertTrue(output.number_of_points > 0)
+        self.assertEqual(output.number_of_points, expected.number_of_points)
+        self.assertEqual(output.number_of_cells, expected.number_of_cells)
+        np.testing.assert_allclose(sorted_points(output),
+                                   sorted_points(expected), atol=1e-6)
+        self.assertEqual(get_array_names(output), get_array_names(expected))
+
+    def test_image_data_uses_flying_edges(self):
+        data = make_image_data()
+        contour = self.contour(data, (0.5, 0.8))
+        self.assertEqual(contour.active_backend, 'flying_edges_3d')
+        self.assertTrue(contour.contour_filter.is_a('vtkFlyingEdges3D'))
+        self.check_output(contour, data, (0.5, 0.8))
+        self.assertIn('Normals', get_array_names(contour.outputs[0].output))
+
+        # Auto contours are set on the filter.
+        contour.trait_set(auto_contours=True, number_of_contours=3)
+        self.assertEqual(contour.contour_filter.number_of_contours, 3)
+
+    def test_image_slice_uses_flying_edges_2d(self):
+        data = make_image_data(dims=(30, 20, 1))
+        contour = self.contour(data)
+        self.assertEqual(contour.active_backend, 'flying_edges_2d')
+        output = contour.outputs[0].output
+        expected = contour_with(tvtk.ContourFilter, data, [0.5])
+        np.testing.assert_allclose(sorted_points(output),
+                                   sorted_points(expected), atol=1e-6)
+        # vtkFlyingEdges2D only handles images in the XY plane.
+        data = make_image_data(dims=(30, 1, 20))
+        self.assertEqual(get_contour_backend(data), 'contour_filter')
+
+    def test_unstructured_grid_uses_contour_grid(self):
+        data = to_unstructured_grid(make_image_data())
+        contour = self.contour(data)
+        self.assertEqual(contour.active_backend, 'contour_grid')
+        self.check_output(contour, data)
+
+    def test_smp_contour_grid_is_explicit(self):
+        data = to_unstructured_grid(make_image_data())
+        contour = self.contour(data, backend='smp_contour_grid')
+        self.assertEqual(contour.active_backend, 'smp_contour_grid')
+        output = contour.outputs[0].output
+        expected = contour_with(tvtk.ContourFilter, data, [0.5])
+        self.assertEqual(output.number_of_cells, expected.number_of_cells)
+
+    def test_quadratic_cells_use_contour_filter(self):
+        data = tvtk.UnstructuredGrid(points=np.random.random((10, 3)))
+        data.insert_next_cell(tvtk.QuadraticTetra().cell_type, 10,
+                              list(range(10)))
+        data.point_data.scalars = np.linspace(0, 1, 10)
+        self.assertEqual(get_contour_backend(data), 'contour_filter')
+
+    def test_structured_grid_uses_contour_filter(self):
+        data = to_structured_grid(make_image_data())
+        contour = self.contour(data)
+        self.assertEqual(contour.active_backend, 'contour_filter')
+        self.check_output(contour, data)
+
+    def test_change_backend(self):
+        data = make_image_data()
+        contour = self.contour(data)
+        contour.backend = 'contour_filter'
+        self.assertEqual(contour.active_backend, 'contour_filter')
+        self.assertIs(contour.outputs[0], contour.contour_filter)
+        self.check_output(contour, data)
+        contour.filled_contours = True
+        self.assertEqual(contour.active_backend, 'banded_contour_filter')
+        contour.filled_contours = False
+        contour.backend = 'flying_edges'
+        self.assertEqual(contour.active_backend, 'flying_edges_3d')
+        self.check_output(contour, data)
+        # A backend that cannot handle the data falls back.
+        contour.backend = 'contour_grid'
+        self.assertEqual(contour.active_backend, 'contour_filter')
+
+    @benchmark
+    def test_benchmark_backends(self):
+        """Benchmark the backends against vtkContourFilter for each
+        dataset type.
+        """
+        image = make_image_data(100)
+        cases = [
+            ('ImageData', image, [tvtk.FlyingEdges3D]),
+            ('UnstructuredGrid', to_unstructured_grid(image),
+             [tvtk.ContourGrid, tvtk.SMPContourGrid]),
+            ('StructuredGrid', to_structured_grid(image), []),
+        ]
+        for name, data, classes in cases:
+            for cls in [tvtk.ContourFilter] + classes:
+                t1 = time.perf_counter()
+                contour_with(cls, data, [0.5])
+                t2 = time.perf_counter()
+                report("%16s %15s: %.4f s"
+                       % (name, cls.__name__, t2 - t1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
+import time
 import unittest
 import numpy as np
 
 from tvtk.api import tvtk
+from mayavi.core import utils
 from mayavi.core.utils import DataSetHelper
+from mayavi.tests.common import benchmark, report
 from vtk.numpy_interface import dataset_adapter as dsa
 
 
@@ -82,6 +85,112 @@ class TestDataSetHelper(unittest.TestCase):
         self.assertEqual(dsh.get_range(), (None, [0., 1.]))
         # XXX there is some wackiness here, no idea why this changes!
         self.assertEqual(dsh.get_range(), ('point_scalars', [0., 3.]))
+    def test_get_range_ignores_nans(self):
+        id_ = self._make_data()
+        s = np.arange(4, dtype=float)
+        s[1] = np.nan
+        id_.point_data.scalars = s
+        id_.point_data.scalars.name = 'ps'
+        v = np.ones((4, 3))
+        v[0] = np.nan
+        v[3] *= 2
+        id_.point_data.vectors = v
+        id_.point_data.vectors.name = 'pv'
+        dsh = DataSetHelper(id_)
+        self.assertEqual(dsh.get_range('scalars', 'point'), ('ps', [0., 3.]))
+        name, rng = dsh.get_range('vectors', 'point')
+        self.assertEqual(name, 'pv')
+        self.assertTrue(np.allclose(rng, [np.sqrt(3.0), 2*np.sqrt(3.0)]))
+
+    def test_get_range_is_cached(self):
+        # Given
+        utils.clear_range_cache()
+        id_ = self._make_data()
+        dsh = DataSetHelper(id_)
+        self.assertEqual(dsh.get_range('scalars', 'point'), ('ps', [0., 3.]))
+        self.assertEqual(len(utils._range_cache), 1)
+        key = list(utils._range_cache.keys())[0]
+
+        # When the data is changed in-place without calling modified.
+        scalars = id_.point_data.scalars
+        scalars.to_array()[0] = -1.0
+
+        # Then the cached value is used.
+        dsh = DataSetHelper(id_)
+        self.assertEqual(dsh.get_range('scalars', 'point'), ('ps', [0., 3.]))
+        self.assertEqual(len(utils._range_cache), 1)
+
+        # When
+        scalars.modified()
+
+        # Then
+        dsh = DataSetHelper(id_)
+        self.assertEqual(dsh.get_range('scalars', 'point'),
+                         ('ps', [-1., 3.]))
+        self.assertEqual(list(utils._range_cache.keys()), [key])
+        self.assertEqual(utils._range_cache[key][1], (-1., 3.))
+
+    def test_get_range_with_sample_step(self):
+        id_ = tvtk.ImageData(dimensions=(10, 1, 1))
+        s = np.arange(10, dtype=float)
+        id_.point_data.scalars = s
+        id_.point_data.scalars.name = 'ps'
+        v = np.zeros((10, 3))
+        v[:, 0] = s
+        id_.point_data.vectors = v
+        id_.point_data.vectors.name = 'pv'
+        dsh = DataSetHelper(id_, sample_step=4)
+        self.assertEqual(dsh.get_range('scalars', 'point'), ('ps', [0., 8.]))
+        self.assertEqual(dsh.get_range('vectors', 'point'), ('pv', [0., 8.]))
+        dsh = DataSetHelper(id_)
+        self.assertEqual(dsh.get_range('scalars', 'point'), ('ps', [0., 9.]))
+
+    @benchmark
+    def test_benchmark_get_range(self):
+        n = 100
+        id_ = tvtk.ImageData(dimensions=(n, n, n))
+        s = np.random.random(n**3)
+        id_.point_data.scalars = s
+        id_.point_data.scalars.name = 'ps'
+        id_.point_data.vectors = np.random.random((n**3, 3))
+        id_.point_data.vectors.name = 'pv'
+
+        def old_get_range(dsh):
+            # The uncached version computed on every call.
+            x = dsh.dataset.PointData['ps']
+            if np.isnan(x).any():
+                pass
+            x.GetRange()
+            x = dsh.dataset.PointData['pv']
+            if np.isnan(x).any():
+                pass
+            x.GetMaxNorm()
+
+        def new_get_range(dsh):
+            dsh.get_range('scalars', 'point')
+            dsh.get_range('vectors', 'point')
+
+        for label, func, step in (('uncached', old_get_range, 1),
+                                  ('fused', new_get_range, 1),
+                                  ('sampled', new_get_range, 16)):
+            t = 0.0
+            for i in range(5):
+                id_.point_data.scalars.modified()
+                id_.point_data.vectors.modified()
+                dsh = DataSetHelper(id_, sample_step=step)
+                t1 = time.perf_counter()
+                func(dsh)
+                t += time.perf_counter() - t1
+            report("get_range %s (%d points): %.4f seconds" %
+                   (label, n**3, t/5))
+        dsh = DataSetHelper(id_)
+        new_get_range(dsh)
+        dsh = DataSetHelper(id_)
+        t1 = time.perf_counter()
+        new_get_range(dsh)
+        report("get_range cached (%d points): %.6f seconds" %
+               (n**3, time.perf_counter() - t1))
+
 
 if __name__ == '__main__':
     unittest.main()
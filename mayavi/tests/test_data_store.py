@@ -0,0 +1,141 @@
+"""
+Tests for saving visualizations with their data in a DataStore.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from io import BytesIO
+from os.path import abspath
+
+import numpy as np
+
+from tvtk.api import tvtk
+from mayavi.core.api import DataStore
+from mayavi.core.null_engine import NullEngine
+from mayavi.modules.outline import Outline
+from mayavi.sources.vtk_data_source import VTKDataSource
+from mayavi.tests.common import benchmark, report
+
+
+def make_grid(n):
+    x, y, z = np.mgrid[0:1:n*1j, 0:1:n*1j, 0:1:n*1j]
+    data = tvtk.StructuredGrid(dimensions=x.shape)
+    data.points = np.c_[x.ravel(), y.ravel(), z.ravel()]
+    data.point_data.scalars = np.sin(x*y*z).ravel()
+    data.point_data.scalars.name = 'scalars'
+    return data
+
+
+class TestDataStore(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.engine = self.make_engine()
+
+    def tearDown(self):
+        self.engine.stop()
+        shutil.rmtree(self.root)
+
+    def make_engine(self):
+        e = NullEngine()
+        e.start()
+        return e
+
+    def add_scenes(self, engine, datasets):
+        for data in datasets:
+            engine.new_scene()
+            engine.add_source(VTKDataSource(data=data))
+            engine.add_module(Outline())
+
+    def save(self, engine, data_store=None):
+        f = BytesIO()
+        f.name = abspath('test.mv2')  # We simulate a file.
+        engine.save_visualization(f, data_store=data_store)
+        f.seek(0)
+        return f
+
+    def get_data(self, engine):
+        return [scene.children[0].data for scene in engine.scenes]
+
+    def test_shared_data_is_saved_once(self):
+        d1, d2 = make_grid(20), make_grid(21)
+        self.add_scenes(self.engine, [d1, d1, d2, d1])
+        store_dir = os.path.join(self.root, 'data')
+        store = DataStore(store_dir)
+
+        f = self.save(self.engine, store)
+        inline = self.save(self.engine)
+
+        self.assertEqual(len(os.listdir(store_dir)), 2)
+        self.assertTrue(len(f.getvalue()) < len(inline.getvalue())/2)
+
+        # Loading with a new store using the directory.
+        e = self.make_engine()
+        e.load_visualization(f, data_store=store_dir)
+        loaded = self.get_data(e)
+        self.assertEqual(len(loaded), 4)
+        for data, orig in zip(loaded, [d1, d1, d2, d1]):
+            np.testing.assert_array_equal(data.points.to_array(),
+                                          orig.points.to_array())
+            np.testing.assert_array_equal(
+                data.point_data.scalars.to_array(),
+                orig.point_data.scalars.to_array()
+            )
+        # Each source has its own dataset, sharing the arrays.
+        self.assertIsNot(loaded[0], loaded[1])
+        self.assertIs(loaded[0].points._vtk_obj, loaded[1].points._vtk_obj)
+        e.stop()
+
+    def test_modified_data_is_saved_again(self):
+        data = make_grid(5)
+        self.add_scenes(self.engine, [data])
+        store_dir = os.path.join(self.root, 'data')
+        store = DataStore(store_dir)
+        self.save(self.engine, store)
+        self.save(self.engine, store)
+        self.assertEqual(len(os.listdir(store_dir)), 1)
+
+        data.point_data.scalars = np.zeros(data.number_of_points)
+        data.point_data.scalars.name = 'scalars'
+        f = self.save(self.engine, store)
+        self.assertEqual(len(os.listdir(store_dir)), 2)
+
+        e = self.make_engine()
+        e.load_visualization(f, data_store=store)
+        self.assertEqual(self.get_data(e)[0].point_data.scalars.range,
+                         (0.0, 0.0))
+        e.stop()
+
+    def test_load_without_store_fails(self):
+        self.add_scenes(self.engine, [make_grid(5)])
+        f = self.save(self.engine, os.path.join(self.root, 'data'))
+        e = self.make_engine()
+        self.assertRaises(IOError, e.load_visualization, f)
+        e.stop()
+
+    @benchmark
+    def test_benchmark_shared_data(self):
+        """Compare saving and loading 20 scenes sharing one dataset."""
+        data = make_grid(60)
+        self.add_scenes(self.engine, [data]*20)
+        store_dir = os.path.join(self.root, 'data')
+        for store in (None, store_dir):
+            t1 = time.perf_counter()
+            f = self.save(self.engine, store)
+            t2 = time.perf_counter()
+            e = self.make_engine()
+            e.load_visualization(f, data_store=store)
+            t3 = time.perf_counter()
+            e.stop()
+            report("20 scenes of %d points, data store %s: save %.3f s, "
+                   "load %.3f s, %.2f MB" % (
+                       data.number_of_points, store is not None, t2 - t1,
+                       t3 - t2, len(f.getvalue())/1e6))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,14 +2,22 @@ import os
 import unittest
 import tempfile
 import shutil
+import time
 import mock
 
+import numpy as np
+
 from mayavi.core.null_engine import NullEngine
+from mayavi.core.file_data_source import TimestepPrefetcher
+from mayavi.sources.image_reader import ImageReader
+from mayavi.sources.poly_data_reader import PolyDataReader
+from mayavi.sources.vtk_file_reader import VTKFileReader
 from mayavi.sources.vtk_xml_file_reader import VTKXMLFileReader
 from mayavi.modules.outline import Outline
-from mayavi.tests.common import get_example_data
+from mayavi.tests.common import get_example_data, benchmark, report
 from tvtk.pyface.movie_maker import MovieMaker
 from tvtk.pyface.tvtk_scene import TVTKScene
+from tvtk.api import tvtk, write_data
 
 
 def make_mock_scene():
@@ -210,5 +218,156 @@ class TestFileDataSourceTimestep(unittest.TestCase):
         self.assertEqual(len(r2.file_list), 3)
 
 
+def make_series(root, n_files, ext='.vti', n=8):
+    """Write a time series of image data where the scalars of the i'th
+    file range from i to i + 1.
+    """
+    files = []
+    for i in range(n_files):
+        img = tvtk.ImageData(dimensions=(n, n, n))
+        img.point_data.scalars = np.linspace(i, i + 1, n**3)
+        img.point_data.scalars.name = 'scalars'
+        fname = os.path.join(root, 'series_%d%s' % (i, ext))
+        write_data(img, fname)
+        files.append(fname)
+    return files
+
+
+class TestFileDataSourcePrefetch(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        e = NullEngine()
+        e.start()
+        e.new_scene()
+        self.engine = e
+
+    def tearDown(self):
+        self.engine.stop()
+        shutil.rmtree(self.root)
+
+    def _check_steps(self, r, n_files):
+        readers = set()
+        for i in range(n_files):
+            r.timestep = i
+            rng = r.reader.output.point_data.scalars.range
+            self.assertEqual(rng, (i, i + 1))
+            rng = r.outputs[0].output.point_data.scalars.range
+            self.assertEqual(rng, (i, i + 1))
+            readers.add(id(r.reader))
+        return readers
+
+    def test_prefetch_reads_timesteps(self):
+        # Given
+        n_files = 6
+        files = make_series(self.root, n_files)
+        r = VTKXMLFileReader()
+        r.initialize(files[0])
+        self.engine.add_source(r)
+        o = Outline()
+        self.engine.add_module(o)
+
+        # When
+        r.prefetch = 2
+        readers = self._check_steps(r, n_files)
+
+        # Then the prefetched readers were used.
+        self.assertTrue(len(readers) > 1)
+        self.assertTrue(r._prefetcher is not None)
+
+        # Going back uses the cached readers.
+        r.timestep = n_files - 2
+        rng = r.outputs[0].output.point_data.scalars.range
+        self.assertEqual(rng, (n_files - 2, n_files - 1))
+
+        # Turning it off stops the prefetching.
+        r.prefetch = 0
+        self.assertEqual(r._prefetcher, None)
+        self._check_steps(r, n_files)
+
+    def test_prefetch_legacy_files(self):
+        n_files = 4
+        files = make_series(self.root, n_files, ext='.vtk')
+        r = VTKFileReader()
+        r.initialize(files[0])
+        self.engine.add_source(r)
+        r.prefetch = 2
+        readers = self._check_steps(r, n_files)
+        self.assertTrue(len(readers) > 1)
+
+    def test_prefetch_ignored_by_other_readers(self):
+        # Given readers which cannot read the timesteps in advance.
+        for i in range(3):
+            img = tvtk.ImageData(dimensions=(4, 4, 1))
+            img.point_data.scalars = np.arange(16, dtype=np.uint8)*i
+            writer = tvtk.PNGWriter(
+                file_name=os.path.join(self.root, 'img_%d.png' % i)
+            )
+            writer.set_input_data(img)
+            writer.write()
+            pd = tvtk.PolyData(points=np.random.random((5, 3))*i)
+            write_data(pd, os.path.join(self.root, 'poly_%d.stl' % i))
+        for cls, name in ((ImageReader, 'img_0.png'),
+                          (PolyDataReader, 'poly_0.stl')):
+            r = cls()
+            r.initialize(os.path.join(self.root, name))
+            self.engine.add_source(r)
+            self.assertFalse(r._supports_prefetch)
+
+            # When
+            r.prefetch = 2
+            r.timestep = 1
+            r.timestep = 2
+
+            # Then
+            self.assertEqual(r._prefetcher, None)
+            self.assertTrue(r.reader.file_name.endswith(name[:-5] + '2' +
+                                                        name[-4:]))
+
+    def test_prefetcher_memory_budget(self):
+        # Given
+        def make_task(name):
+            return lambda: (name, 10)
+        p = TimestepPrefetcher(make_task, memory_budget=25)
+
+        # When
+        p.prefetch(['a', 'b', 'c', 'd'])
+        self.assertTrue(all(x in p for x in 'abcd'))
+        p._executor.shutdown(wait=True)
+        p._collect()
+
+        # Then
+        self.assertTrue(p.nbytes <= 25)
+        self.assertEqual(list(p._cache.keys()), ['c', 'd'])
+        self.assertEqual(p.take('a'), None)
+        self.assertEqual(p.take('d'), 'd')
+        self.assertEqual(p.nbytes, 10)
+        self.assertFalse('d' in p)
+        p.put('d', 'd', 10)
+        self.assertEqual(p.nbytes, 20)
+        p.shutdown()
+        self.assertEqual(p.nbytes, 0)
+
+    @benchmark
+    def test_benchmark_step_latency(self):
+        """Benchmark the time taken to change the timestep."""
+        n_files = 12
+        files = make_series(self.root, n_files, n=64)
+        for prefetch in (0, 3):
+            r = VTKXMLFileReader()
+            r.initialize(files[0])
+            self.engine.add_source(r)
+            r.prefetch = prefetch
+            t = 0.0
+            for i in range(1, n_files):
+                # Emulate rendering and the delay between steps.
+                time.sleep(0.02)
+                t1 = time.perf_counter()
+                r.timestep = i
+                t += time.perf_counter() - t1
+            report("prefetch=%d: %.2f ms per step" %
+                   (prefetch, t/(n_files - 1)*1000))
+            self.engine.current_scene.children.remove(r)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,202 @@
+"""
+Tests for the lookup tables of the LUTManager.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+from apptools.persistence import state_pickler
+
+from tvtk.api import tvtk
+from mayavi.core.lut_manager import (
+    LUTManager, PylabLUTs, get_pylab_lut_table, parse_lut_file, pylab_luts,
+    pylab_luts_file, read_lut_file, set_lut
+)
+from mayavi.tests.common import benchmark, report
+
+
+def slow_set_lut(vtk_lut, lut_lst):
+    """Set the LUT one color at a time."""
+    n_col = len(lut_lst)
+    vtk_lut.number_of_colors = n_col
+    vtk_lut.build()
+    for i in range(0, n_col):
+        lt = lut_lst[i]
+        vtk_lut.set_table_value(i, lt[0], lt[1], lt[2], lt[3])
+    return vtk_lut
+
+
+def get_table(lut):
+    return lut.table.to_array()[:lut.number_of_colors]
+
+
+class TestSetLUT(unittest.TestCase):
+    def test_set_lut_matches_set_table_value(self):
+        values = np.random.RandomState(0).random_sample((100, 4))
+        values[0] = 0.0
+        values[-1] = 1.0
+        expected = slow_set_lut(tvtk.LookupTable(), values)
+        lut = set_lut(tvtk.LookupTable(), values.tolist())
+        self.assertEqual(lut.number_of_colors, 100)
+        np.testing.assert_array_equal(get_table(lut), get_table(expected))
+        v_lut, v_expected = tvtk.to_vtk(lut), tvtk.to_vtk(expected)
+        for value in (-1.0, 0.0, 0.3, 1.0, 2.0, np.nan):
+            c1, c2 = [0.0]*3, [0.0]*3
+            v_lut.GetColor(value, c1)
+            v_expected.GetColor(value, c2)
+            self.assertEqual(c1, c2)
+
+
+@unittest.skipIf(len(pylab_luts) == 0, 'The pylab colormaps are missing.')
+class TestPylabLUTs(unittest.TestCase):
+    def test_lazy_loading(self):
+        luts = PylabLUTs(pylab_luts_file)
+        expected = state_pickler.load_state(pylab_luts_file)
+        self.assertEqual(sorted(luts), sorted(expected))
+        self.assertEqual(len(luts._luts), 0)
+        np.testing.assert_array_equal(luts['jet'], expected['jet'])
+        self.assertEqual(list(luts._luts), ['jet'])
+        self.assertIs(luts['jet'], luts['jet'])
+
+    def test_invalid_file(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            fname = os.path.join(tmp, 'bad.pkl')
+            with open(fname, 'wb') as f:
+                f.write(b'not a pickle')
+            self.assertRaises(ValueError, PylabLUTs, fname)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_lut_manager_tables(self):
+        for mode in ('jet', 'viridis', 'Spectral'):
+            for reverse in (False, True):
+                for n_colors in (256, 100, 10):
+                    lm = LUTManager(lut_mode=mode, reverse_lut=reverse,
+                                    number_of_colors=n_colors)
+                    lut = pylab_luts[mode]
+                    if reverse:
+                        lut = lut[::-1]
+                    if n_colors < 256:
+                        lut = lut[::int(round(256.0/n_colors))]
+                    expected = slow_set_lut(tvtk.LookupTable(), lut)
+                    np.testing.assert_array_equal(get_table(lm.lut),
+                                                  get_table(expected))
+
+    def test_tables_are_shared(self):
+        get_pylab_lut_table.cache_clear()
+        lm1 = LUTManager(lut_mode='hot')
+        lm2 = LUTManager(lut_mode='hot')
+        self.assertEqual(get_pylab_lut_table.cache_info().misses, 1)
+        np.testing.assert_array_equal(get_table(lm1.lut), get_table(lm2.lut))
+        # Each LUT has its own copy of the table.
+        lm1.lut.set_table_value(0, 0.0, 0.0, 1.0, 1.0)
+        np.testing.assert_array_equal(
+            get_table(lm2.lut), get_pylab_lut_table('hot', False, 256)
+        )
+        self.assertFalse(get_pylab_lut_table('hot').flags.writeable)
+
+    def test_table_after_lut_mode_switch(self):
+        lm = LUTManager(lut_mode='jet')
+        np.testing.assert_array_equal(get_table(lm.lut),
+                                      get_pylab_lut_table('jet'))
+        for mode in ('blue-red', 'hot', 'jet', 'blue-red'):
+            lm.lut_mode = mode
+            # What VTK has and what the tvtk array shows are the same.
+            vtk_table = tvtk.to_vtk(lm.lut).GetTable()
+            table = get_table(lm.lut)
+            np.testing.assert_array_equal(
+                [vtk_table.GetTuple4(i) for i in range(len(table))], table
+            )
+            if mode != 'blue-red':
+                np.testing.assert_array_equal(table,
+                                              get_pylab_lut_table(mode))
+        self.assertEqual(tuple(table[0]), (4, 0, 255, 255))
+        lm.lut.table.to_array()[0] = (1, 2, 3, 4)
+        self.assertEqual(tvtk.to_vtk(lm.lut).GetTableValue(0),
+                         (1/255.0, 2/255.0, 3/255.0, 4/255.0))
+
+    @benchmark
+    def test_benchmark_lut_mode_switch(self):
+        """Benchmark switching the lut_mode through all the colormaps and
+        the import of the LUT manager."""
+        names = sorted(pylab_luts)
+        lm = LUTManager()
+        get_pylab_lut_table.cache_clear()
+        for label in ('first', 'cached'):
+            t1 = time.perf_counter()
+            for name in names:
+                lm.lut_mode = name
+            t2 = time.perf_counter()
+            report("%d lut_mode switches (%s): %.4f s"
+                   % (len(names), label, t2 - t1))
+        lut = tvtk.LookupTable()
+        t1 = time.perf_counter()
+        for name in names:
+            slow_set_lut(lut, pylab_luts[name].tolist())
+        t2 = time.perf_counter()
+        report("%d set_table_value loops: %.4f s" % (len(names), t2 - t1))
+
+        t1 = time.perf_counter()
+        state_pickler.load_state(pylab_luts_file)
+        t2 = time.perf_counter()
+        PylabLUTs(pylab_luts_file)
+        t3 = time.perf_counter()
+        report("Loading the colormaps: all %.4f s, lazily %.4f s"
+               % (t2 - t1, t3 - t2))
+        code = ("import time; t = time.perf_counter(); "
+                "import mayavi.core.lut_manager; "
+                "print(time.perf_counter() - t)")
+        out = subprocess.check_output(
+            [sys.executable, '-c', code],
+            env=dict(os.environ, ETS_TOOLKIT='null')
+        )
+        report("import mayavi.core.lut_manager: %.4f s"
+               % float(out.split()[-1]))
+
+
+class TestLUTFile(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def write(self, text):
+        fname = os.path.join(self.root, 'test.lut')
+        with open(fname, 'w') as f:
+            f.write(text)
+        return fname
+
+    def test_read_lut_file(self):
+        values = np.random.RandomState(0).random_sample((50, 4))
+        text = 'LOOKUP_TABLE default 50\n' + ''.join(
+            '%r %r %r %r\n' % tuple(v) for v in values
+        )
+        fname = self.write(text)
+        np.testing.assert_array_equal(read_lut_file(fname), values)
+        self.assertEqual(parse_lut_file(fname), values.tolist())
+
+        lm = LUTManager(lut_mode='file', file_name=fname)
+        expected = slow_set_lut(tvtk.LookupTable(), values)
+        np.testing.assert_array_equal(get_table(lm.lut), get_table(expected))
+
+    def test_invalid_lut_files(self):
+        for text in ('LUT default 2\n1 0 0 1\n',
+                     'LOOKUP_TABLE default\n1 0 0 1\n',
+                     'LOOKUP_TABLE default 2\n1 0 0 1\n0 0 1\n',
+                     'LOOKUP_TABLE default 2\n1 0 0 1\n0 0 1 1 1\n',
+                     'LOOKUP_TABLE default 2\n1 0 0 1\n0 0 x 1\n'):
+            self.assertRaises(IOError, read_lut_file, self.write(text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+"""
+Tests for the message based Mayavi server.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tvtk.api import tvtk
+from mayavi.tools.message_server import (
+    CommandHandler, MessageClient, MessageServer, ProtocolError,
+    decode_payload, encode_message, read_message, HEADER
+)
+from mayavi.tests.common import benchmark, report
+
+
+class FakeScene(object):
+    def __init__(self):
+        self.camera = tvtk.Camera()
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        arrays = dict(a=np.arange(12.0).reshape(3, 4),
+                      b=np.arange(5, dtype=np.int32),
+                      c=np.zeros((2, 2), dtype=np.uint8)[:, ::-1])
+        data = encode_message(dict(id=1, op='test'), arrays)
+
+        text_size, size = HEADER.unpack(data[:HEADER.size])
+        header = data[HEADER.size:HEADER.size + text_size]
+        payload = data[HEADER.size + text_size:]
+        self.assertEqual(len(payload), size)
+        header = json.loads(header.decode('utf-8'))
+        self.assertEqual(header['op'], 'test')
+        result = decode_payload(header, payload)
+        self.assertEqual(sorted(result), ['a', 'b', 'c'])
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(result[name], array)
+            self.assertEqual(result[name].dtype, array.dtype)
+
+    def test_short_payload(self):
+        header = dict(arrays=[dict(name='a', dtype='<f8', shape=[10])])
+        self.assertRaises(ProtocolError, decode_payload, header, b'0'*79)
+
+    def test_long_payload(self):
+        header = dict(arrays=[dict(name='a', dtype='<f8', shape=[10])])
+        self.assertRaises(ProtocolError, decode_payload, header, b'0'*81)
+        self.assertRaises(ProtocolError, decode_payload, {}, b'0')
+
+    def test_invalid_arrays(self):
+        def check(arrays, payload=b''):
+            with self.assertRaises(ProtocolError):
+                decode_payload(dict(arrays=arrays), payload)
+
+        check({'name': 'a', 'dtype': '<f8', 'shape': []}, b'0'*8)
+        check('a')
+        check(['a'])
+        check([dict(name='a', dtype='<f8')])
+        check([dict(name='a', shape=[1])])
+        check([dict(dtype='<f8', shape=[1])], b'0'*8)
+        check([dict(name=1, dtype='<f8', shape=[1])], b'0'*8)
+        for dtype in ('|O', 'O', [['x', '|O']], 'junk', '|V0', None):
+            check([dict(name='a', dtype=dtype, shape=[1])], b'0'*8)
+        for shape in (1, [-1], [1.0], [True], ['1'], None):
+            check([dict(name='a', dtype='<f8', shape=shape)], b'0'*8)
+        check([dict(name='a', dtype='<f8', shape=[1 << 62, 1 << 62])],
+              b'0'*8)
+        # Empty arrays are fine.
+        result = decode_payload(
+            dict(arrays=[dict(name='a', dtype='<f8', shape=[0, 3])]), b''
+        )
+        self.assertEqual(result['a'].shape, (0, 3))
+
+    def test_read_message_errors(self):
+        def read(data):
+            loop = asyncio.new_event_loop()
+            self.addCleanup(loop.close)
+            reader = asyncio.StreamReader(loop=loop)
+            reader.feed_data(data)
+            reader.feed_eof()
+            return loop.run_until_complete(read_message(reader))
+
+        data = encode_message(dict(id=1), dict(a=np.arange(3.0)))
+        header, arrays = read(data)
+        np.testing.assert_array_equal(arrays['a'], np.arange(3.0))
+        text = json.dumps(dict(id=1, arrays=[dict(name='a', dtype='|O',
+                                                  shape=[3])]))
+        text = text.encode('utf-8')
+        self.assertRaises(ProtocolError, read,
+                          HEADER.pack(len(text), 24) + text + b'0'*24)
+        # The payload size does not match the arrays.
+        text_size, size = HEADER.unpack(data[:HEADER.size])
+        data = HEADER.pack(text_size, size + 1) + data[HEADER.size:] + b'0'
+        self.assertRaises(ProtocolError, read, data)
+
+
+class TestMessageServer(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch(
+            'mayavi.tools.engine_manager.options.backend', 'test'
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        from mayavi import mlab
+        self.mlab = mlab
+        mlab.figure()
+        self.scene = FakeScene()
+        self.loop = asyncio.new_event_loop()
+        self.handler = CommandHandler(mlab.get_engine(), self.scene,
+                                      loop=self.loop)
+        self.server = MessageServer(self.handler, port=0)
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.run_until_complete(self.server.close())
+        self.loop.close()
+        self.mlab.close(all=True)
+
+    def connect(self):
+        client = MessageClient('localhost', self.server.port)
+        self.clients.append(client)
+        return client
+
+    def test_ping_and_errors(self):
+        client = self.connect()
+        self.assertEqual(client.call('ping'), 'pong')
+        with self.assertRaises(RuntimeError) as cm:
+            client.call('exec', code='import os')
+        self.assertIn('Unknown operation', str(cm.exception))
+        # The connection is still usable.
+        self.assertEqual(client.call('ping'), 'pong')
+
+    def test_burst_of_camera_moves_coalesces_renders(self):
+        expected = tvtk.Camera()
+        for i in range(200):
+            expected.azimuth(1)
+        client = self.connect()
+
+        for i in range(200):
+            client.send('camera', azimuth=1, reply=False)
+        result = client.call('camera', elevation=0)
+
+        np.testing.assert_allclose(result['position'], expected.position,
+                                   atol=1e-8)
+        self.assertTrue(self.scene.renders < 20, self.scene.renders)
+        self.assertEqual(self.scene.renders, self.handler.renders)
+
+    def test_pipelined_replies(self):
+        client = self.connect()
+        ids = [client.send('ping') for i in range(10)]
+        replies = [client.receive()[0] for i in range(10)]
+        self.assertEqual([r['id'] for r in replies], ids)
+
+    def test_several_clients(self):
+        clients = [self.connect() for i in range(4)]
+        for client in clients:
+            client.send('camera', azimuth=10, reply=False)
+        for client in clients:
+            self.assertEqual(client.call('ping'), 'pong')
+        expected = tvtk.Camera()
+        expected.azimuth(40)
+        np.testing.assert_allclose(self.scene.camera.position,
+                                   expected.position, atol=1e-8)
+
+    def test_invalid_message_closes_connection(self):
+        client = self.connect()
+        text = json.dumps(dict(id=1, op='ping', arrays=[1])).encode('utf-8')
+        client._sock.sendall(HEADER.pack(len(text), 0) + text)
+        self.assertEqual(client._file.read(), b'')
+        # The server still serves the other clients.
+        self.assertEqual(self.connect().call('ping'), 'pong')
+
+    def test_max_connections(self):
+        self.server.max_connections = 1
+        client = self.connect()
+        self.assertEqual(client.call('ping'), 'pong')
+        other = self.connect()
+        header, arrays = other.receive()
+        self.assertIn('error', header)
+        self.assertEqual(client.call('ping'), 'pong')
+
+    def test_update_data(self):
+        mlab = self.mlab
+        x, y, z = np.random.random((3, 10))
+        g = mlab.points3d(x, y, z, x, name='points')
+        client = self.connect()
+
+        client.call('update_data', object='points',
+                    arrays=dict(scalars=y))
+        np.testing.assert_array_equal(g.mlab_source.scalars, y)
+
+        x, y, z = np.random.random((3, 20))
+        client.call('update_data', object='points', reset=True,
+                    arrays=dict(x=x, y=y, z=z, scalars=z))
+        np.testing.assert_array_equal(g.mlab_source.scalars, z)
+        self.assertEqual(g.mlab_source.dataset.number_of_points, 20)
+
+        self.assertRaises(RuntimeError, client.call, 'update_data',
+                          object='foo', arrays=dict(scalars=y))
+
+    def test_screenshot(self):
+        image = np.zeros((30, 40, 3), dtype=np.uint8)
+        image[10] = 255
+        client = self.connect()
+        with mock.patch('mayavi.tools.figure.screenshot',
+                        return_value=image) as screenshot:
+            result = client.call('screenshot', mode='rgb')
+        np.testing.assert_array_equal(result, image)
+        self.assertEqual(screenshot.call_args[1]['mode'], 'rgb')
+
+    @benchmark
+    def test_benchmark_camera_messages(self):
+        """Benchmark the rate of camera messages handled."""
+        client = self.connect()
+        n = 5000
+        start = time.perf_counter()
+        for i in range(n):
+            client.send('camera', azimuth=0.1, reply=False)
+        client.call('ping')
+        elapsed = time.perf_counter() - start
+        report("%d camera messages in %.3f s (%d per second), %d renders"
+               % (n, elapsed, n/elapsed, self.handler.renders))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Tests for the probe_data helper and the Prober class.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import time
+import unittest
+
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.common import configure_input_data
+from mayavi.tools.probe_data import probe_data, Prober
+from mayavi.tests.common import benchmark, report
+
+
+def make_image_data(n=10):
+    x, y, z = np.mgrid[0:1:n*1j, 0:1:n*1j, 0:1:n*1j]
+    img = tvtk.ImageData(dimensions=(n, n, n), spacing=(1./(n - 1),)*3)
+    pts = np.c_[np.ravel(x.T), np.ravel(y.T), np.ravel(z.T)]
+    img.point_data.scalars = np.sqrt((pts**2).sum(axis=1))
+    img.point_data.scalars.name = 'r'
+    img.point_data.vectors = pts
+    img.point_data.vectors.name = 'v'
+    img.point_data.tensors = np.repeat(pts, 3, axis=1)
+    img.point_data.tensors.name = 't'
+    return img
+
+
+def make_unstructured_grid(n=10):
+    tf = tvtk.DataSetTriangleFilter()
+    configure_input_data(tf, make_image_data(n))
+    tf.update()
+    return tf.output
+
+
+class TestProber(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+
+    def _check_values(self, dataset):
+        x, y, z = self.rng.random_sample((3, 10, 4))
+        prober = Prober(dataset)
+        s, v, t = prober.probe(x, y, z, type=('scalars', 'vectors',
+                                              'tensors'))
+        self.assertEqual(s.shape, (10, 4))
+        self.assertEqual(v.shape, (3, 10, 4))
+        self.assertEqual(t.shape, (9, 10, 4))
+        np.testing.assert_array_almost_equal(v, [x, y, z])
+        np.testing.assert_array_almost_equal(t[::3], [x, y, z])
+        np.testing.assert_array_almost_equal(
+            s, np.sqrt(x**2 + y**2 + z**2), decimal=1
+        )
+        np.testing.assert_array_equal(s, probe_data(dataset, x, y, z))
+
+    def test_probe_image_data(self):
+        self._check_values(make_image_data())
+
+    def test_probe_unstructured_grid(self):
+        self._check_values(make_unstructured_grid())
+
+    def test_probe_many(self):
+        prober = Prober(make_unstructured_grid())
+        sets = [self.rng.random_sample((3, n)) for n in (1, 5, 20)]
+        results = prober.probe_many(sets, type='vectors')
+        self.assertEqual(len(results), 3)
+        for (x, y, z), v in zip(sets, results):
+            np.testing.assert_array_almost_equal(v, [x, y, z])
+        # Scalar points.
+        v = prober.probe(0.5, 0.5, 0.25, type='vectors')
+        np.testing.assert_array_almost_equal(np.ravel(v), [0.5, 0.5, 0.25])
+
+    def test_locator_rebuilt_when_data_changes(self):
+        ug = make_unstructured_grid()
+        prober = Prober(ug)
+        x, y, z = self.rng.random_sample((3, 5))
+        v = prober.probe(x, y, z, type='vectors')
+        np.testing.assert_array_almost_equal(v, [x, y, z])
+
+        # Shift the points of the dataset.
+        pts = ug.points.to_array()
+        ug.points = pts + 1.0
+        v = prober.probe(x + 1.0, y + 1.0, z + 1.0, type='vectors')
+        np.testing.assert_array_almost_equal(v, [x, y, z])
+
+    def test_invalid_arguments(self):
+        prober = Prober(make_image_data())
+        self.assertRaises(AssertionError, prober.probe, 0, 0, 0, 'foo')
+        self.assertRaises(ValueError, prober.probe, 0, 0, 0, 'scalars',
+                          'foo')
+        self.assertRaises(ValueError, prober.probe, 0, 0, 0, 'scalars',
+                          'cells')
+
+    @benchmark
+    def test_benchmark_prober(self):
+        """Compare repeated probe_data calls with a Prober."""
+        ug = make_unstructured_grid(40)
+        n_frames = 20
+        frames = [self.rng.random_sample((3, 2000)) for i in range(n_frames)]
+        t1 = time.perf_counter()
+        for x, y, z in frames:
+            probe_data(ug, x, y, z)
+            probe_data(ug, x, y, z, type='vectors')
+        t_old = time.perf_counter() - t1
+        prober = Prober(ug)
+        t1 = time.perf_counter()
+        for x, y, z in frames:
+            prober.probe(x, y, z, type=('scalars', 'vectors'))
+        t_new = time.perf_counter() - t1
+        report("%d cells, %d frames of 2000 points: probe_data %.3f s, "
+               "Prober %.3f s (%.1fx)" % (ug.number_of_cells, n_frames,
+                                          t_old, t_new, t_old/t_new))
+
+
+if __name__ == '__main__':
+    unittest.main()
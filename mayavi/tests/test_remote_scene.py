@@ -0,0 +1,349 @@
+"""
+Tests for the frames sent by the remote scenes.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tvtk.pyface.frame_writer import encode_png
+from mayavi.tools.remote.bridge import AsyncBridge, FrameQueue
+from mayavi.tools.remote.remote_scene import (
+    EventInfo, ImageEncoder, QUALITY_LEVELS, SceneManager
+)
+from mayavi.tools.remote.remote_widget import RemoteWidget, decode_image
+from mayavi.tests.common import benchmark, report
+
+
+class FakeRenderWindow(object):
+    """Stands in for a render window showing `image`, an array with the
+    top row first.
+    """
+    def __init__(self, image):
+        self.image = image
+
+    @property
+    def size(self):
+        return self.image.shape[1], self.image.shape[0]
+
+    def get_pixel_data(self, x0, y0, x1, y1, front, array):
+        # VTK images have the bottom row first.
+        array.from_array(self.image[::-1].reshape(-1, 3))
+
+
+class FakeScene(object):
+    def __init__(self, image):
+        self.render_window = FakeRenderWindow(image)
+
+
+def make_image(width=200, height=150):
+    x, y = np.meshgrid(np.arange(width), np.arange(height))
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[..., 0] = x
+    image[..., 1] = y
+    image[..., 2] = 100
+    return image
+
+
+class TestImageEncoder(unittest.TestCase):
+    def setUp(self):
+        self.image = make_image()
+        self.scene = FakeScene(self.image)
+        self.encoder = ImageEncoder(scene=self.scene, tile_size=32)
+        self.widget = RemoteWidget(mock.MagicMock(), mock.MagicMock())
+
+    def show(self, data):
+        image, format = self.widget.get_frame_image(data)
+        return decode_image(image, format)
+
+    def test_first_frame_is_full(self):
+        data = self.encoder.get_frame()
+        self.assertEqual(data['type'], 'image')
+        self.assertEqual(data['format'], 'PNG')
+        self.assertEqual(data['size'], (200, 150))
+        np.testing.assert_array_equal(self.show(data), self.image)
+
+    def test_unchanged_frame_is_not_sent(self):
+        self.encoder.get_frame()
+        self.assertIsNone(self.encoder.get_frame())
+
+    def test_changed_tiles(self):
+        self.show(self.encoder.get_frame())
+        # Change two adjacent tiles of a row and one of the last row.
+        self.image[40:50, 20:70] = 255
+        self.image[140:, 195:] = 0
+
+        data = self.encoder.get_frame()
+
+        self.assertEqual(data['type'], 'tiles')
+        rects = [(t['x'], t['y'], t['width'], t['height'])
+                 for t in data['tiles']]
+        self.assertEqual(rects, [(0, 32, 96, 32), (192, 128, 8, 22)])
+        np.testing.assert_array_equal(self.show(data), self.image)
+
+        # The tiles are applied to the updated frame.
+        self.image[100:110, 100:110] = 0
+        np.testing.assert_array_equal(self.show(self.encoder.get_frame()),
+                                      self.image)
+
+    def test_tiles_before_full_frame(self):
+        self.encoder.get_frame()
+        self.image[40:50, 20:70] = 255
+        data = self.encoder.get_frame()
+        self.assertEqual(data['type'], 'tiles')
+        widget = self.widget
+        widget.scene_proxy.get_raw_image.return_value = \
+            encode_png(self.image)
+        widget.show_image = mock.Mock()
+
+        # The tiles cannot be applied, the full frame is shown instead.
+        self.assertIsNone(widget.get_frame_image(data))
+        (image,), kw = widget.show_image.call_args
+        np.testing.assert_array_equal(decode_image(image, kw['format']),
+                                      self.image)
+
+        # The next tiles are applied to it.
+        self.image[100:110, 100:110] = 0
+        np.testing.assert_array_equal(self.show(self.encoder.get_frame()),
+                                      self.image)
+
+    def test_full_frame_when_many_tiles_change(self):
+        self.encoder.get_frame()
+        self.image[:100] = 0
+        data = self.encoder.get_frame()
+        self.assertEqual(data['type'], 'image')
+        np.testing.assert_array_equal(self.show(data), self.image)
+
+    def test_full_frame_when_size_changes(self):
+        self.encoder.get_frame()
+        self.scene.render_window.image = make_image(100, 80)
+        data = self.encoder.get_frame()
+        self.assertEqual(data['type'], 'image')
+        self.assertEqual(data['size'], (100, 80))
+
+    def test_reset(self):
+        self.encoder.get_frame()
+        self.encoder.reset()
+        self.assertEqual(self.encoder.get_frame()['type'], 'image')
+
+    def test_compressed_frames(self):
+        encoder = self.encoder
+        encoder.get_frame()
+        encoder.compress = True
+        encoder.downsample = 2
+        self.image[:] = 50
+
+        data = encoder.get_frame()
+
+        self.assertEqual(data['format'], 'JPEG')
+        self.assertEqual(data['size'], (200, 150))
+        image = self.show(data)
+        self.assertEqual(image.shape, (75, 100, 3))
+        self.assertTrue(np.all(np.abs(image.astype(int) - 50) < 4))
+        # The clients do not have the exact frame so the next frame is
+        # sent in full.
+        encoder.compress = False
+        data = encoder.get_frame()
+        self.assertEqual(data['format'], 'PNG')
+        np.testing.assert_array_equal(self.show(data), self.image)
+
+    def test_adapt(self):
+        encoder = self.encoder
+        for i in range(10):
+            encoder.adapt(0.2, 0.05)
+        self.assertEqual((encoder.downsample, encoder.quality),
+                         QUALITY_LEVELS[-1])
+        encoder.adapt(0.04, 0.05)
+        self.assertEqual((encoder.downsample, encoder.quality),
+                         QUALITY_LEVELS[-1])
+        for i in range(10):
+            encoder.adapt(0.01, 0.05)
+        self.assertEqual((encoder.downsample, encoder.quality),
+                         QUALITY_LEVELS[0])
+
+    @benchmark
+    def test_benchmark_frames(self):
+        """Benchmark the size and time of the frames for a 1024x768
+        scene where a small region changes.
+        """
+        image = make_image(1024, 768)
+        encoder = ImageEncoder(scene=FakeScene(image))
+        for label, compress in (('full', False), ('tiles', False),
+                                ('jpeg', True)):
+            if label != 'tiles':
+                encoder.reset()
+            encoder.compress = compress
+            image[300:340, 500:540] += 1
+            t1 = time.perf_counter()
+            data = encoder.get_frame()
+            t2 = time.perf_counter()
+            if data['type'] == 'tiles':
+                size = sum(len(t['data']) for t in data['tiles'])
+            else:
+                size = len(data['data'])
+            report("%6s: %8d bytes in %.4f s" % (label, size, t2 - t1))
+
+
+class StandInWidget(RemoteWidget):
+    """A client showing the frames it gets after a `delay`."""
+    def __init__(self, scene_proxy, bridge, delay=0.0):
+        self.delay = delay
+        self.frames = 0
+        self.image = None
+        super(StandInWidget, self).__init__(scene_proxy, bridge)
+
+    def on_render(self, data):
+        time.sleep(self.delay)
+        result = self.get_frame_image(data)
+        if result is not None:
+            self.show_image(*result)
+        self.frames += 1
+
+    def show_image(self, data, format='PNG'):
+        self.image = decode_image(data, format)
+
+
+def render_event(data, event='RenderEvent'):
+    return EventInfo(1, 'vtkRenderWindow', event, data)
+
+
+def tiles_data(*rects):
+    tiles = [dict(x=x, y=y, width=w, height=h, data=str(i))
+             for i, (x, y, w, h) in enumerate(rects)]
+    return dict(type='tiles', tiles=tiles)
+
+
+class TestFrameQueue(unittest.TestCase):
+    def test_keeps_last_full_frame_and_merged_tiles(self):
+        q = FrameQueue()
+        q.put(render_event(dict(type='image', data='a')))
+        q.put(render_event(tiles_data((0, 0, 8, 8), (8, 0, 8, 8))))
+        q.put(render_event(tiles_data((8, 0, 8, 8), (0, 8, 8, 8))))
+        q.put(render_event(3, 'CursorChangedEvent'))
+        q.put(render_event(4, 'CursorChangedEvent'))
+
+        self.assertEqual(len(q), 3)
+        self.assertEqual(q.dropped, 2)
+        image, tiles, cursor = q.get_all()
+        self.assertEqual(image.data['data'], 'a')
+        rects = [(t['x'], t['y'], t['data']) for t in tiles.data['tiles']]
+        self.assertEqual(rects, [(0, 0, '0'), (8, 0, '0'), (0, 8, '1')])
+        self.assertEqual(cursor.data, 4)
+        self.assertEqual(len(q), 0)
+
+    def test_full_frame_replaces_pending_frames(self):
+        q = FrameQueue()
+        q.put(render_event(dict(type='image', data='a')))
+        q.put(render_event(tiles_data((0, 0, 8, 8))))
+        q.put(render_event(dict(type='image', data='b')))
+        events = q.get_all()
+        self.assertEqual([e.data['data'] for e in events], ['b'])
+        self.assertEqual(q.dropped, 2)
+
+
+class TestAsyncBridge(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        self.bridge = AsyncBridge(SceneManager(), self.loop)
+        self.proxy = mock.MagicMock(id=1)
+
+    def tearDown(self):
+        # Let the delivery of the removed widgets finish.
+        self.wait_for(lambda: not self.bridge._wakeups)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def wait_for(self, condition, timeout=10.0):
+        start = time.time()
+        while not condition():
+            if time.time() - start > timeout:
+                self.fail('Timed out waiting for the clients.')
+            time.sleep(0.01)
+
+    def test_slow_client_drops_frames(self):
+        bridge = self.bridge
+        fast = StandInWidget(self.proxy, bridge)
+        slow = StandInWidget(self.proxy, bridge, delay=0.05)
+        image = make_image()
+        encoder = ImageEncoder(scene=FakeScene(image), tile_size=16)
+        handle_time = 0.0
+        for i in range(40):
+            if i % 10 == 0:
+                image[:] = i
+            else:
+                image[i:i + 5, 4*i:4*i + 10] = 255 - i
+            data = encoder.get_frame()
+            start = time.perf_counter()
+            # This is what the scene manager does for each render event.
+            bridge.handle_event(render_event(data))
+            handle_time = max(handle_time, time.perf_counter() - start)
+            time.sleep(0.002)
+
+        def done():
+            return all(w.image is not None and
+                       np.array_equal(w.image, image) for w in (fast, slow))
+        self.wait_for(done)
+        self.assertTrue(handle_time < 0.02)
+        self.assertTrue(slow.frames < fast.frames)
+        self.assertTrue(bridge.queues[slow].dropped > 0)
+        fast.on_close()
+        slow.on_close()
+
+    def test_late_widget_gets_full_frame(self):
+        bridge = self.bridge
+        image = make_image()
+        encoder = ImageEncoder(scene=FakeScene(image), tile_size=16)
+        bridge.scene_manager.scenes[1] = mock.Mock(image_encoder=encoder)
+        first = StandInWidget(self.proxy, bridge)
+        bridge.handle_event(render_event(encoder.get_frame()))
+        image[10:20, 10:20] = 0
+        bridge.handle_event(render_event(encoder.get_frame()))
+        self.wait_for(lambda: first.image is not None and
+                      np.array_equal(first.image, image))
+
+        late = StandInWidget(self.proxy, bridge)
+        image[30:40, 30:40] = 0
+        data = encoder.get_frame()
+        self.assertEqual(data['type'], 'image')
+        bridge.handle_event(render_event(data))
+
+        def done():
+            return all(w.image is not None and
+                       np.array_equal(w.image, image) for w in (first, late))
+        self.wait_for(done)
+        self.assertFalse(self.proxy.get_raw_image.called)
+        first.on_close()
+        late.on_close()
+
+    def test_async_client(self):
+        received = []
+
+        class Client(object):
+            async def handle_vtk_event(self, obj_name, event, data):
+                await asyncio.sleep(0.01)
+                received.append(data)
+
+        client = Client()
+        future = self.bridge.add_widget(1, client)
+        for i in range(5):
+            self.bridge.handle_event(render_event(dict(type='image', data=i)))
+        self.wait_for(lambda: received and received[-1]['data'] == 4)
+        self.assertTrue(len(received) < 5)
+
+        self.bridge.remove_widget(1, client)
+        future.result(timeout=1)
+        self.assertEqual(self.bridge.queues, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
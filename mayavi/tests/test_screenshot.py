@@ -0,0 +1,140 @@
+"""
+Tests for mlab.screenshot and Capture using a stand-in render window.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import unittest
+
+import numpy as np
+
+from mayavi.tools.figure import Capture, screenshot
+
+
+def fill(array, values):
+    """Copy the values into the VTK array, in place if the size is the
+    same, as the render windows do.
+    """
+    values = values.reshape(-1, values.shape[-1]) if values.ndim > 2 \
+        else values.ravel()
+    current = array.to_array()
+    if current.size == values.size:
+        current.ravel()[:] = values.ravel()
+    else:
+        array.from_array(values.copy())
+
+
+class FakeRenderWindow(object):
+    """Renders an image whose pixel values are the row index, counted
+    from the bottom, plus the number of frames rendered before.
+    """
+    def __init__(self, size=(8, 6)):
+        self.size = size
+        self.multi_samples = 0
+        self.count = 0
+
+    def _rows(self, n_comp, dtype):
+        w, h = self.size
+        rows = np.arange(h, dtype=dtype)[:, None, None] + self.count
+        return np.broadcast_to(rows, (h, w, n_comp))
+
+    def get_pixel_data(self, x0, y0, x1, y1, front, array, right=0):
+        fill(array, self._rows(3, np.uint8))
+        self.count += 1
+
+    def get_rgba_pixel_data(self, x0, y0, x1, y1, front, array, right=0):
+        fill(array, self._rows(4, np.float32)/100.0)
+        self.count += 1
+
+    def get_zbuffer_data(self, x0, y0, x1, y1, array):
+        fill(array, self._rows(1, np.float32)[..., 0]/10.0)
+
+
+class FakeScene(object):
+    def __init__(self):
+        self.render_window = FakeRenderWindow()
+        self.anti_aliasing_frames = 8
+        self.n_renders = 0
+
+    def _lift(self):
+        pass
+
+    def render(self):
+        self.n_renders += 1
+
+
+class FakeFigure(object):
+    def __init__(self):
+        self.scene = FakeScene()
+
+
+class TestScreenshot(unittest.TestCase):
+    def setUp(self):
+        self.figure = FakeFigure()
+
+    def test_screenshot(self):
+        img = screenshot(self.figure)
+        self.assertEqual(img.shape, (6, 8, 3))
+        self.assertEqual(img.dtype, np.uint8)
+        # The top row is first.
+        self.assertEqual(img[0, 0, 0], 5)
+        self.assertEqual(img[-1, 0, 0], 0)
+
+        img = screenshot(self.figure, mode='rgba')
+        self.assertEqual(img.shape, (6, 8, 4))
+        self.assertAlmostEqual(img[0, 0, 0], 0.06)
+
+        self.assertRaises(ValueError, screenshot, self.figure, mode='foo')
+
+    def test_screenshot_antialiased(self):
+        rw = self.figure.scene.render_window
+        screenshot(self.figure, antialiased=True)
+        self.assertEqual(rw.multi_samples, 0)
+        self.assertEqual(self.figure.scene.n_renders, 2)
+
+    def test_capture_reuses_arrays(self):
+        capture = Capture(self.figure)
+        img1 = capture()
+        self.assertEqual(img1[0, 0, 0], 5)
+        img2 = capture()
+        self.assertIs(img1, img2)
+        self.assertEqual(img2[0, 0, 0], 6)
+        self.assertTrue(img2.flags.c_contiguous)
+
+        # The buffers are resized when the window is.
+        self.figure.scene.render_window.size = (4, 3)
+        img3 = capture()
+        self.assertEqual(img3.shape, (3, 4, 3))
+
+    def test_capture_without_flip_is_a_view(self):
+        capture = Capture(self.figure, flip=False)
+        img1 = capture()
+        # The bottom row is first.
+        self.assertEqual(img1[0, 0, 0], 0)
+        self.assertEqual(img1[-1, 0, 0], 5)
+        buffer = capture._buffer.to_array()
+        self.assertTrue(np.shares_memory(img1, buffer))
+        img2 = capture()
+        self.assertTrue(np.shares_memory(img2, buffer))
+        self.assertEqual(img1[0, 0, 0], 1)
+
+    def test_capture_depth(self):
+        capture = Capture(self.figure, mode='rgba', depth=True)
+        img, depth = capture()
+        self.assertEqual(img.shape, (6, 8, 4))
+        self.assertEqual(depth.shape, (6, 8))
+        self.assertEqual(depth.dtype, np.float32)
+        self.assertAlmostEqual(depth[0, 0], 0.6)
+        self.assertAlmostEqual(depth[-1, 0], 0.1)
+
+        out = np.zeros((6, 8, 4), np.float32)
+        depth_out = np.zeros((6, 8), np.float32)
+        img, depth = capture(out=out, depth_out=depth_out)
+        self.assertIs(img, out)
+        self.assertIs(depth, depth_out)
+
+        self.assertRaises(ValueError, Capture, self.figure, mode='foo')
+
+
+if __name__ == '__main__':
+    unittest.main()
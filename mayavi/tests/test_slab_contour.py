@@ -0,0 +1,139 @@
+"""
+Tests for the process-parallel contours of image data.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.common import configure_input_data
+from mayavi.components import slab_contour
+from mayavi.components.slab_contour import (
+    SharedArray, attach, contour_image_data, split_extent
+)
+from mayavi.core.null_engine import NullEngine
+from mayavi.modules.iso_surface import IsoSurface
+from mayavi.sources.array_source import ArraySource
+from mayavi.tests.common import benchmark, report
+
+
+def make_scalars(dims):
+    x, y, z = np.ogrid[[slice(-1, 1, d*1j) for d in dims]]
+    return x*x + 2*y*y + 0.5*z*z + 0.1*np.sin(5*x*y)
+
+
+def make_image_data(dims=(40, 30, 50)):
+    data = tvtk.ImageData(dimensions=dims, spacing=(0.1, 0.2, 0.3),
+                          origin=(1.0, 2.0, 3.0))
+    data.point_data.scalars = make_scalars(dims).ravel(order='F')
+    data.point_data.scalars.name = 'scalars'
+    return data
+
+
+def flying_edges(data, values):
+    cf = tvtk.FlyingEdges3D()
+    configure_input_data(cf, data)
+    for i, value in enumerate(values):
+        cf.set_value(i, value)
+    cf.update()
+    return cf.output
+
+
+def sorted_points_and_normals(output):
+    points = output.points.to_array()
+    order = np.lexsort(points.T[::-1])
+    return points[order], output.point_data.normals.to_array()[order]
+
+
+class TestSlabContour(unittest.TestCase):
+    def check_same(self, output, expected):
+        self.assertEqual(output.number_of_points, expected.number_of_points)
+        self.assertEqual(output.number_of_cells, expected.number_of_cells)
+        p1, n1 = sorted_points_and_normals(output)
+        p2, n2 = sorted_points_and_normals(expected)
+        np.testing.assert_allclose(p1, p2, atol=1e-5)
+        np.testing.assert_allclose(n1, n2, atol=1e-5)
+
+    def test_split_extent(self):
+        self.assertEqual(split_extent(11, 2), [(0, 5), (5, 10)])
+        self.assertEqual(split_extent(3, 8), [(0, 1), (1, 2)])
+        self.assertEqual(split_extent(10, 1), [(0, 9)])
+
+    def test_shared_array(self):
+        array = np.arange(10.0)
+        for module in (slab_contour.shared_memory, None):
+            with mock.patch.object(slab_contour, 'shared_memory', module):
+                shared = SharedArray(array)
+                result, shm = attach(shared.descriptor)
+                np.testing.assert_array_equal(result, array)
+                del result
+                if shm is not None:
+                    shm.close()
+                shared.close()
+
+    def test_same_as_flying_edges(self):
+        data = make_image_data()
+        values = [0.5, 0.9]
+        expected = flying_edges(data, values)
+        for n_slabs in (1, 3, 7, 49):
+            output = contour_image_data(data, values, n_workers=2,
+                                        n_slabs=n_slabs)
+            self.check_same(output, expected)
+        self.assertEqual(output.point_data.scalars.name, 'scalars')
+        np.testing.assert_array_equal(
+            np.unique(output.point_data.scalars.to_array()), values
+        )
+
+    def test_iso_surface(self):
+        e = NullEngine()
+        e.start()
+        e.new_scene()
+        self.addCleanup(e.stop)
+        dims = (30, 40, 20)
+        src = ArraySource(scalar_data=make_scalars(dims),
+                          spacing=(0.1, 0.2, 0.3))
+        e.add_source(src)
+        iso = IsoSurface()
+        contour = iso.contour
+        contour.trait_set(backend='slabs', n_workers=2)
+        e.add_module(iso)
+        contour.contours = [0.6]
+        self.assertEqual(contour.active_backend, 'slabs')
+        data = src.outputs[0].output
+        self.check_same(contour.outputs[0].output, flying_edges(data, [0.6]))
+        self.assertEqual(iso.actor.mapper.input.number_of_points,
+                         contour.outputs[0].output.number_of_points)
+
+        # The contours follow the changes of the data.
+        src.scalar_data = src.scalar_data*0.5
+        data = src.outputs[0].output
+        self.check_same(contour.outputs[0].output, flying_edges(data, [0.6]))
+        contour.trait_set(auto_contours=True, number_of_contours=2,
+                          minimum_contour=0.3, maximum_contour=0.6)
+        self.check_same(contour.outputs[0].output,
+                        flying_edges(data, [0.3, 0.6]))
+
+    @benchmark
+    def test_benchmark_scaling(self):
+        """Benchmark the contours of a 256^3 volume with 1 to N worker
+        processes."""
+        data = make_image_data((256, 256, 256))
+        t1 = time.perf_counter()
+        flying_edges(data, [0.5])
+        t2 = time.perf_counter()
+        report("vtkFlyingEdges3D: %.3f s" % (t2 - t1))
+        for n_workers in range(1, max(os.cpu_count() or 1, 2) + 1):
+            t1 = time.perf_counter()
+            contour_image_data(data, [0.5], n_workers=n_workers)
+            t2 = time.perf_counter()
+            report("%d worker processes: %.3f s" % (n_workers, t2 - t1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Tests for the helper functions in mayavi.tools.tools.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import time
+import unittest
+
+import numpy as np
+
+from mayavi.tools.tools import _min_distance, _min_axis_distance
+from mayavi.tests.common import benchmark, report
+
+
+def brute_min_distance(x, y, z):
+    """The minimum non-zero distance computed from all the couples."""
+    x, y, z = [np.ravel(a) for a in (x, y, z)]
+    d = np.sqrt((x[:, None] - x[None])**2 + (y[:, None] - y[None])**2 +
+                (z[:, None] - z[None])**2)
+    return d[d != 0].min()
+
+
+def brute_min_axis_distance(x, y, z):
+    def axis_min(a):
+        a = np.ravel(a)
+        a = np.abs(a[:, None] - a[None])
+        a = a[a > 0]
+        return a.min() if a.size > 0 else np.inf
+    d = min(axis_min(x), axis_min(y), axis_min(z))
+    return 1 if d == np.inf else d
+
+
+class TestMinDistance(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.RandomState(0)
+
+    def _make_clouds(self, n):
+        rng = self.rng
+        yield rng.random_sample((3, n))
+        # Two clusters of very different densities.
+        yield np.c_[rng.random_sample((3, n//2))*1e-3,
+                    rng.random_sample((3, n - n//2))*10]
+        # A grid with some repeated points.
+        g = np.mgrid[0:20, 0:20, 0:n//400 + 1].reshape(3, -1).astype(float)
+        yield np.c_[g, g[:, :5]]
+        # Points along a line with a varying spacing.
+        yield np.vstack([np.linspace(0, 1, n)**2, np.zeros(n), np.zeros(n)])
+
+    def test_min_distance(self):
+        for n in (10, 2000, 5000):
+            for x, y, z in self._make_clouds(n):
+                self.assertAlmostEqual(_min_distance(x, y, z),
+                                       brute_min_distance(x, y, z))
+
+    def test_min_distance_shapes(self):
+        x, y, z = np.mgrid[0:1:5j, 0:2:5j, 0:4:5j]
+        self.assertAlmostEqual(_min_distance(x, y, z), 0.25)
+        self.assertRaises(ValueError, _min_distance, np.zeros(3),
+                          np.zeros(3), np.zeros(3))
+
+    def test_min_axis_distance(self):
+        for n in (10, 2000):
+            for x, y, z in self._make_clouds(n):
+                self.assertAlmostEqual(_min_axis_distance(x, y, z),
+                                       brute_min_axis_distance(x, y, z))
+        self.assertEqual(_min_axis_distance(np.zeros(3), np.zeros(3),
+                                            np.zeros(3)), 1)
+
+    @benchmark
+    def test_benchmark_min_distance(self):
+        """Benchmark the minimum distances for 10**3 to 10**7 points."""
+        for exp in range(3, 8):
+            n = 10**exp
+            x, y, z = self.rng.random_sample((3, n))
+            t1 = time.perf_counter()
+            _min_distance(x, y, z)
+            t2 = time.perf_counter()
+            _min_axis_distance(x, y, z)
+            t3 = time.perf_counter()
+            report("%8d points: _min_distance %.3f s, "
+                   "_min_axis_distance %.3f s" % (n, t2 - t1, t3 - t2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,19 +7,26 @@
 from os.path import abspath
 from io import BytesIO
 import copy
+import time
 import numpy
 import unittest
+from unittest import mock
 
 # Enthought library imports
 from mayavi.core.null_engine import NullEngine
-from mayavi.sources.vtk_data_source import VTKDataSource
+from mayavi.sources.vtk_data_source import (
+    VTKDataSource, write_dataset_to_string, read_dataset_from_string,
+    write_dataset_to_bytes, read_dataset_from_bytes, BINARY_HEADER
+)
 from mayavi.modules.outline import Outline
 from mayavi.modules.iso_surface import IsoSurface
 from mayavi.modules.contour_grid_plane import ContourGridPlane
 from mayavi.modules.scalar_cut_plane import ScalarCutPlane
 from tvtk.api import tvtk
+from apptools.persistence.state_pickler import gzip_string, gunzip_string
 
 from mayavi.tests import datasets
+from mayavi.tests.common import benchmark, report
 
 
 class TestVTKDataSource(unittest.TestCase):
@@ -119,6 +126,7 @@ class TestVTKDataSource(unittest.TestCase):
         f = BytesIO()
         f.name = abspath('test.mv2')  # We simulate a file.
         engine.save_visualization(f)
+        self.assertIn(BINARY_HEADER, f.getvalue())
         f.seek(0)  # So we can read this saved data.
 
         # Remove existing scene.
@@ -131,6 +139,27 @@ class TestVTKDataSource(unittest.TestCase):
 
         self.check()
 
+    def test_restore_ascii_data(self):
+        """Test if visualizations saved with ASCII data can be loaded."""
+        engine = self.e
+        scene = self.scene
+
+        # Older versions always saved the gzipped ASCII data.
+        f = BytesIO()
+        f.name = abspath('test.mv2')  # We simulate a file.
+        with mock.patch(
+                'mayavi.sources.vtk_data_source.write_dataset_to_bytes',
+                return_value=None):
+            engine.save_visualization(f)
+        self.assertNotIn(BINARY_HEADER, f.getvalue())
+        f.seek(0)
+
+        engine.close_scene(scene)
+        engine.load_visualization(f)
+        self.scene = engine.current_scene
+
+        self.check()
+
     def test_deepcopied(self):
         ############################################################
         # Test if the MayaVi2 visualization can be deep-copied.
@@ -291,5 +320,77 @@ class TestVTKDataSourceAttributes(unittest.TestCase):
         self.assertEqual(src.data.point_data.get_array('s1'), None)
 
 
+def make_datasets():
+    """Return a few datasets of different types with attributes."""
+    sgrid = datasets.generateStructuredGrid()
+    img = tvtk.ImageData(dimensions=(4, 5, 6), spacing=(0.1, 0.2, 0.3),
+                         origin=(1, 2, 3))
+    img.point_data.scalars = numpy.arange(120.0)
+    img.point_data.scalars.name = 'scalars'
+    img.cell_data.vectors = numpy.random.random((60, 3))
+    img.cell_data.vectors.name = 'vectors'
+    rgrid = tvtk.RectilinearGrid(dimensions=(3, 2, 1))
+    rgrid.x_coordinates = [0.0, 1.0, 3.0]
+    rgrid.y_coordinates = [0.0, 2.0]
+    rgrid.z_coordinates = [0.0]
+    rgrid.point_data.scalars = numpy.arange(6, dtype='int32')
+    rgrid.point_data.scalars.name = 'ints'
+    sphere = tvtk.SphereSource()
+    sphere.update()
+    return [sgrid, img, rgrid, sphere.output,
+            datasets.generateUnstructuredGrid_mixed()]
+
+
+class TestDatasetPersistence(unittest.TestCase):
+
+    def check_same(self, data, result):
+        self.assertEqual(result.class_name, data.class_name)
+        self.assertEqual(result.number_of_points, data.number_of_points)
+        self.assertEqual(result.number_of_cells, data.number_of_cells)
+        self.assertEqual(result.bounds, data.bounds)
+        if hasattr(data, 'points') and data.points is not None:
+            numpy.testing.assert_array_equal(result.points.to_array(),
+                                             data.points.to_array())
+        for attr in ('point_data', 'cell_data'):
+            d1, d2 = getattr(data, attr), getattr(result, attr)
+            self.assertEqual(d2.number_of_arrays, d1.number_of_arrays)
+            for i in range(d1.number_of_arrays):
+                a1, a2 = d1.get_array(i), d2.get_array(i)
+                self.assertEqual(a2.name, a1.name)
+                numpy.testing.assert_array_equal(a2.to_array(),
+                                                 a1.to_array())
+
+    def test_binary_round_trip(self):
+        for data in make_datasets():
+            z = write_dataset_to_bytes(data)
+            self.assertTrue(z.startswith(BINARY_HEADER))
+            self.check_same(data, read_dataset_from_bytes(z))
+
+    @benchmark
+    def test_benchmark_persistence(self):
+        """Compare the binary and ASCII dataset persistence."""
+        for n in (50, 100):
+            x, y, z = numpy.mgrid[0:1:n*1j, 0:1:n*1j, 0:1:n*1j]
+            data = tvtk.StructuredGrid(dimensions=x.shape)
+            data.points = numpy.c_[x.ravel(), y.ravel(), z.ravel()]
+            data.point_data.scalars = numpy.sin(x*y*z).ravel()
+            data.point_data.scalars.name = 'scalars'
+
+            t1 = time.perf_counter()
+            sdata = write_dataset_to_string(data)
+            z_ascii = gzip_string(sdata.encode('ascii'))
+            t2 = time.perf_counter()
+            read_dataset_from_string(gunzip_string(z_ascii).decode('ascii'))
+            t3 = time.perf_counter()
+            z_bin = write_dataset_to_bytes(data)
+            t4 = time.perf_counter()
+            read_dataset_from_bytes(z_bin)
+            t5 = time.perf_counter()
+            report("%d points: ASCII save %.3f s, load %.3f s, %.1f MB; "
+                   "binary save %.3f s, load %.3f s, %.1f MB" % (
+                       data.number_of_points, t2 - t1, t3 - t2,
+                       len(z_ascii)/1e6, t4 - t3, t5 - t4, len(z_bin)/1e6))
+
+
 if __name__ == '__main__':
     unittest.main()
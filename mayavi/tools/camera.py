@@ -8,6 +8,7 @@ Controlling the camera.
 
 # Standard library imports.
 import sys
+from collections import OrderedDict
 
 try:
     import numpy as np
@@ -19,6 +20,9 @@ http://numpy.scipy.org
     raise ImportError(msg)
 from numpy import pi
 
+# Enthought library imports.
+from tvtk.array_handler import vtk2array
+
 # We can't use gcf, as it creates a circular import in camera management
 # routines.
 from .engine_manager import get_engine
@@ -135,7 +139,7 @@ def get_outline_bounds(figure=None):
     red, green, blue = scene.background
 
     # Use mode='rgba' to have float values, as with fig.scene.background
-    outline = screenshot(mode='rgba')
+    outline = screenshot(figure=f, mode='rgba')
     outline = (
         (outline[..., 0] != red) + (outline[..., 1] != green)
         + (outline[..., 2] != blue)
@@ -162,6 +166,162 @@ def get_outline_bounds(figure=None):
     return x_min, x_max, y_min, y_max, width, height
 
 
+# Cache of the world bounds of the props of the figures, and of a sample
+# of their points, used by `get_projected_bounds`.  The key is the
+# address of the VTK prop and the value is the MTime of the prop, its
+# mapper and the input pipeline of the mapper, the bounds, the number of
+# points asked for and the points.  Since the MTime is a global counter,
+# a new prop at the same address never matches an old entry.
+_bounds_cache = OrderedDict()
+_BOUNDS_CACHE_SIZE = 256
+
+# The number of points of each prop projected when framing the view.
+_FIT_POINTS = 2000
+
+
+def clear_bounds_cache():
+    """Clear the cache of the prop bounds used to frame the view.
+    """
+    _bounds_cache.clear()
+
+
+def _get_mtime(prop):
+    """Return the MTime of the prop, its mapper and the pipeline upstream
+    of the mapper or None if the prop has no mapper.
+    """
+    mapper = prop.GetMapper() if hasattr(prop, 'GetMapper') else None
+    if mapper is None:
+        return None
+    mtime = max(prop.GetMTime(), mapper.GetMTime())
+    if mapper.GetNumberOfInputConnections(0) > 0:
+        executive = mapper.GetInputAlgorithm().GetExecutive()
+        executive.UpdatePipelineMTime()
+        mtime = max(mtime, executive.GetPipelineMTime())
+    return mtime
+
+
+def _sample_points(prop, max_points):
+    """Return at most `max_points` points of the data of the prop, in
+    world coordinates, or None if the data has no points.
+    """
+    data = prop.GetMapper().GetInputDataObject(0, 0)
+    points = data.GetPoints() if hasattr(data, 'GetPoints') else None
+    if points is None or points.GetNumberOfPoints() == 0:
+        return None
+    points = vtk2array(points.GetData())
+    step = -(-len(points) // max_points)
+    points = np.asarray(points[::step], dtype=float)
+    matrix = prop.GetMatrix()
+    matrix = np.array([[matrix.GetElement(i, j) for j in range(4)]
+                       for i in range(4)])
+    return points.dot(matrix[:3, :3].T) + matrix[:3, 3]
+
+
+def get_prop_bounds(prop, max_points=0):
+    """ Return the world bounds of a VTK prop and, if `max_points` is
+        more than zero, a regular sample of at most `max_points` of its
+        points in world coordinates (or None if the prop is not made of
+        points, like a volume).
+
+        The results are cached until the prop, its mapper or the data
+        upstream of the mapper are modified.
+    """
+    mtime = _get_mtime(prop)
+    key = prop.__this__
+    entry = _bounds_cache.get(key)
+    if mtime is not None and entry is not None and entry[0] == mtime \
+            and (max_points == 0 or entry[2] == max_points):
+        _bounds_cache.move_to_end(key)
+        return entry[1], entry[3]
+
+    bounds = prop.GetBounds()
+    points = None
+    if max_points > 0 and mtime is not None:
+        points = _sample_points(prop, max_points)
+    if mtime is not None:
+        _bounds_cache[key] = (mtime, bounds, max_points, points)
+        if len(_bounds_cache) > _BOUNDS_CACHE_SIZE:
+            _bounds_cache.popitem(last=False)
+    return bounds, points
+
+
+def _project(renderer, points):
+    """Return the display coordinates, relative to the viewport, of an
+    array of world points or None if a point is behind the camera.
+    """
+    from tvtk.api import tvtk
+    renderer = tvtk.to_vtk(renderer)
+    camera = renderer.GetActiveCamera()
+    matrix = camera.GetCompositeProjectionTransformMatrix(
+        renderer.GetTiledAspectRatio(), -1, 1
+    )
+    matrix = np.array([[matrix.GetElement(i, j) for j in range(4)]
+                       for i in range(4)])
+    points = np.atleast_2d(points)
+    points = points.dot(matrix[:, :3].T) + matrix[:, 3]
+    w = points[:, 3]
+    if np.any(w <= 0):
+        return None
+    width, height = renderer.GetSize()
+    x = (points[:, 0] / w + 1) * 0.5 * width
+    y = (points[:, 1] / w + 1) * 0.5 * height
+    return x, y
+
+
+def get_projected_bounds(figure=None, max_points=0):
+    """ Return the screen extent of the objects visible on the figure,
+        computed from their geometry, without rendering.
+
+        The bounding boxes of the visible 3D props are projected with
+        the camera of the figure.  If `max_points` is more than zero, a
+        sample of at most `max_points` points of each prop is projected
+        instead of its bounding box, which gives a tighter extent.  The
+        2D props, like the text and the scalar bars, are ignored.
+
+        **Output**
+
+        x_min, x_max, y_min, y_max, width, height in display coordinates,
+        with y going up, or None if there is nothing visible or if an
+        object is behind the camera.
+    """
+    if figure is None:
+        f = get_engine().current_scene
+    else:
+        f = figure
+    if f is None or f.scene is None:
+        return None
+    # Lazy import, to avoid importing VTK with mlab.
+    from tvtk.api import tvtk
+    renderer = tvtk.to_vtk(f.scene.renderer)
+    width, height = renderer.GetSize()
+    if width == 0 or height == 0:
+        return None
+
+    points = []
+    props = renderer.GetViewProps()
+    props.InitTraversal()
+    for i in range(props.GetNumberOfItems()):
+        prop = props.GetNextProp()
+        if not (prop.GetVisibility() and prop.GetUseBounds()
+                and prop.IsA('vtkProp3D')):
+            continue
+        bounds, sample = get_prop_bounds(prop, max_points)
+        if bounds is None or not np.all(np.isfinite(bounds)) \
+                or bounds[0] > bounds[1]:
+            continue
+        if sample is None:
+            sample = [(x, y, z) for x in bounds[:2] for y in bounds[2:4]
+                      for z in bounds[4:]]
+        points.append(sample)
+    if len(points) == 0:
+        return None
+    projected = _project(renderer, np.concatenate(points))
+    if projected is None:
+        return None
+    x, y = projected
+    return x.min(), x.max(), y.min(), y.max(), float(width), float(height)
+
+
 def view(azimuth=None, elevation=None, distance=None, focalpoint=None,
          roll=None, reset_roll=True, figure=None):
     """ Sets/Gets the view point for the camera::
@@ -318,11 +478,24 @@ def view(azimuth=None, elevation=None, distance=None, focalpoint=None,
         cam.view_up = view_up
 
     if distance == 'auto':
-        # Reset the zoom, to have the full extents:
-        scene.reset_zoom()
-        x_min, x_max, y_min, y_max, w, h = get_outline_bounds(figure=figure)
-        x_focus, y_focus = world_to_display(cen[0], cen[1], cen[2],
-                                            figure=figure)
+        # Reset the zoom, to have the full extents, and frame the
+        # objects from their geometry.  This does not render so the pixels
+        # of a screenshot are only used when the geometry cannot be
+        # projected.
+        ren.reset_camera()
+        extent = get_projected_bounds(figure=f, max_points=_FIT_POINTS)
+        if extent is not None:
+            x_min, x_max, y_min, y_max, w, h = extent
+            focus = _project(ren, cen)
+        if extent is None or focus is None:
+            scene.reset_zoom()
+            x_min, x_max, y_min, y_max, w, h = get_outline_bounds(figure=f)
+            # The rows of the screenshot go down, unlike the display y.
+            y_min, y_max = h - 1 - y_max, h - 1 - y_min
+            x_focus, y_focus = world_to_display(cen[0], cen[1], cen[2],
+                                                figure=f)
+        else:
+            x_focus, y_focus = focus[0][0], focus[1][0]
 
         ratio = 1.1 * max((x_focus - x_min) / x_focus,
                           (x_max - x_focus) / (w - x_focus),
@@ -263,6 +263,59 @@ def sync_camera(reference_figure, target_figure):
     )
 
 
+def _get_pixel_data(figure, mode, buffer, antialiased=False,
+                    depth_buffer=None):
+    """Read the pixels of the figure into the given VTK array `buffer`
+    and, if given, the depth values into the VTK float array
+    `depth_buffer`.  Returns the (height, width, components) shape of
+    the image, the rows are stored bottom row first.
+    """
+    # don't use figure.scene.get_size() here because this will be incorrect
+    # for HiDPI systems
+    render_window = figure.scene.render_window
+    x, y = tuple(render_window.size)
+
+    # Try to lift the window
+    figure.scene._lift()
+    if mode == 'rgb':
+        shape = (y, x, 3)
+        pixel_getter = render_window.get_pixel_data
+    elif mode == 'rgba':
+        shape = (y, x, 4)
+        pixel_getter = render_window.get_rgba_pixel_data
+    else:
+        raise ValueError('mode type not understood')
+    if vtk_major_version > 7:
+        pg_args = (0, 0, x - 1, y - 1, 1, buffer, 0)
+    else:
+        pg_args = (0, 0, x - 1, y - 1, 1, buffer)
+
+    def read():
+        pixel_getter(*pg_args)
+        if depth_buffer is not None:
+            render_window.get_zbuffer_data(0, 0, x - 1, y - 1, depth_buffer)
+
+    if antialiased:
+        # save the current aa value to restore it later
+        if hasattr(render_window, 'aa_frames'):
+            old_aa = render_window.aa_frames
+            render_window.aa_frames = figure.scene.anti_aliasing_frames
+        else:
+            old_aa = render_window.multi_samples
+            render_window.multi_samples = figure.scene.anti_aliasing_frames
+        figure.scene.render()
+        read()
+        if hasattr(render_window, 'aa_frames'):
+            render_window.aa_frames = old_aa
+        else:
+            render_window.multi_samples = old_aa
+        figure.scene.render()
+
+    else:
+        read()
+    return shape
+
+
 def screenshot(figure=None, mode='rgb', antialiased=False):
     """ Return the current figure pixmap as an array.
 
@@ -284,6 +337,12 @@ def screenshot(figure=None, mode='rgb', antialiased=False):
         will capture the other window. This limitation is due to the
         heavy use of the hardware graphics system.
 
+        Every call allocates a new array.  To take many screenshots of a
+        figure, for example at every frame of an animation, use a
+        `mayavi.tools.figure.Capture` which reuses its buffers, can copy
+        the pixels into a given array and can also return the depth
+        buffer.
+
         **Examples**
 
         This function can be useful for integrating 3D plotting with
@@ -300,55 +359,97 @@ def screenshot(figure=None, mode='rgb', antialiased=False):
     """
     if figure is None:
         figure = gcf()
-    # don't use figure.scene.get_size() here because this will be incorrect
-    # for HiDPI systems
-    x, y = tuple(figure.scene.render_window.size)
-
-    # Try to lift the window
-    figure.scene._lift()
     if mode == 'rgb':
-        out = tvtk.UnsignedCharArray()
-        shape = (y, x, 3)
-        pixel_getter = figure.scene.render_window.get_pixel_data
-        if vtk_major_version > 7:
-            pg_args = (0, 0, x - 1, y - 1, 1, out, 0)
-        else:
-            pg_args = (0, 0, x - 1, y - 1, 1, out)
+        buffer = tvtk.UnsignedCharArray()
+    else:
+        buffer = tvtk.FloatArray()
+    shape = _get_pixel_data(figure, mode, buffer, antialiased)
 
-    elif mode == 'rgba':
-        out = tvtk.FloatArray()
-        shape = (y, x, 4)
-        pixel_getter = figure.scene.render_window.get_rgba_pixel_data
-        if vtk_major_version > 7:
-            pg_args = (0, 0, x - 1, y - 1, 1, out, 0)
-        else:
-            pg_args = (0, 0, x - 1, y - 1, 1, out)
+    # Return the array in a way that pylab.imshow plots it right:
+    result = buffer.to_array()
+    result.shape = shape
+    result = np.flipud(result)
+    return result
 
-    else:
-        raise ValueError('mode type not understood')
 
-    if antialiased:
-        # save the current aa value to restore it later
-        render_window = figure.scene.render_window
-        if hasattr(render_window, 'aa_frames'):
-            old_aa = render_window.aa_frames
-            render_window.aa_frames = figure.scene.anti_aliasing_frames
-        else:
-            old_aa = render_window.multi_samples
-            render_window.multi_samples = figure.scene.anti_aliasing_frames
-        figure.scene.render()
-        pixel_getter(*pg_args)
-        if hasattr(render_window, 'aa_frames'):
-            render_window.aa_frames = old_aa
-        else:
-            render_window.multi_samples = old_aa
-        figure.scene.render()
+class Capture(object):
+    """ Take screenshots of a figure repeatedly, reusing the buffers.
 
-    else:
-        pixel_getter(*pg_args)
+        Unlike `screenshot`, the pixels are read into the same VTK array
+        at every call and are copied, flipped so that the top row is
+        first, into the same output array.  With `flip=False` the copy
+        is skipped and a view of the VTK array is returned, with the
+        bottom row first.  In both cases the returned arrays are
+        overwritten by the next call; copy them to keep them.
 
-    # Return the array in a way that pylab.imshow plots it right:
-    out = out.to_array()
-    out.shape = shape
-    out = np.flipud(out)
-    return out
+        **Parameters**
+
+        :figure: a figure instance or None, optional
+            The figure to capture, the current figure by default.
+        :mode: {'rgb', 'rgba'}
+            The color mode of the array captured.
+        :depth: {False, True}
+            Also capture the depth buffer, as float32 values between 0
+            (near) and 1 (far).
+        :flip: {True, False}
+            Return the images with the top row first.
+
+        **Examples**
+
+        >>> capture = Capture(depth=True)
+        >>> for i in range(100):
+        ...     update_scene(i)
+        ...     image, depth = capture()
+        ...     dataset.append((image.copy(), depth.copy()))
+    """
+
+    def __init__(self, figure=None, mode='rgb', depth=False, flip=True):
+        if mode not in ('rgb', 'rgba'):
+            raise ValueError('mode type not understood')
+        self.figure = figure
+        self.mode = mode
+        self.depth = depth
+        self.flip = flip
+        if mode == 'rgb':
+            self._buffer = tvtk.UnsignedCharArray()
+        else:
+            self._buffer = tvtk.FloatArray()
+        self._depth_buffer = tvtk.FloatArray() if depth else None
+        self._out = None
+        self._depth_out = None
+
+    def __call__(self, antialiased=False, out=None, depth_out=None):
+        """ Capture the figure and return the image, or the image and the
+            depth buffer if `depth` is True.
+
+            **Parameters**
+
+            :antialiased: {False, True}
+                Use anti-aliasing for rendering the screenshot.
+            :out, depth_out: arrays or None, optional
+                If specified, the arrays the image and depth buffer are
+                copied into instead of the internal ones.
+        """
+        figure = self.figure
+        if figure is None:
+            figure = gcf()
+        shape = _get_pixel_data(figure, self.mode, self._buffer,
+                                antialiased, self._depth_buffer)
+        image = self._get_result(self._buffer, shape, out, '_out')
+        if not self.depth:
+            return image
+        depth = self._get_result(self._depth_buffer, shape[:2], depth_out,
+                                 '_depth_out')
+        return image, depth
+
+    def _get_result(self, buffer, shape, out, name):
+        view = buffer.to_array().reshape(shape)
+        if not self.flip and out is None:
+            return view
+        if out is None:
+            out = getattr(self, name)
+            if out is None or out.shape != view.shape:
+                out = np.empty_like(view)
+                setattr(self, name, out)
+        np.copyto(out, view[::-1] if self.flip else view, casting='unsafe')
+        return out
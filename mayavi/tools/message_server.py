@@ -0,0 +1,451 @@
+""" A message based server to drive Mayavi from the network at a high
+rate, using asyncio.
+
+Unlike the servers of `mayavi.tools.server`, which exec the code they
+receive, this server only runs a set of named operations: moving the
+camera, updating the data of the mlab sources, taking screenshots etc.
+Several clients can be connected at once and the renders requested by a
+burst of messages are coalesced into a single render.
+
+Each message is made of a 4 byte header with the length of a JSON
+encoded dictionary, a 4 byte header with the length of the binary
+payload, both big endian, the JSON dictionary and the payload.  A
+request looks like::
+
+    {"id": 1, "op": "camera", "args": {"azimuth": 10},
+     "arrays": [{"name": "scalars", "dtype": "<f8", "shape": [10, 10]}]}
+
+where `arrays` describes the arrays stored one after the other in the
+payload.  The server replies with ``{"id": 1, "result": ...}`` or
+``{"id": 1, "error": "..."}``, arrays returned by an operation are sent in
+the payload.  Set ``"reply": false`` in a request to not get a reply.
+
+Here is sample usage::
+
+    from mayavi import mlab
+    from mayavi.tools import message_server
+    mlab.test_plot3d()
+    message_server.serve_messages()
+
+And from another process::
+
+    from mayavi.tools.message_server import MessageClient
+    client = MessageClient('localhost', 8008)
+    for i in range(360):
+        client.send('camera', azimuth=1)
+    image = client.call('screenshot')
+
+The operations are run in the thread of the asyncio event loop, which
+should be the thread rendering the scene.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import asyncio
+import json
+import logging
+import socket
+import struct
+
+import numpy as np
+
+from .tools import _traverse
+
+
+logger = logging.getLogger(__name__)
+
+# The lengths of the JSON header and of the binary payload.
+HEADER = struct.Struct('>II')
+
+# The largest JSON header or payload accepted, in bytes.
+MAX_SIZE = 1 << 30
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_message(header, arrays=None):
+    """Return the bytes of a message made of the given `header`
+    dictionary and the `arrays`, a dictionary of numpy arrays.
+    """
+    header = dict(header)
+    buffers = []
+    if arrays:
+        info = []
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            info.append(dict(name=name, dtype=array.dtype.str,
+                             shape=list(array.shape)))
+            buffers.append(array.data.cast('B'))
+        header['arrays'] = info
+    text = json.dumps(header).encode('utf-8')
+    size = sum(len(b) for b in buffers)
+    return b''.join([HEADER.pack(len(text), size), text] + buffers)
+
+
+def _decode_array_info(info):
+    """Return the name, dtype, shape and number of items of the array
+    described by `info`, raising a `ProtocolError` if it is invalid.
+    """
+    if not isinstance(info, dict) or \
+            not {'name', 'dtype', 'shape'}.issubset(info):
+        raise ProtocolError('An array needs a name, a dtype and a shape.')
+    name, dtype, shape = info['name'], info['dtype'], info['shape']
+    if not isinstance(name, str):
+        raise ProtocolError('Invalid array name %r.' % (name,))
+    if not isinstance(dtype, str):
+        raise ProtocolError('Invalid array dtype %r.' % (dtype,))
+    try:
+        dtype = np.dtype(dtype)
+    except (TypeError, ValueError) as e:
+        raise ProtocolError('Invalid array dtype: %s' % e)
+    if dtype.hasobject or dtype.itemsize == 0:
+        raise ProtocolError('Unsupported array dtype %r.' % dtype.str)
+    if not isinstance(shape, list) or \
+            not all(type(n) is int and n >= 0 for n in shape):
+        raise ProtocolError('Invalid array shape %r.' % (shape,))
+    count = 1
+    for n in shape:
+        count *= n
+    return name, dtype, tuple(shape), count
+
+
+def decode_payload(header, payload):
+    """Return a dictionary of the arrays described by the `header` of a
+    message in its `payload`.  The arrays are read-only views on the
+    payload, which must hold exactly these arrays.
+    """
+    info_list = header.get('arrays', [])
+    if not isinstance(info_list, list):
+        raise ProtocolError('The arrays of a message must be a list.')
+    arrays = {}
+    offset = 0
+    for info in info_list:
+        name, dtype, shape, count = _decode_array_info(info)
+        end = offset + count*dtype.itemsize
+        if end > len(payload):
+            raise ProtocolError('The payload is too short.')
+        array = np.frombuffer(payload, dtype=dtype, count=count,
+                              offset=offset)
+        arrays[name] = array.reshape(shape)
+        offset = end
+    if offset != len(payload):
+        raise ProtocolError('The payload is too long.')
+    return arrays
+
+
+def _decode_header(data):
+    try:
+        header = json.loads(data.decode('utf-8'))
+    except ValueError as e:
+        raise ProtocolError('Invalid message header: %s' % e)
+    if not isinstance(header, dict):
+        raise ProtocolError('The message header must be a dictionary.')
+    return header
+
+
+def _check_sizes(text_size, size):
+    if text_size > MAX_SIZE or size > MAX_SIZE:
+        raise ProtocolError('The message is too large.')
+
+
+async def read_message(reader):
+    """Read a message from the given `asyncio.StreamReader` and return its
+    header and arrays, or `None` at the end of the stream.
+    """
+    try:
+        data = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if e.partial:
+            raise ProtocolError('Incomplete message.')
+        return None
+    text_size, size = HEADER.unpack(data)
+    _check_sizes(text_size, size)
+    header = _decode_header(await reader.readexactly(text_size))
+    payload = await reader.readexactly(size)
+    return header, decode_payload(header, payload)
+
+
+###############################################################################
+# `CommandHandler` class.
+###############################################################################
+class CommandHandler(object):
+    """Runs the operations requested by the clients on a Mayavi engine.
+
+    The operations are the methods named ``op_<name>``, they are given
+    the arguments of the request as keywords and its arrays as the
+    `arrays` keyword.  More can be added with `register`.
+
+    Operations changing the scene call `request_render`, the scene is
+    then rendered once all the messages already received are handled,
+    so a burst of messages yields a single render.
+    """
+
+    def __init__(self, engine=None, scene=None, loop=None):
+        if engine is None:
+            from mayavi import mlab
+            engine = mlab.get_engine()
+        self.engine = engine
+        if scene is None:
+            scene = engine.current_scene.scene
+        self.scene = scene
+        self.loop = loop
+        #: The number of renders done.
+        self.renders = 0
+        self._render_pending = False
+        self._operations = {}
+
+    def register(self, name, function):
+        """Register `function` as the operation `name`."""
+        self._operations[name] = function
+
+    def get_operation(self, name):
+        function = self._operations.get(name)
+        if function is None and isinstance(name, str):
+            function = getattr(self, 'op_' + name, None)
+        if function is None:
+            raise ValueError('Unknown operation %r.' % name)
+        return function
+
+    def handle(self, header, arrays):
+        """Run the operation of a request and return the reply header
+        and arrays.
+        """
+        reply = {}
+        if 'id' in header:
+            reply['id'] = header['id']
+        result_arrays = None
+        try:
+            function = self.get_operation(header.get('op'))
+            result = function(arrays=arrays, **header.get('args', {}))
+            if isinstance(result, np.ndarray):
+                result_arrays = dict(result=result)
+                result = None
+            reply['result'] = result
+        except Exception as e:
+            logger.exception('Error running %r', header.get('op'))
+            reply['error'] = '%s: %s' % (e.__class__.__name__, e)
+        return reply, result_arrays
+
+    def request_render(self):
+        """Render the scene once the pending messages are handled."""
+        if not self._render_pending:
+            self._render_pending = True
+            loop = self.loop or asyncio.get_event_loop()
+            loop.call_soon(self.flush_render)
+
+    def flush_render(self):
+        """Do the requested render now, if any."""
+        if self._render_pending:
+            self._render_pending = False
+            self.renders += 1
+            self.scene.render()
+
+    def find_object(self, name):
+        """Return the object of the current scene with the given name."""
+        for obj in _traverse(self.engine.current_scene):
+            if getattr(obj, 'name', None) == name:
+                return obj
+        raise ValueError('No object named %r.' % name)
+
+    # ---- Operations -------
+    def op_ping(self, arrays):
+        return 'pong'
+
+    def op_render(self, arrays):
+        self.request_render()
+
+    def op_camera(self, arrays, azimuth=None, elevation=None, roll=None,
+                  zoom=None, dolly=None, position=None, focal_point=None,
+                  view_up=None, view_angle=None):
+        """Move the camera, the movements are applied after setting the
+        position, focal point, view up and view angle given.
+        """
+        camera = self.scene.camera
+        for name, value in (('position', position),
+                            ('focal_point', focal_point),
+                            ('view_up', view_up),
+                            ('view_angle', view_angle)):
+            if value is not None:
+                setattr(camera, name, value)
+        for name, value in (('azimuth', azimuth), ('elevation', elevation),
+                            ('roll', roll), ('zoom', zoom),
+                            ('dolly', dolly)):
+            if value is not None:
+                getattr(camera, name)(value)
+        if elevation is not None:
+            camera.orthogonalize_view_up()
+        self.request_render()
+        return dict(position=list(camera.position),
+                    focal_point=list(camera.focal_point),
+                    view_up=list(camera.view_up))
+
+    def op_update_data(self, arrays, object, reset=False):
+        """Update the arrays of the mlab source of the named object,
+        `reset` must be set when their shape changes.
+        """
+        source = getattr(self.find_object(object), 'mlab_source', None)
+        if source is None:
+            raise ValueError('The object %r has no mlab source.' % object)
+        # The arrays are read-only views on the message.
+        arrays = dict((k, np.array(v)) for k, v in arrays.items())
+        if reset:
+            source.reset(**arrays)
+        else:
+            source.set(**arrays)
+        self.request_render()
+
+    def op_screenshot(self, arrays, mode='rgb', antialiased=False):
+        """Return an image of the scene."""
+        from mayavi.tools.figure import screenshot
+        self.flush_render()
+        return screenshot(self.engine.current_scene, mode=mode,
+                          antialiased=antialiased)
+
+
+###############################################################################
+# `MessageServer` class.
+###############################################################################
+class MessageServer(object):
+    """An asyncio TCP server handling the messages of several clients
+    with a `CommandHandler`.
+
+    Example::
+
+        server = MessageServer(CommandHandler(engine))
+        loop.run_until_complete(server.start())
+        loop.run_forever()
+    """
+
+    def __init__(self, handler, host='localhost', port=8008,
+                 max_connections=None):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.connections = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._serve_client, self.host, self.port
+        )
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+        logger.info('Serving Mayavi messages on %s:%d', self.host, self.port)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve_client(self, reader, writer):
+        if self.max_connections is not None and \
+                self.connections >= self.max_connections:
+            writer.write(encode_message(dict(error='Server already in use.')))
+            writer.close()
+            return
+        self.connections += 1
+        handler = self.handler
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                header, arrays = message
+                reply, result_arrays = handler.handle(header, arrays)
+                if header.get('reply', True):
+                    writer.write(encode_message(reply, result_arrays))
+                    await writer.drain()
+        except (ProtocolError, ConnectionError) as e:
+            logger.warning('Closing connection: %s', e)
+        finally:
+            self.connections -= 1
+            writer.close()
+
+
+def serve_messages(engine=None, host='localhost', port=8008,
+                   max_connections=None):
+    """Serve the message protocol for the given `engine` (by default
+    `mlab.get_engine()`) on the given `host` and `port`.  This function
+    runs an asyncio event loop and blocks till it is interrupted.
+
+    **Parameters**
+
+     :engine: Mayavi engine to use.
+
+     :host: str: the interface to listen on, use '' for all of them.
+
+     :port: int: port to serve on.
+
+     :max_connections: int: Maximum number of simultaneous connections,
+                            `None` for no limit.
+    """
+    loop = asyncio.get_event_loop()
+    handler = CommandHandler(engine, loop=loop)
+    server = MessageServer(handler, host, port, max_connections)
+    loop.run_until_complete(server.start())
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(server.close())
+
+
+###############################################################################
+# `MessageClient` class.
+###############################################################################
+class MessageClient(object):
+    """A simple blocking client for the message server.
+
+    `send` sends a request without waiting for its reply, so requests can
+    be pipelined, and `receive` reads the next reply.  `call` does both.
+    """
+
+    def __init__(self, host='localhost', port=8008):
+        self._sock = socket.create_connection((host, port))
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._file = self._sock.makefile('rb')
+        self._id = 0
+
+    def send(self, op, arrays=None, reply=True, **args):
+        """Send a request for the operation `op` with the given arrays and
+        keyword arguments and return its id.
+        """
+        self._id += 1
+        header = dict(id=self._id, op=op, args=args)
+        if not reply:
+            header['reply'] = False
+        self._sock.sendall(encode_message(header, arrays))
+        return self._id
+
+    def receive(self):
+        """Return the next reply header and arrays."""
+        data = self._read(HEADER.size)
+        text_size, size = HEADER.unpack(data)
+        _check_sizes(text_size, size)
+        header = _decode_header(self._read(text_size))
+        return header, decode_payload(header, self._read(size))
+
+    def call(self, op, arrays=None, **args):
+        """Run the operation and return its result, errors are raised as
+        a `RuntimeError`.
+        """
+        self.send(op, arrays, **args)
+        header, result_arrays = self.receive()
+        if 'error' in header:
+            raise RuntimeError(header['error'])
+        return result_arrays.get('result', header.get('result'))
+
+    def close(self):
+        self._file.close()
+        self._sock.close()
+
+    def _read(self, size):
+        data = self._file.read(size)
+        if len(data) != size:
+            raise ProtocolError('Connection closed.')
+        return data
@@ -13,5 +13,5 @@ from .sources import *
 from .filters import *
 from .tools import add_dataset, set_extent, add_module_manager, \
     get_vtk_src
-from .probe_data import probe_data
+from .probe_data import probe_data, Prober
 from .tools import _traverse as traverse
@@ -9,6 +9,155 @@ from tvtk.api import tvtk
 from . import tools
 import tvtk.common as tvtk_common
 
+
+DATA_TYPES = ('scalars', 'vectors', 'tensors')
+
+
+def _reshape_values(values, type, shape):
+    """Reshape the probed `values` of the given type to the `shape` of
+    the probe points, the components are along the first axis.
+    """
+    shape = list(shape)
+    if type == 'scalars':
+        values = np.reshape(values, shape)
+    elif type == 'vectors':
+        values = np.reshape(values, shape + [3, ])
+        values = np.rollaxis(values, -1)
+    else:
+        values = np.reshape(values, shape + [-1, ])
+        values = np.rollaxis(values, -1)
+    return values
+
+
+class Prober(object):
+    """ Retrieve the data of a Mayavi visualization object or a VTK
+        dataset at many points, repeatedly.
+
+        The probe filter is created once and, for datasets that need to
+        search for the cell containing a point (polydata, unstructured
+        and structured grids), a static cell locator is built once and
+        only rebuilt when the dataset is modified.  This makes probing
+        the same data at new points much cheaper than with `probe_data`.
+        Pass `locator=False` to rely on the default cell search of the
+        dataset, which is cheaper when probing only once.
+
+        Example::
+
+            prober = Prober(iso)
+            for x, y, z in sensor_paths:
+                scalars, vectors = prober.probe(x, y, z,
+                                                type=('scalars', 'vectors'))
+    """
+
+    def __init__(self, mayavi_object, locator=True):
+        self.dataset = tools.get_vtk_src(mayavi_object)[0]
+        self._probe_data = tvtk.PolyData()
+        self._probe = probe = tvtk.ProbeFilter()
+        tvtk_common.configure_input_data(probe, self._probe_data)
+        tvtk_common.configure_source_data(probe, self.dataset)
+        self._locator = None
+        if locator and self.dataset.is_a('vtkPointSet') and \
+                hasattr(tvtk, 'CellLocatorStrategy'):
+            self._locator = tvtk.StaticCellLocator(data_set=self.dataset)
+            probe.find_cell_strategy = tvtk.CellLocatorStrategy(
+                cell_locator=self._locator
+            )
+        self._locator_mtime = None
+
+    def probe(self, x, y, z, type='scalars', location='points'):
+        """ Retrieve the data at points x, y, z.
+
+            **Parameters**
+
+            :x: float or ndarray.
+                The x position where you want to retrieve the data.
+            :y: float or ndarray.
+                The y position where you want to retrieve the data.
+            :z: float or ndarray
+                The z position where you want to retrieve the data.
+            :type: 'scalars', 'vectors' or 'tensors' or a sequence of
+                   these, optional
+                The type of the data to retrieve.
+            :location: 'points' or 'cells', optional
+                The location of the data to retrieve.
+
+            **Returns**
+
+            The values of the data at the given points as with
+            `probe_data`.  If `type` is a sequence, a list of the values
+            for each type is returned.
+        """
+        return self.probe_many([(x, y, z)], type, location)[0]
+
+    def probe_many(self, point_sets, type='scalars', location='points'):
+        """ Retrieve the data for several sets of points in one pass.
+
+            `point_sets` is a sequence of (x, y, z) tuples of arrays, the
+            other arguments are as for `probe`.  A list of the results
+            for each set of points is returned.
+        """
+        types = [type] if isinstance(type, str) else list(type)
+        for t in types:
+            assert t in DATA_TYPES, (
+                "Invalid value for type: must be 'scalars', 'vectors' or "
+                "'tensors', but '%s' was given" % t)
+        if location not in ('points', 'cells'):
+            raise ValueError("Invalid value for data location, must be "
+                             "'points' or 'cells', but '%s' was given."
+                             % location)
+
+        shapes = []
+        points = []
+        for x, y, z in point_sets:
+            x = np.atleast_1d(x)
+            y = np.atleast_1d(y)
+            z = np.atleast_1d(z)
+            assert y.shape == z.shape == x.shape, \
+                'The x, y and z arguments must have the same shape'
+            shapes.append(x.shape)
+            points.append(np.c_[x.ravel(), y.ravel(), z.ravel()])
+
+        output = self._execute(np.concatenate(points))
+        if location == 'points':
+            data = output.point_data
+        else:
+            data = output.cell_data
+
+        all_values = []
+        for t in types:
+            values = getattr(data, t)
+            if values is None:
+                raise ValueError("The object given has no %s data of type "
+                                 "%s" % (location, t))
+            all_values.append(values.to_array())
+
+        results = []
+        start = 0
+        for shape in shapes:
+            end = start + int(np.prod(shape))
+            result = [_reshape_values(values[start:end], t, shape)
+                      for t, values in zip(types, all_values)]
+            results.append(result[0] if isinstance(type, str) else result)
+            start = end
+        return results
+
+    def _execute(self, points):
+        """Probe the dataset at the given (N, 3) points and return the
+        output of the probe filter.
+        """
+        locator = self._locator
+        if locator is not None:
+            mtime = self.dataset._vtk_obj.GetMTime()
+            if mtime != self._locator_mtime:
+                locator.modified()
+                locator.build_locator()
+                self._locator_mtime = mtime
+        self._probe_data.points = points
+        probe = self._probe
+        probe.update()
+        return probe.output
+
+
 def probe_data(mayavi_object, x, y, z, type='scalars', location='points'):
     """ Retrieve the data from a described by Mayavi visualization object
         at points x, y, z.
@@ -33,46 +182,7 @@ def probe_data(mayavi_object, x, y, z, type='scalars', location='points'):
         The values of the data at the given point, as an ndarray
         (or multiple arrays, in the case of vectors or tensors) of the
         same shape as x, y, and z.
+
+        To probe the same object many times use a `Prober` instead.
     """
-    dataset = tools.get_vtk_src(mayavi_object)[0]
-    assert type in ('scalars', 'vectors', 'cells'), (
-        "Invalid value for type: must be 'scalars', 'vectors' or "
-        "'cells', but '%s' was given" % type)
-    x = np.atleast_1d(x)
-    y = np.atleast_1d(y)
-    z = np.atleast_1d(z)
-    shape = x.shape
-    assert y.shape == z.shape == shape, \
-                        'The x, y and z arguments must have the same shape'
-    probe_data = mesh = tvtk.PolyData(points=np.c_[x.ravel(),
-                                                   y.ravel(),
-                                                   z.ravel()])
-    shape = list(shape)
-    probe = tvtk.ProbeFilter()
-    tvtk_common.configure_input_data(probe, probe_data)
-    tvtk_common.configure_source_data(probe, dataset)
-    probe.update()
-
-    if location == 'points':
-        data = probe.output.point_data
-    elif location == 'cells':
-        data = probe.output.cell_data
-    else:
-        raise ValueError("Invalid value for data location, must be "
-                         "'points' or 'cells', but '%s' was given."
-                         % location)
-
-    values = getattr(data, type)
-    if values is None:
-        raise ValueError("The object given has no %s data of type %s"
-                         % (location, type))
-    values = values.to_array()
-    if type == 'scalars':
-        values = np.reshape(values, shape)
-    elif type == 'vectors':
-        values = np.reshape(values, shape + [3, ])
-        values = np.rollaxis(values, -1)
-    else:
-        values = np.reshape(values, shape + [-1, ])
-        values = np.rollaxis(values, -1)
-    return values
+    return Prober(mayavi_object, locator=False).probe(x, y, z, type, location)
@@ -1,4 +1,6 @@
-from collections import defaultdict
+import asyncio
+from collections import OrderedDict, defaultdict
+import threading
 
 
 class Bridge(object):
@@ -40,6 +42,11 @@ class LocalBridge(Bridge):
         '''Add widget corresponding to a given scene id.
         '''
         self.widgets[scene_id].append(widget)
+        scene = self.scene_manager.scenes.get(scene_id)
+        if scene is not None:
+            # The widget only gets the frames sent from now on, so the
+            # next one is sent in full for the changed tiles to apply to.
+            scene.image_encoder.reset()
 
     def remove_widget(self, scene_id, widget):
         '''Remove a widget corresponding to a given scene_id.
@@ -58,3 +65,148 @@ class LocalBridge(Bridge):
         s_id, obj_name, event, data = event_data
         for w in self.widgets[s_id]:
             w.handle_vtk_event(obj_name, event, data)
+
+
+def merge_tiles(old, new):
+    '''Merge two render events data with changed tiles into one, the
+    tiles of `old` that are replaced by a tile of `new` are dropped.
+    '''
+    rects = set((t['x'], t['y'], t['width'], t['height'])
+                for t in new['tiles'])
+    tiles = [t for t in old['tiles']
+             if (t['x'], t['y'], t['width'], t['height']) not in rects]
+    data = dict(new)
+    data['tiles'] = tiles + new['tiles']
+    return data
+
+
+class FrameQueue(object):
+    '''The events not yet delivered to a client.
+
+    Only what the client needs to catch up is kept: the last event of
+    each kind for each scene and, for the render events, the last full
+    frame followed by the tiles changed since then merged together.  So
+    a client that falls behind skips frames instead of accumulating
+    them.  The queue can be used from several threads.
+    '''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = OrderedDict()
+        self.closed = False
+        #: The number of events dropped.
+        self.dropped = 0
+
+    def put(self, event):
+        s_id, obj_name, vtk_event, data = event
+        key = s_id, vtk_event
+        with self._lock:
+            events = self._events.pop(key, [])
+            if vtk_event == 'RenderEvent' and events and \
+                    data.get('type') == 'tiles':
+                last = events[-1]
+                if last.data.get('type') == 'tiles':
+                    event = event._replace(data=merge_tiles(last.data, data))
+                    events = events[:-1]
+                    self.dropped += 1
+            else:
+                self.dropped += len(events)
+                events = []
+            events.append(event)
+            self._events[key] = events
+
+    def get_all(self):
+        '''Remove and return the pending events in order.'''
+        with self._lock:
+            events = [e for x in self._events.values() for e in x]
+            self._events.clear()
+        return events
+
+    def close(self):
+        self.closed = True
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(x) for x in self._events.values())
+
+
+class AsyncBridge(LocalBridge):
+    '''A local bridge delivering the events to the widgets from an asyncio
+    event loop.
+
+    `handle_event` only queues the events, so it returns immediately and
+    a slow widget never holds up the rendering.  Each widget gets its
+    events from its own `FrameQueue`, in order, dropping the frames it is
+    too slow to show.  The `handle_vtk_event` method of a widget may be a
+    coroutine function, otherwise it is called in the default executor
+    of the loop so a slow widget does not delay the others either.
+    '''
+    def __init__(self, scene_manager, loop=None):
+        super(AsyncBridge, self).__init__(scene_manager)
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self.loop = loop
+        self.queues = {}
+        self._wakeups = {}
+        self._lock = threading.Lock()
+
+    def add_widget(self, scene_id, widget):
+        '''Add widget corresponding to a given scene id.
+        '''
+        queue = FrameQueue()
+        with self._lock:
+            super(AsyncBridge, self).add_widget(scene_id, widget)
+            self.queues[widget] = queue
+        return asyncio.run_coroutine_threadsafe(
+            self._deliver(widget, queue), self.loop
+        )
+
+    def remove_widget(self, scene_id, widget):
+        '''Remove a widget corresponding to a given scene_id.
+        '''
+        with self._lock:
+            super(AsyncBridge, self).remove_widget(scene_id, widget)
+            queue = self.queues.pop(widget)
+        queue.close()
+        self._wakeup(widget)
+
+    def handle_event(self, event_data):
+        '''Handle an event sent by the server.
+        '''
+        s_id = event_data[0]
+        with self._lock:
+            widgets = list(self.widgets.get(s_id, []))
+            queues = [self.queues[w] for w in widgets]
+        for widget, queue in zip(widgets, queues):
+            queue.put(event_data)
+            self._wakeup(widget)
+
+    # ---- Private protocol -------
+    def _wakeup(self, widget):
+        self.loop.call_soon_threadsafe(self._set_wakeup, widget)
+
+    def _set_wakeup(self, widget):
+        wakeup = self._wakeups.get(widget)
+        if wakeup is not None:
+            wakeup.set()
+
+    async def _deliver(self, widget, queue):
+        self._wakeups[widget] = wakeup = asyncio.Event()
+        handler = widget.handle_vtk_event
+        is_async = asyncio.iscoroutinefunction(handler)
+        try:
+            while not queue.closed:
+                for s_id, obj_name, event, data in queue.get_all():
+                    if is_async:
+                        await handler(obj_name, event, data)
+                    else:
+                        await self.loop.run_in_executor(
+                            None, handler, obj_name, event, data
+                        )
+                    if queue.closed:
+                        break
+                else:
+                    await wakeup.wait()
+                    wakeup.clear()
+        finally:
+            del self._wakeups[widget]
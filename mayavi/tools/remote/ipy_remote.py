@@ -3,25 +3,43 @@ from IPython.display import display
 from ipywidgets import Image
 from ipyevents import Event
 
+try:
+    from ipycanvas import Canvas, hold_canvas
+except ImportError:
+    Canvas = None
+
 from .bridge import LocalBridge
 from .remote_scene import SceneManager
-from .remote_widget import RemoteWidget
+from .remote_widget import RemoteWidget, decode_image
 from ..figure import gcf
 
-decode_func = getattr(base64, 'decodebytes', getattr(base64, 'decodestring'))
+# The number of image widgets kept to send the changed tiles with.
+MAX_TILE_IMAGES = 256
 
 
 def base64_to_bytes(str_or_bytes):
     data = str_or_bytes.encode('ascii')
-    return decode_func(data)
+    return base64.decodebytes(data)
 
 
 class IPyRemoteWidget(RemoteWidget):
+    """Shows a remote scene in the notebook.
+
+    When ipycanvas is installed the frames are drawn on a canvas and only
+    the changed tiles are sent to the browser, as the PNG images received.
+    Otherwise the tiles are applied here and the whole frame is shown by
+    an image widget.
+    """
     def __init__(self, scene_proxy, bridge, *args, **kw):
         super(IPyRemoteWidget, self).__init__(scene_proxy, bridge, *args, **kw)
         self.image = Image(format='PNG')
+        self.canvas = None
+        if Canvas is not None:
+            self.canvas = Canvas(width=1, height=1)
+        # The image widgets drawing the tiles, for each tile rectangle.
+        self._tile_images = {}
         self.event = Event(
-            source=self.image,
+            source=self._get_view(),
             watched_events=[
                 'dragstart', 'mouseenter', 'mouseleave',
                 'mousedown', 'mouseup', 'mousemove', 'wheel',
@@ -33,7 +51,7 @@ class IPyRemoteWidget(RemoteWidget):
         self._update_image()
 
     def _ipython_display_(self):
-        display(self.image)
+        display(self._get_view())
 
     # ###### Public protocol ##############
 
@@ -41,13 +59,32 @@ class IPyRemoteWidget(RemoteWidget):
         pass
 
     def show_image(self, data, format='PNG'):
-        self.image.format = format
-        self.image.value = data
+        if self.canvas is None:
+            self.image.format = format
+            self.image.value = data
+        else:
+            height, width = decode_image(data, format).shape[:2]
+            self._set_size(width, height)
+            self._draw_frame(data, format)
 
     # ##### VTK Event handling ##########
     def on_render(self, data):
-        self.show_image(base64_to_bytes(data['data']),
-                        format=data.get('format', 'PNG'))
+        if 'size' in data:
+            self._set_size(*data['size'])
+        if self.canvas is None:
+            result = self.get_frame_image(data)
+            if result is not None:
+                self.show_image(*result)
+        elif data.get('type') == 'tiles':
+            if self._frame is None:
+                self._update_image()
+            else:
+                self._draw_tiles(data['tiles'], data.get('format', 'PNG'))
+        else:
+            image = base64_to_bytes(data['data'])
+            format = data.get('format', 'PNG')
+            self._frame = image, format
+            self._draw_frame(image, format)
 
     def on_cursor_changed(self, data):
         # self.setCursor(cursor)
@@ -93,6 +130,42 @@ class IPyRemoteWidget(RemoteWidget):
             key_sym = key
             self.on_key_release(ctrl, shift, key)
 
+    # #### Private protocol ############
+
+    def _get_view(self):
+        return self.image if self.canvas is None else self.canvas
+
+    def _set_size(self, width, height):
+        canvas = self.canvas
+        if canvas is None:
+            # Downsampled frames are shown at the size of the scene.
+            self.image.width, self.image.height = str(width), str(height)
+        elif (canvas.width, canvas.height) != (width, height):
+            canvas.width, canvas.height = width, height
+
+    def _draw_frame(self, data, format):
+        image = self.image
+        image.format = format
+        image.value = data
+        canvas = self.canvas
+        canvas.draw_image(image, 0, 0, canvas.width, canvas.height)
+
+    def _draw_tiles(self, tiles, format):
+        images = self._tile_images
+        if len(images) > MAX_TILE_IMAGES:
+            for image in images.values():
+                image.close()
+            images.clear()
+        canvas = self.canvas
+        with hold_canvas(canvas):
+            for tile in tiles:
+                rect = tile['x'], tile['y'], tile['width'], tile['height']
+                image = images.get(rect)
+                if image is None:
+                    image = images[rect] = Image(format=format)
+                image.value = base64_to_bytes(tile['data'])
+                canvas.draw_image(image, *rect)
+
 
 class WidgetManager(object):
     def __init__(self):
@@ -3,18 +3,24 @@ import base64
 from collections import namedtuple
 import time
 
-from traits.api import (Any, Bool, Dict, Enum, Event, HasTraits,
+from traits.api import (Any, Bool, Dict, Enum, Event, Float, HasTraits,
                         Instance, Int, List, Callable)
+import numpy as np
 import vtk
 
 from tvtk.api import tvtk
+from tvtk.common import configure_input_data
+from tvtk.pyface.frame_writer import encode_png
 from ..figure import figure, gcf
 from ..engine_manager import options
 from tvtk.tvtk_base import global_disable_update
 
 options.offscreen = True
 
-encode_func = getattr(base64, 'encodebytes', getattr(base64, 'encodestring'))
+
+def _encode(data):
+    return base64.encodebytes(data).decode('ascii')
+
 
 EventInfo = namedtuple('EventInfo', ['id', 'name', 'event', 'data'])
 
@@ -26,6 +32,11 @@ if hasattr(vtk, 'vtkOSOpenGLRenderWindow'):
     osm = ctypes.CDLL("libOSMesa.so", ctypes.RTLD_GLOBAL)
 
 
+# The (downsampling factor, JPEG quality) used while interacting, from the
+# best to the fastest.
+QUALITY_LEVELS = [(1, 80), (1, 60), (2, 60), (2, 40), (3, 40), (4, 30)]
+
+
 class ImageEncoder(HasTraits):
     scene = Any
     w2if = Instance(tvtk.WindowToImageFilter)
@@ -34,9 +45,32 @@ class ImageEncoder(HasTraits):
     quality = Int(60)
     compress = Bool(False)
 
+    #: The size in pixels of the square tiles compared with the previous
+    #: frame to find the changed regions.
+    tile_size = Int(64)
+
+    #: A full frame is sent instead of the changed tiles when more than
+    #: this fraction of the tiles changed.
+    max_tile_fraction = Float(0.5)
+
+    #: The downsampling factor of the frames sent when compressing.
+    downsample = Int(1)
+
     _png_writer = Instance(tvtk.ImageWriter)
     _jpg_writer = Instance(tvtk.ImageWriter)
 
+    # The writer used to encode the JPEG frames of `get_frame`.
+    _frame_jpg_writer = Instance(tvtk.ImageWriter)
+
+    # The buffer the pixels are read into.
+    _pixels = Instance(tvtk.UnsignedCharArray, ())
+
+    # The last frame the clients have exactly, top row first, or None.
+    _last_frame = Any
+
+    # The index in QUALITY_LEVELS used when compressing.
+    _level = Int(1)
+
     # ---- Public protocol -------
     def get_raw_image(self):
         '''Returns the raw bytes of the image.
@@ -45,9 +79,118 @@ class ImageEncoder(HasTraits):
         w = self.writer
         w.update()
         w.write()
+        # The clients may not have the previous frame anymore.
+        self.reset()
         return w.result.to_array().tostring()
 
+    def get_frame(self):
+        '''Returns the data to send for the current contents of the render
+        window as a dictionary, or None if nothing changed since the last
+        frame.
+
+        Only the tiles that changed are sent, as PNG images, when there
+        are few of them.  Otherwise the full frame is sent, as PNG or,
+        when compressing, as a JPEG image downsampled by the
+        `downsample` factor.  The data is base64 encoded.
+        '''
+        image = self._read_pixels()
+        last = self._last_frame
+        if last is not None and last.shape == image.shape:
+            tiles, fraction = self._find_dirty_tiles(image, last)
+            if not tiles:
+                return None
+            if fraction <= self.max_tile_fraction:
+                self._last_frame = image
+                return self._encode_tiles(image, tiles)
+        return self._encode_full_frame(image)
+
+    def reset(self):
+        '''Forget the last frame so the next one is sent in full.'''
+        self._last_frame = None
+
+    def adapt(self, frame_time, target_time):
+        '''Choose the quality level used when compressing given the time
+        taken to render and encode the last frame and the target time.
+        The quality is lowered when the frame took longer than the target
+        and raised when it took less than half of it.
+        '''
+        level = self._level
+        if frame_time > target_time:
+            level = min(level + 1, len(QUALITY_LEVELS) - 1)
+        elif frame_time < 0.5*target_time:
+            level = max(level - 1, 0)
+        if level != self._level:
+            self._level = level
+            self.downsample, self.quality = QUALITY_LEVELS[level]
+
     # ---- Private protocol -------
+    def _read_pixels(self):
+        rw = self.scene.render_window
+        width, height = rw.size
+        # Read the front buffer like the WindowToImageFilter does.
+        rw.get_pixel_data(0, 0, width - 1, height - 1, 1, self._pixels)
+        pixels = self._pixels.to_array().reshape(height, width, -1)
+        # VTK images have the bottom row first.
+        return pixels[::-1].copy()
+
+    def _find_dirty_tiles(self, image, last):
+        """Return the rectangles (x, y, width, height) made of the tiles
+        that differ between the two images, merging the adjacent tiles of
+        a row, and the fraction of the tiles that changed.
+        """
+        size = self.tile_size
+        height, width = image.shape[:2]
+        ny, nx = -(-height//size), -(-width//size)
+        changed = np.zeros((ny*size, nx*size), dtype=bool)
+        changed[:height, :width] = np.any(image != last, axis=2)
+        dirty = changed.reshape(ny, size, nx, size).any(axis=(1, 3))
+        tiles = []
+        for j, i in zip(*np.nonzero(dirty)):
+            x, y = i*size, j*size
+            h = min(size, height - y)
+            w = min(size, width - x)
+            if tiles and tiles[-1][1] == y and \
+                    tiles[-1][0] + tiles[-1][2] == x:
+                tiles[-1][2] += w
+            else:
+                tiles.append([x, y, w, h])
+        return tiles, dirty.mean()
+
+    def _encode_tiles(self, image, tiles):
+        data = []
+        for x, y, w, h in tiles:
+            tile = image[y:y + h, x:x + w]
+            data.append(dict(x=x, y=y, width=w, height=h,
+                             data=_encode(encode_png(tile))))
+        height, width = image.shape[:2]
+        return dict(type='tiles', format='PNG', size=(width, height),
+                    tiles=data)
+
+    def _encode_full_frame(self, image):
+        height, width = image.shape[:2]
+        if self.compress:
+            d = self.downsample
+            data = self._encode_jpeg(image[::d, ::d])
+            format = 'JPEG'
+            # The clients do not have the exact frame.
+            self._last_frame = None
+        else:
+            data = encode_png(image)
+            format = 'PNG'
+            self._last_frame = image
+        return dict(type='image', format=format, size=(width, height),
+                    data=_encode(data))
+
+    def _encode_jpeg(self, image):
+        height, width, n_comp = image.shape
+        data = tvtk.ImageData(dimensions=(width, height, 1))
+        data.point_data.scalars = image[::-1].reshape(-1, n_comp)
+        writer = self._frame_jpg_writer
+        writer.quality = self.quality
+        configure_input_data(writer, data)
+        writer.write()
+        return writer.result.to_array().tobytes()
+
     def _w2if_default(self):
         w2if = tvtk.WindowToImageFilter()
         if self.scene is not None:
@@ -71,6 +214,9 @@ class ImageEncoder(HasTraits):
     def __jpg_writer_default(self):
         return tvtk.JPEGWriter(quality=self.quality, write_to_memory=True)
 
+    def __frame_jpg_writer_default(self):
+        return tvtk.JPEGWriter(write_to_memory=True)
+
     def _quality_changed(self, value):
         self._jpg_writer.quality = value
 
@@ -103,6 +249,14 @@ class RemoteScene(HasTraits):
     #: The image encoder which converts the scene to a suitable image.
     image_encoder = Instance(ImageEncoder)
 
+    #: Adapt the quality and size of the frames sent while interacting to
+    #: the time taken to render and encode them.
+    adaptive = Bool(True)
+
+    #: The time in seconds to render and encode a frame aimed at when
+    #: `adaptive` is on.
+    target_frame_time = Float(0.05)
+
     def __init__(self, figure=None, **traits):
         super(RemoteScene, self).__init__(**traits)
         if figure is None:
@@ -115,7 +269,6 @@ class RemoteScene(HasTraits):
         self.rw = tvtk.to_vtk(self.trw)
         self.ren = tvtk.to_vtk(self.scene.renderer)
         self.id = id(self)
-        self._last_image = ''
         self._last_render = 0
         self._time_to_render = 0
         self._time_for_image = 0
@@ -134,9 +287,16 @@ class RemoteScene(HasTraits):
         self._doing_render = False
         return data
 
+    def get_frame(self):
+        self._doing_render = True
+        try:
+            return self.image_encoder.get_frame()
+        finally:
+            self._doing_render = False
+
     def get_image(self):
         data = self.get_raw_image()
-        return encode_func(data).decode('ascii')
+        return _encode(data)
 
     def call_rwi(self, method, *args):
         if method == 'SetSize':
@@ -211,18 +371,20 @@ class RemoteScene(HasTraits):
         self._pending_render = False
         event = 'RenderEvent'
         start = time.time()
-        img = self.get_image()
-        self._render_size = len(img)
-        # print(self._render_size)
+        data = self.get_frame()
         self._last_render = time.time()
         self._time_for_image = self._last_render - start
         self._time_to_render = self.ren.GetLastRenderTimeInSeconds()
-        # print("Time to render:", self._time_to_render)
-        if img != self._last_image:
-            self._last_image = img
-            format = self.image_encoder.image_type.upper()
-            data = dict(data=img, type='image', format=format,
-                        time=self._time_for_image,
+        encoder = self.image_encoder
+        if self.adaptive and encoder.compress:
+            encoder.adapt(self._time_for_image + self._time_to_render,
+                          self.target_frame_time)
+        if data is not None:
+            if data['type'] == 'tiles':
+                self._render_size = sum(len(t['data']) for t in data['tiles'])
+            else:
+                self._render_size = len(data['data'])
+            data.update(time=self._time_for_image,
                         render_time=self._time_to_render)
             self.event = EventInfo(
                 self.id, self.rw.GetClassName(), event, data
@@ -258,7 +420,10 @@ class SceneManager(HasTraits):
         `handle_event` which is given the event data from the scenes
         and route that to the appropriate recipient.
 
-        The event data is basically an `EventInfo` instance.
+        The event data is basically an `EventInfo` instance.  The same
+        instance is given to all the clients, so each frame is encoded
+        only once, and `handle_event` is called while rendering so it
+        should return quickly, see `bridge.AsyncBridge`.
         '''
         self.clients.append(client)
 
@@ -267,7 +432,13 @@ class SceneManager(HasTraits):
 
     def register_figure(self, figure):
         '''Given an existing figure, set it up for remote visualization.
+
+        A figure is only set up once, all the clients watching it share
+        the same images.
         '''
+        r_id = self.figure_to_id.get(figure)
+        if r_id is not None:
+            return r_id
         remote = RemoteScene(figure=figure)
         r_id = id(remote)
         self.figure_to_id[figure] = r_id
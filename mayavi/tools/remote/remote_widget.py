@@ -1,5 +1,26 @@
+import base64
 import imghdr
 
+from tvtk.api import tvtk
+from tvtk.pyface.frame_writer import encode_png
+
+
+def decode_image(data, format='PNG'):
+    """Decode the given PNG or JPEG bytes into an array of shape
+    (height, width, components) with the top row first.
+    """
+    if format == 'PNG':
+        reader = tvtk.PNGReader()
+    else:
+        reader = tvtk.JPEGReader()
+    reader.memory_buffer = data
+    reader.memory_buffer_length = len(data)
+    reader.update()
+    output = reader.output
+    width, height = output.dimensions[:2]
+    image = output.point_data.scalars.to_array().reshape(height, width, -1)
+    return image[::-1].copy()
+
 
 class RemoteWidget(object):
     """An abstract remote widget which talks to the bridge but has no toolkit
@@ -26,6 +47,9 @@ class RemoteWidget(object):
         self._wheelDelta = 0
         self._is_resizing = False
         self._move_count = 0
+        # The last full frame as (bytes, format), decoded into an array
+        # when tiles are applied to it.
+        self._frame = None
 
         # Note that since this is just a raw image sent by the server we do
         # not need to worry about the pixel ratio for this case unlike
@@ -46,12 +70,43 @@ class RemoteWidget(object):
     def show_image(self, data, format='PNG'):
         pass
 
+    def get_frame_image(self, data):
+        """Return the image bytes and format to show for the data of a
+        render event, applying the changed tiles sent to the last frame.
+
+        Tiles received before any full frame cannot be applied, the full
+        frame is then shown by `_update_image` and None is returned.
+        """
+        if data.get('type') == 'tiles':
+            if self._frame is None:
+                self._update_image()
+                return None
+            image, format = self._frame
+            if format is not None:
+                # Decode the full frame once, the tiles are then applied
+                # to the array.
+                image = decode_image(image, format)
+            for tile in data['tiles']:
+                x, y = tile['x'], tile['y']
+                h, w = tile['height'], tile['width']
+                image[y:y + h, x:x + w] = decode_image(
+                    base64.decodebytes(tile['data'].encode('ascii'))
+                )
+            self._frame = image, None
+            return encode_png(image), 'PNG'
+        else:
+            image = base64.decodebytes(data['data'].encode('ascii'))
+            format = data.get('format', 'PNG')
+            self._frame = image, format
+            return image, format
+
     # #### Private protocol ############
 
     def _update_image(self):
         data = self.scene_proxy.get_raw_image()
-        format = imghdr.what('', h=data)
-        self.show_image(data, format=format.upper())
+        format = imghdr.what('', h=data).upper()
+        self._frame = data, format
+        self.show_image(data, format=format)
 
     # ##### VTK Event handling ##########
     def on_render(self, data):
@@ -37,6 +37,8 @@ will be simply run on top of this.
 
 **Warning** while this is very powerful it is also a **huge security
 hole** since the remote user can do pretty much anything they want.
+See `mayavi.tools.message_server` for a server running only a set of
+named operations, which does not need Twisted.
 
 """
 
@@ -56,6 +58,23 @@ from twisted.internet import reactor
 from twisted.python import log
 
 
+# The scenes with a render scheduled.
+_pending_renders = set()
+
+
+def _render(scene):
+    _pending_renders.discard(id(scene))
+    scene.render()
+
+
+def _schedule_render(scene):
+    """Render the scene once the data already received is handled so a
+    burst of commands yields a single render."""
+    if id(scene) not in _pending_renders:
+        _pending_renders.add(id(scene))
+        reactor.callLater(0, _render, scene)
+
+
 ###############################################################################
 # `M2UDP` protocol.
 ###############################################################################
@@ -90,7 +109,7 @@ class M2UDP(DatagramProtocol):
                 exec(c, locals(), globals())
             except:
                 log.err()
-            scene.render()
+            _schedule_render(scene)
 
 
 ###############################################################################
@@ -140,7 +159,7 @@ class M2TCP(Protocol):
                 exec(c, locals(), globals())
             except:
                 log.err()
-            scene.render()
+            _schedule_render(scene)
 
 
 ###############################################################################
@@ -257,27 +257,129 @@ def _typical_distance(data_obj):
         return 0.4 * distance
 
 
+# Offsets to the cell itself and half of its 26 neighbours, every pair of
+# adjacent cells is visited once when these are used.
+_HALF_OFFSETS = [(i, j, k) for i in (-1, 0, 1) for j in (-1, 0, 1)
+                 for k in (-1, 0, 1) if (i, j, k) >= (0, 0, 0)]
+
+
+def _pair_min_distance2(points, i, start, count, chunk=2**20):
+    """ Return the minimum squared distance between each point `i` and
+        the points `start[n]:start[n] + count[n]`.  The pairs are
+        generated `chunk` at a time to limit the memory used.
+    """
+    best = numpy.inf
+    ends = numpy.cumsum(count)
+    n_first = 0
+    while n_first < len(i):
+        n_last = numpy.searchsorted(ends, ends[n_first] - count[n_first] +
+                                    chunk, side='right')
+        n_last = max(n_last, n_first + 1)
+        c = count[n_first:n_last]
+        total = c.sum()
+        if total > 0:
+            first = numpy.repeat(i[n_first:n_last], c)
+            offset = numpy.repeat(numpy.cumsum(c) - c, c)
+            second = numpy.arange(total) - offset + \
+                numpy.repeat(start[n_first:n_last], c)
+            delta = points[first] - points[second]
+            best = min(best, numpy.einsum('ij,ij->i', delta, delta).min())
+        n_first = n_last
+    return best
+
+
+def _grid_min_distance2(points, h):
+    """ Return the minimum squared distance between points in the same or
+        adjacent cells of a uniform grid of cell size `h`.  All the pairs
+        of points closer than `h` are considered so the result is the
+        true minimum if it is less than `h`**2.
+    """
+    cells = numpy.floor((points - points.min(axis=0))/h).astype(numpy.int64)
+    # Pad the grid so the neighbours of every cell have valid keys.
+    cells += 1
+    dims = cells.max(axis=0) + 2
+    keys = (cells[:, 0]*dims[1] + cells[:, 1])*dims[2] + cells[:, 2]
+    order = numpy.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    points = points[order]
+    cell_keys, starts, counts = numpy.unique(keys, return_index=True,
+                                             return_counts=True)
+    index = numpy.arange(len(points))
+    best = numpy.inf
+    for di, dj, dk in _HALF_OFFSETS:
+        offset = (di*dims[1] + dj)*dims[2] + dk
+        if offset == 0:
+            # Pairs within the same cell, each counted once.
+            cell = numpy.searchsorted(cell_keys, keys)
+            end = starts[cell] + counts[cell]
+            best = min(best, _pair_min_distance2(points, index, index + 1,
+                                                 end - index - 1))
+            continue
+        neighbour = keys + offset
+        cell = numpy.searchsorted(cell_keys, neighbour)
+        cell[cell == len(cell_keys)] = 0
+        found = numpy.nonzero(cell_keys[cell] == neighbour)[0]
+        cell = cell[found]
+        best = min(best, _pair_min_distance2(points, found, starts[cell],
+                                             counts[cell]))
+    return best
+
+
 def _min_distance(x, y, z):
     """ Return the minimum interparticle distance in a cloud of points.
-        This is done by brute force calculation of all the distances
-        between particle couples.
+        Coincident points are ignored.
+
+        Small clouds are handled by brute force calculation of all the
+        distances between particle couples.  For larger ones, an upper
+        bound of the distance is found from neighbours along each axis
+        and the points are hashed on a uniform grid of that size so that
+        only the points in adjacent cells need to be compared.
     """
-    distances = numpy.sqrt((x.reshape((-1,)) - x.reshape((1, -1))) ** 2
-                           + (y.reshape((-1,)) - y.reshape((1, -1))) ** 2
-                           + (z.reshape((-1,)) - z.reshape((1, -1))) ** 2
-                          )
-    return distances[distances != 0].min()
+    points = numpy.c_[numpy.ravel(x), numpy.ravel(y), numpy.ravel(z)]
+    points = numpy.unique(points.astype(float), axis=0)
+    n = len(points)
+    if n < 2:
+        raise ValueError("At least two distinct points are needed.")
+    if n <= 1024:
+        delta = points[:, numpy.newaxis] - points[numpy.newaxis]
+        distances = numpy.sqrt((delta**2).sum(axis=-1))
+        return distances[distances != 0].min()
+
+    # The points are sorted along x, so neighbours give an upper bound
+    # for the minimum distance, as do neighbours along y and z.
+    bound = numpy.inf
+    for axis in range(3):
+        if axis == 0:
+            sorted_points = points
+        else:
+            sorted_points = points[numpy.argsort(points[:, axis])]
+        delta = numpy.diff(sorted_points, axis=0)
+        bound = min(bound, numpy.einsum('ij,ij->i', delta, delta).min())
+    h = numpy.sqrt(bound)
+
+    # Keep the grid dimensions small enough for the cell keys.
+    extent = (points.max(axis=0) - points.min(axis=0)).max()
+    h = max(h, extent/2.0e6)
+
+    # A finer grid is cheaper when the bound is poor, the result is only
+    # exact if it is below the cell size though.
+    h_fine = h/4.0
+    if h_fine > extent/2.0e6:
+        best = _grid_min_distance2(points, h_fine)
+        if best < h_fine**2:
+            return numpy.sqrt(best)
+    return numpy.sqrt(min(bound, _grid_min_distance2(points, h)))
 
 
 def _min_axis_distance(x, y, z):
     """ Return the minimum interparticle distance in a cloud of points
         along one of the axis.
-        This is done by brute force calculation of all the distances with
-        norm infinity between particle couples.
+        This is the smallest non-zero difference between the coordinates
+        of two particles along the x, y or z axis.  It is computed from
+        the sorted unique coordinates along each axis.
     """
     def axis_min(a):
-        a = numpy.abs(a.reshape((-1,)) - a.reshape((-1, 1)))
-        a = a[a > 0]
+        a = numpy.diff(numpy.unique(a))
         if a.size == 0:
             return numpy.inf
         return a.min()
@@ -10,7 +10,10 @@ from tvtk.version import version, version as __version__
 from tvtk.tvtk_access import tvtk
 
 # Handy colors from VTK.
-from vtk.util import colors
+try:
+    from vtkmodules.util import colors
+except ImportError:
+    from vtk.util import colors
 
 # Some miscellaneous functionality.
 from tvtk.misc import write_data
@@ -13,14 +13,21 @@ seems no unique one-to-one VTK data array type to map it to.
 # Copyright (c) 2004-2020,  Enthought, Inc.
 # License: BSD Style.
 
+import itertools
+import logging
 import sys
 
-import vtk
-from vtk.util import vtkConstants
 try:
-    from vtk.util import numpy_support
+    from vtkmodules.util import vtkConstants
 except ImportError:
-    numpy_support = None
+    from vtk.util import vtkConstants
+try:
+    from vtkmodules.util import numpy_support
+except ImportError:
+    try:
+        from vtk.util import numpy_support
+    except ImportError:
+        numpy_support = None
 
 import numpy
 
@@ -31,7 +38,10 @@ try:
 except ImportError:
     HAS_ARRAY_EXT = False
 
-from tvtk.common import is_old_pipeline
+from tvtk import vtk_module as vtk
+from tvtk.common import is_old_pipeline, is_version_9
+
+logger = logging.getLogger(__name__)
 
 # Useful constants for VTK arrays.
 VTK_ID_TYPE_SIZE = vtk.vtkIdTypeArray().GetDataTypeSize()
@@ -102,14 +112,40 @@ class ArrayCache(object):
     of which are converted to VTK arrays.  The caching prevents the user
     from deleting or resizing the numpy array after it has been sent
     down to VTK.  The cached arrays are automatically removed when the
-    VTK array destructs."""
+    VTK array destructs.
+
+    The cache keeps track of the number of bytes of numpy memory it
+    holds on to, see `nbytes` and `get_stats`.  An optional soft
+    `budget` (in bytes) may be set.  When the cached memory exceeds the
+    budget, a warning is logged or a `MemoryError` is raised depending
+    on `budget_action`.  Note that the array is cached even when the
+    error is raised since VTK already refers to its data.
+
+    Parameters
+    ----------
+
+    - budget : `int` (default: `None`)
+
+      The soft limit on the number of cached bytes, `None` disables it.
+
+    - budget_action : `str` (default: 'log')
+
+      What to do when the budget is exceeded, either 'log' or 'raise'.
+
+    """
 
     ######################################################################
     # `object` interface.
     ######################################################################
-    def __init__(self):
+    def __init__(self, budget=None, budget_action='log'):
         # The cache.
         self._cache = {}
+        # Shape and class of the VTK array for each entry.
+        self._info = {}
+        # Total number of bytes cached.
+        self._nbytes = 0
+        self.budget = budget
+        self.budget_action = budget_action
 
     def __len__(self):
         return len(self._cache)
@@ -121,29 +157,78 @@ class ArrayCache(object):
     ######################################################################
     # `ArrayCache` interface.
     ######################################################################
+    @property
+    def nbytes(self):
+        """The total number of bytes of the cached numpy arrays."""
+        return self._nbytes
+
     def add(self, vtk_arr, np_arr):
         """Add numpy array corresponding to the vtk array to the
         cache."""
         key = vtk_arr.__this__
         cache = self._cache
 
-        # Setup a callback so this cached array reference is removed
-        # when the VTK array is destroyed.  Passing the key to the
-        # `lambda` function is necessary because the callback will not
-        # receive the object (it will receive `None`) and thus there
-        # is no way to know which array reference one has to remove.
-        vtk_arr.AddObserver(
-            'DeleteEvent', lambda o, e, key=key: self._remove_array(key)
-        )
+        if key in cache:
+            # The VTK array is already cached and was re-pointed at new
+            # data, the observer is already in place so just swap the
+            # reference.
+            self._nbytes -= cache[key].nbytes
+        else:
+            # Setup a callback so this cached array reference is
+            # removed when the VTK array is destroyed.  Passing the key
+            # to the `lambda` function is necessary because the
+            # callback will not receive the object (it will receive
+            # `None`) and thus there is no way to know which array
+            # reference one has to remove.
+            vtk_arr.AddObserver(
+                'DeleteEvent', lambda o, e, key=key: self._remove_array(key)
+            )
 
         # Cache the array
         cache[key] = np_arr
+        self._info[key] = (
+            vtk_arr.GetClassName(),
+            (vtk_arr.GetNumberOfTuples(), vtk_arr.GetNumberOfComponents())
+        )
+        self._nbytes += np_arr.nbytes
+
+        if self.budget is not None and self._nbytes > self.budget:
+            self._budget_exceeded()
 
     def get(self, vtk_arr):
         """Return the cached numpy array given a VTK array."""
         key = vtk_arr.__this__
         return self._cache[key]
 
+    def get_entries(self):
+        """Return a list of dictionaries describing each cached array.
+
+        Each dictionary has the keys 'key' (the VTK array address),
+        'vtk_class', 'shape' (number of tuples and components),
+        'dtype' and 'nbytes'.
+        """
+        result = []
+        for key, arr in self._cache.items():
+            vtk_class, shape = self._info[key]
+            result.append(dict(key=key, vtk_class=vtk_class, shape=shape,
+                               dtype=arr.dtype, nbytes=arr.nbytes))
+        return result
+
+    def get_stats(self):
+        """Return a summary of the cache as a dictionary.
+
+        The dictionary has the keys 'count' and 'nbytes' for the cache
+        as a whole and 'dtypes' mapping each numpy dtype to a
+        dictionary with the 'count' and 'nbytes' for that type.
+        """
+        dtypes = {}
+        for arr in self._cache.values():
+            stat = dtypes.setdefault(arr.dtype, dict(count=0, nbytes=0))
+            stat['count'] += 1
+            stat['nbytes'] += arr.nbytes
+        return dict(count=len(self._cache), nbytes=self._nbytes,
+                    dtypes=dtypes)
+
     ######################################################################
     # Non-public interface.
     ######################################################################
@@ -151,9 +236,21 @@ class ArrayCache(object):
         """Private function that removes the cached array.  Do not
         call this unless you know what you are doing."""
         try:
-            del self._cache[key]
+            arr = self._cache.pop(key)
         except KeyError:
             pass
+        else:
+            del self._info[key]
+            self._nbytes -= arr.nbytes
+
+    def _budget_exceeded(self):
+        msg = "Array cache holds %d bytes in %d arrays, exceeding the "\
+              "budget of %d bytes." % (self._nbytes, len(self._cache),
+                                       self.budget)
+        if self.budget_action == 'raise':
+            raise MemoryError(msg)
+        else:
+            logger.warning(msg)
 
 
 ######################################################################
@@ -180,6 +277,14 @@ else:
 del _dummy
 
 
+def get_array_cache():
+    """Returns the global `ArrayCache` instance holding the numpy arrays
+    that are shared with VTK arrays.  This is useful to inspect how much
+    memory is held by VTK arrays or to set a memory budget.
+    """
+    return _array_cache
+
+
 def get_vtk_array_type(numeric_array_type):
     """Returns a VTK typecode given a numpy array."""
     # This is a Mapping from numpy array types to VTK array types.
@@ -271,6 +376,17 @@ def create_vtk_array(vtk_arr_type):
     return tmp
 
 
+def _ravel_for_vtk(z, vtk_typecode):
+    """Returns a flat view (or a copy if needed) of the numpy array `z`
+    having the numpy type corresponding to `vtk_typecode`.
+    """
+    arr_dtype = get_numeric_array_type(vtk_typecode)
+    if numpy.issubdtype(z.dtype, arr_dtype):
+        return numpy.ravel(z)
+    else:
+        return numpy.ravel(z).astype(arr_dtype)
+
+
 def array2vtk(num_array, vtk_array=None):
     """Converts a real numpy Array (or a Python list) to a VTK array
     object.
@@ -340,11 +456,7 @@ def array2vtk(num_array, vtk_array=None):
     result_array.SetNumberOfTuples(shape[0])
 
     # Ravel the array appropriately.
-    arr_dtype = get_numeric_array_type(vtk_typecode)
-    if numpy.issubdtype(z.dtype, arr_dtype):
-        z_flat = numpy.ravel(z)
-    else:
-        z_flat = numpy.ravel(z).astype(arr_dtype)
+    z_flat = _ravel_for_vtk(z, vtk_typecode)
 
     # Point the VTK array to the numpy data.  The last argument (1)
     # tells the array not to deallocate.
@@ -370,6 +482,117 @@ def array2vtk(num_array, vtk_array=None):
     return result_array
 
 
+######################################################################
+# The array pool.
+######################################################################
+class ArrayPool(object):
+
+    """A pool of VTK data arrays used for repeated conversions of numpy
+    arrays.
+
+    Every call to `array2vtk` creates a new VTK data array.  When new
+    data of the same shape and type is converted over and over again
+    (for example when animating a field), this pool keeps the VTK array
+    created for a given `key` alive and simply re-points it at the new
+    numpy data using `SetVoidArray`.  A new VTK array is only created
+    when the shape or the type of the data changes.
+
+    Note that since the same VTK array is returned, any object holding
+    a reference to it sees the new data.  The array is marked modified
+    so the VTK pipeline notices the change.
+
+    Example
+    -------
+
+       >>> pool = array_handler.ArrayPool()
+       >>> for i in range(10):
+       ...     vtk_arr = pool.array2vtk(numpy.random.random(100), 'scalars')
+
+    """
+
+    ######################################################################
+    # `object` interface.
+    ######################################################################
+    def __init__(self):
+        # Mapping of the key to the pooled VTK array.
+        self._arrays = {}
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def __contains__(self, key):
+        return key in self._arrays
+
+    ######################################################################
+    # `ArrayPool` interface.
+    ######################################################################
+    def array2vtk(self, num_array, key=None):
+        """Converts a numpy array (or a Python list) to a VTK array,
+        reusing the VTK array last returned for `key` if the shape and
+        type of the data are unchanged.
+
+        Parameters
+        ----------
+
+        - num_array : numpy array or Python list/tuple
+
+          The input array, see `array2vtk` for details.
+
+        - key : hashable (default: `None`)
+
+          Identifies the pooled VTK array to reuse.  Use different
+          keys for different data, for example 'scalars' and
+          'vectors'.
+
+        """
+        z = numpy.asarray(num_array)
+        vtk_arr = self._arrays.get(key)
+        if vtk_arr is not None and self._can_reuse(vtk_arr, z):
+            z_flat = _ravel_for_vtk(z, vtk_arr.GetDataType())
+            vtk_arr.SetVoidArray(getbuffer(z_flat), len(z_flat), 1)
+            vtk_arr.Modified()
+            _array_cache.add(vtk_arr, z_flat)
+        else:
+            vtk_arr = array2vtk(z)
+            self._arrays[key] = vtk_arr
+        return vtk_arr
+
+    def get(self, key):
+        """Return the pooled VTK array for the given key."""
+        return self._arrays[key]
+
+    def remove(self, key):
+        """Remove the pooled VTK array for the given key."""
+        del self._arrays[key]
+
+    def clear(self):
+        """Remove all the pooled arrays."""
+        self._arrays.clear()
+
+    ######################################################################
+    # Non-public interface.
+    ######################################################################
+    def _can_reuse(self, vtk_arr, z):
+        """Returns True if the VTK array can be pointed at the data of
+        the numpy array `z` without being reallocated."""
+        shape = z.shape
+        if len(shape) == 1:
+            n_comp = 1
+        elif len(shape) == 2:
+            n_comp = shape[1]
+        else:
+            return False
+        if numpy.issubdtype(z.dtype, numpy.complexfloating):
+            return False
+        try:
+            vtk_typecode = get_vtk_array_type(z.dtype)
+        except TypeError:
+            return False
+        return (vtk_arr.GetDataType() == vtk_typecode and
+                vtk_arr.GetNumberOfComponents() == n_comp and
+                vtk_arr.GetNumberOfTuples() == shape[0])
+
+
 def vtk2array(vtk_array):
     """Converts a VTK data array to a numpy array.
 
@@ -476,6 +699,48 @@ def vtk2array(vtk_array):
     return im_arr
 
 
+def _offsets_to_legacy(offsets, connectivity):
+    """Given the `offsets` and `connectivity` arrays of a cell array
+    (in the VTK 9 form), returns an `ID_TYPE_CODE` array of the form
+    (npts,p0,p1,...p(npts-1), repeated for each cell).
+    """
+    n_cells = len(offsets) - 1
+    result = numpy.empty((n_cells + len(connectivity),), ID_TYPE_CODE)
+    # Position of the npts entry for each cell.
+    count_idx = offsets[:-1] + numpy.arange(n_cells, dtype=ID_TYPE_CODE)
+    mask = numpy.ones(result.shape, dtype=bool)
+    mask[count_idx] = False
+    result[count_idx] = numpy.diff(offsets)
+    result[mask] = connectivity
+    return result
+
+
+def _ragged_to_offsets(cell_list):
+    """Given a Python list of 1D lists (each of which may have a
+    different length), returns the `(offsets, connectivity)` arrays for
+    the cells.
+    """
+    n_cells = len(cell_list)
+    offsets = numpy.zeros((n_cells + 1,), ID_TYPE_CODE)
+    numpy.cumsum(
+        numpy.fromiter((len(x) for x in cell_list), ID_TYPE_CODE, n_cells),
+        out=offsets[1:]
+    )
+    connectivity = numpy.fromiter(
+        itertools.chain.from_iterable(cell_list), ID_TYPE_CODE,
+        int(offsets[-1])
+    )
+    return offsets, connectivity
+
+
+def _is_offsets_connectivity(num_array):
+    """Returns True if `num_array` is an `(offsets, connectivity)`
+    tuple of 1D numpy arrays."""
+    return (isinstance(num_array, tuple) and len(num_array) == 2 and
+            all(isinstance(x, numpy.ndarray) and len(x.shape) == 1
+                for x in num_array))
+
+
 def array2vtkCellArray(num_array, vtk_array=None):
     """Given a nested Python list or a numpy array, this method
     creates a vtkCellArray instance and returns it.
@@ -487,10 +752,11 @@ def array2vtkCellArray(num_array, vtk_array=None):
     typecast is necessary and this involves an extra copy.  This
     method *always copies* the input data.
 
-    An alternative and more efficient way to build the connectivity
-    list is to create a vtkIdTypeArray having data of the form
-    (npts,p0,p1,...p(npts-1), repeated for each cell) and then call
-    <vtkCellArray_instance>.SetCells(n_cell, id_list).
+    With VTK 9 and above the cells are set using the offsets and
+    connectivity arrays directly (`vtkCellArray.SetData`).  With older
+    versions a vtkIdTypeArray having data of the form
+    (npts,p0,p1,...p(npts-1), repeated for each cell) is built and
+    <vtkCellArray_instance>.SetCells(n_cell, id_list) is called.
 
     Parameters
     ----------
@@ -500,8 +766,8 @@ def array2vtkCellArray(num_array, vtk_array=None):
       Valid values are:
 
         1. A Python list of 1D lists.  Each 1D list can contain one
-           cell connectivity list.  This is very slow and is to be
-           used only when efficiency is of no consequence.
+           cell connectivity list.  The lists may have different
+           lengths.
 
         2. A 2D numpy array with the cell connectivity list.
 
@@ -509,6 +775,14 @@ def array2vtkCellArray(num_array, vtk_array=None):
            have a different shape.  This makes it easy to generate a
            cell array having cells of different kinds.
 
+        4. A tuple of two 1D numpy arrays, `(offsets, connectivity)`.
+           The point ids of all the cells are stored one after the
+           other in `connectivity` and the ids of cell `i` are
+           `connectivity[offsets[i]:offsets[i+1]]`.  `offsets` hence
+           has one more element than the number of cells, starts with
+           0 and ends with `len(connectivity)`.  This is the most
+           efficient way to specify cells of different sizes.
+
     - vtk_array : `vtkCellArray` (default: `None`)
 
       If an optional `vtkCellArray` instance, is passed as an argument
@@ -524,6 +798,9 @@ def array2vtkCellArray(num_array, vtk_array=None):
        >>> cells = array_handler.array2vtkCellArray(a)
        >>> l_a = [a[:,:1], a[:2,:2], a]
        >>> cells = array_handler.array2vtkCellArray(l_a)
+       >>> offsets = numpy.array([0, 1, 3, 6])
+       >>> conn = numpy.array([0, 1, 2, 3, 4, 5])
+       >>> cells = array_handler.array2vtkCellArray((offsets, conn))
 
     """
     if vtk_array:
@@ -538,15 +815,6 @@ def array2vtkCellArray(num_array, vtk_array=None):
 
     ########################################
     # Internal functions.
-    def _slow_array2cells(z, cells):
-        cells.Reset()
-        vtk_ids = vtk.vtkIdList()
-        for i in z:
-            vtk_ids.Reset()
-            for j in i:
-                vtk_ids.InsertNextId(j)
-            cells.InsertNextCell(vtk_ids)
-
     def _get_tmp_array(arr):
         try:
             tmp_arr = numpy.asarray(arr, ID_TYPE_CODE)
@@ -554,27 +822,67 @@ def array2vtkCellArray(num_array, vtk_array=None):
             tmp_arr = arr.astype(ID_TYPE_CODE)
         return tmp_arr
 
+    def _get_copy(arr):
+        tmp_arr = _get_tmp_array(arr)
+        if numpy.may_share_memory(tmp_arr, arr):
+            tmp_arr = tmp_arr.copy()
+        return tmp_arr
+
     def _set_cells(cells, n_cells, id_typ_arr):
         vtk_arr = vtk.vtkIdTypeArray()
         array2vtk(id_typ_arr, vtk_arr)
         cells.SetCells(n_cells, vtk_arr)
+
+    def _set_offsets(cells, offsets, connectivity):
+        if is_version_9():
+            cells.SetData(array2vtk(offsets), array2vtk(connectivity))
+        else:
+            _set_cells(cells, len(offsets) - 1,
+                       _offsets_to_legacy(offsets, connectivity))
     ########################################
 
     msg = "Invalid argument.  Valid types are a Python list of lists,"\
-          " a Python list of numpy arrays, or a numpy array."
-
-    if issubclass(type(num_array), (list, tuple)):
+          " a Python list of numpy arrays, a numpy array or a tuple of"\
+          " offsets and connectivity arrays."
+
+    if _is_offsets_connectivity(num_array):
+        offsets = _get_copy(num_array[0])
+        connectivity = _get_copy(num_array[1])
+        assert offsets[0] == 0, "offsets must start with 0."
+        assert offsets[-1] == len(connectivity), \
+            "The last offset must be the size of the connectivity array."
+        _set_offsets(cells, offsets, connectivity)
+        return cells
+    elif issubclass(type(num_array), (list, tuple)):
         assert len(num_array[0]) > 0, "Input array must be 2D."
         tp = type(num_array[0])
-        if issubclass(tp, list):  # Pure Python list.
-            _slow_array2cells(num_array, cells)
+        if issubclass(tp, (list, tuple)):  # Pure Python list.
+            offsets, connectivity = _ragged_to_offsets(num_array)
+            _set_offsets(cells, offsets, connectivity)
             return cells
         elif issubclass(tp, numpy.ndarray):  # List of arrays.
+            for arr in num_array:
+                assert len(arr.shape) == 2, "Each array must be 2D"
+            if is_version_9():
+                start = 0
+                offsets = []
+                for arr in num_array:
+                    n, npts = arr.shape
+                    offsets.append(
+                        numpy.arange(n, dtype=ID_TYPE_CODE)*npts + start
+                    )
+                    start += n*npts
+                offsets.append(numpy.array([start], ID_TYPE_CODE))
+                connectivity = numpy.concatenate(
+                    [numpy.ravel(_get_tmp_array(arr)) for arr in num_array]
+                )
+                _set_offsets(cells, numpy.concatenate(offsets),
+                             connectivity)
+                return cells
             # Check shape of array and find total size.
             tot_size = 0
             n_cells = 0
             for arr in num_array:
-                assert len(arr.shape) == 2, "Each array must be 2D"
                 shp = arr.shape
                 tot_size += shp[0]*(shp[1] + 1)
                 n_cells += shp[0]
@@ -595,8 +903,13 @@ def array2vtkCellArray(num_array, vtk_array=None):
             raise TypeError(msg)
     elif issubclass(type(num_array), numpy.ndarray):
         assert len(num_array.shape) == 2, "Input array must be 2D."
+        shp = num_array.shape
+        if is_version_9():
+            offsets = numpy.arange(shp[0] + 1, dtype=ID_TYPE_CODE)*shp[1]
+            connectivity = numpy.ravel(_get_copy(num_array))
+            _set_offsets(cells, offsets, connectivity)
+            return cells
         tmp_arr = _get_tmp_array(num_array)
-        shp = tmp_arr.shape
         id_typ_arr = numpy.empty((shp[0]*(shp[1] + 1),), ID_TYPE_CODE)
         set_id_type_array(tmp_arr, id_typ_arr)
         _set_cells(cells, shp[0], id_typ_arr)
@@ -7,24 +7,32 @@
 
 from __future__ import print_function
 
-import vtk_module as vtk
 import os
 import os.path
 import zipfile
 import tempfile
 import shutil
 import glob
+import hashlib
+import io
 import logging
+import multiprocessing
+import pickle
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from optparse import OptionParser
 import sys
 
 # Local imports -- these should be relative imports since these are
 # imported before the package is installed.
 try:
+    from . import vtk_module as vtk
     from .common import get_tvtk_name, camel2enthought
     from .wrapper_gen import WrapperGenerator
     from .special_gen import HelperGenerator
-except SystemError:
+except (ImportError, SystemError):
+    import vtk_module as vtk
     from common import get_tvtk_name, camel2enthought
     from wrapper_gen import WrapperGenerator
     from special_gen import HelperGenerator
@@ -32,6 +40,123 @@ except SystemError:
 
 logger = logging.getLogger(__name__)
 
+# The source files which the parsed methods and the generated code
+# depend on.
+PARSER_SOURCES = ['vtk_parser.py', 'class_tree.py', 'common.py']
+GENERATOR_SOURCES = PARSER_SOURCES + [
+    'code_gen.py', 'wrapper_gen.py', 'special_gen.py', 'indenter.py',
+    'tvtk_base.py'
+]
+
+
+def get_vtk_version():
+    """Return the VTK version and the VTK source version."""
+    v = vtk.vtkVersion()
+    return v.GetVTKVersion(), v.GetVTKSourceVersion()
+
+
+def get_sources_digest(names):
+    """Return a digest of the contents of the given source files of this
+    package.
+    """
+    md5 = hashlib.md5()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in names:
+        with open(os.path.join(base, name), 'rb') as f:
+            md5.update(f.read())
+    return md5.hexdigest()
+
+
+def partition_classes(nodes, n_parts):
+    """Split the ClassTree `nodes` into at most `n_parts` lists of
+    similar size, keeping the classes of a subtree together.
+
+    The subtrees are the ones rooted at the shallowest level of the tree
+    which has at least `4*n_parts` classes and where no subtree has more
+    than half the classes of a part, each class belongs to the subtree
+    of its first parent.  The subtrees are assigned, largest first, to
+    the smallest part and each part is sorted by level.
+
+    """
+    nodes = list(nodes)
+    if n_parts <= 1 or len(nodes) == 0:
+        return [sorted(nodes, key=lambda x: x.level)] if nodes else []
+
+    def get_root(node, level):
+        while node.level > level and node.parents:
+            node = node.parents[0]
+        return node.name
+
+    max_level = max(node.level for node in nodes)
+    for level in range(max_level + 1):
+        subtrees = OrderedDict()
+        for node in nodes:
+            subtrees.setdefault(get_root(node, level), []).append(node)
+        largest = max(len(subtree) for subtree in subtrees.values())
+        if len(subtrees) >= 4*n_parts and \
+                largest <= len(nodes)/(2.0*n_parts):
+            break
+
+    parts = [[] for i in range(min(n_parts, len(subtrees)))]
+    for subtree in sorted(subtrees.values(), key=len, reverse=True):
+        min(parts, key=len).extend(subtree)
+    return [sorted(part, key=lambda x: x.level) for part in parts]
+
+
+######################################################################
+# `GeneratorCache`
+######################################################################
+
+class GeneratorCache:
+    """A persistent cache of the parsed methods and the wrapper code of
+    the VTK classes, for the `TVTKGenerator`.
+
+    The cache is saved in a pickle file for a given VTK version.  The
+    parsed methods are kept as long as the parser is unchanged and the
+    code as long as none of the generator sources are changed, the rest
+    of the cache is dropped when it is loaded.
+
+    """
+
+    def __init__(self, file_name=None):
+        self.file_name = file_name
+        self.vtk_version = get_vtk_version()
+        self.parser_digest = get_sources_digest(PARSER_SOURCES)
+        self.generator_digest = get_sources_digest(GENERATOR_SOURCES)
+        # The pickled parsed methods for each VTK class name.
+        self.methods = {}
+        # The wrapper code for each VTK class name.
+        self.code = {}
+        if file_name is not None:
+            self.load()
+
+    def load(self):
+        """Load the valid parts of the cache from `self.file_name`."""
+        try:
+            with open(self.file_name, 'rb') as f:
+                data = pickle.load(f)
+        except (IOError, EOFError, pickle.UnpicklingError, ValueError):
+            return
+        if not isinstance(data, dict) or \
+                data.get('vtk_version') != self.vtk_version:
+            return
+        if data.get('parser_digest') == self.parser_digest:
+            self.methods = data.get('methods', {})
+        if data.get('generator_digest') == self.generator_digest:
+            self.code = data.get('code', {})
+
+    def save(self):
+        """Save the cache to `self.file_name`."""
+        data = dict(vtk_version=self.vtk_version,
+                    parser_digest=self.parser_digest,
+                    generator_digest=self.generator_digest,
+                    methods=self.methods, code=self.code)
+        tmp_name = self.file_name + '.tmp'
+        with open(tmp_name, 'wb') as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, self.file_name)
+
+
 ######################################################################
 # `TVTKGenerator`
 ######################################################################
@@ -40,7 +165,7 @@ logger = logging.getLogger(__name__)
 class TVTKGenerator:
     """Generates all the TVTK code."""
 
-    def __init__(self, out_dir=''):
+    def __init__(self, out_dir='', n_jobs=1, cache_file=None):
         """Initializes the instance.
 
         Parameters
@@ -55,7 +180,20 @@ class TVTKGenerator:
           overwritten.  If no out_dir is specified, a temporary one is
           created using `tempfile.mkdtemp`.
 
+        - n_jobs - `int`
+
+          The number of processes generating the wrapper classes.  If
+          it is zero or None, one process per CPU is used.  By default
+          the classes are generated in this process.
+
+        - cache_file - `string`
+
+          The name of a pickle file caching the parsed methods and the
+          code of the classes across runs, see `GeneratorCache`.  By
+          default nothing is cached.
+
         """
+        start = time.perf_counter()
         if not out_dir:
             out_dir = tempfile.mkdtemp()
         self.out_dir = os.path.join(out_dir, 'tvtk_classes')
@@ -63,9 +201,14 @@ class TVTKGenerator:
         if not os.path.exists(self.out_dir):
             os.makedirs(self.out_dir)
         self.zip_name = 'tvtk_classes.zip'
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.cache_file = cache_file
 
         self.wrap_gen = WrapperGenerator()
         self.helper_gen = HelperGenerator()
+        # The time taken by each phase of the code generation.
+        self.timings = OrderedDict()
+        self.timings['class tree'] = time.perf_counter() - start
 
     #################################################################
     # `TVTKGenerator` interface.
@@ -74,70 +217,38 @@ class TVTKGenerator:
     def generate_code(self):
         """Generate all the wrapper code in `self.out_dir`.
         """
-        out_dir = self.out_dir
         helper_gen = self.helper_gen
-        wrap_gen = self.wrap_gen
         # Create an __init__.py file
-        with open(os.path.join(out_dir, '__init__.py'), 'w'):
-            pass
+        self._write_file('__init__.py', '')
 
         # Crete a vtk_version.py file that contains VTK build
         # information.
-        v = vtk.vtkVersion()
-        vtk_version = v.GetVTKVersion()[:3]
-        vtk_src_version = v.GetVTKSourceVersion()
-        code = "vtk_build_version = \'%s\'\n"%(vtk_version)
+        vtk_version, vtk_src_version = get_vtk_version()
+        code = "vtk_build_version = \'%s\'\n"%(vtk_version[:3])
         code += "vtk_build_src_version = \'%s\'\n"%(vtk_src_version)
+        self._write_file('vtk_version.py', code)
 
-        with open(os.path.join(out_dir, 'vtk_version.py'), 'w') as f:
-            f.write(code)
+        start = time.perf_counter()
+        classes = self._get_classes()
+        nodes = [node for nodes in self.wrap_gen.get_tree().tree
+                 for node in nodes if node.name in classes]
+        self.timings['find classes'] = time.perf_counter() - start
+
+        # Write the wrapper files.
+        self._write_wrapper_files(nodes)
+
+        # Write the helper code.
+        start = time.perf_counter()
+        helper_file = io.StringIO()
+        helper_gen.write_prelims(helper_file)
+        for node in nodes:
+            helper_gen.add_class(get_tvtk_name(node.name), helper_file)
+        self._write_file('tvtk_helper.py', helper_file.getvalue())
 
-        # Write the helper code header.
-        with open(os.path.join(out_dir, 'tvtk_helper.py'), 'w') as helper_file:
-            helper_gen.write_prelims(helper_file)
-
-            # Write the wrapper files.
-            tree = wrap_gen.get_tree().tree
-
-            classes = []
-            # This is another class we should not wrap and exists
-            # in version 8.1.0.
-            ignore = ['vtkOpenGLGL2PSHelperImpl'] + [
-                'vtkSOADataArrayTemplate_I%sE' % l
-                for l in 'acdfhijlmstxy']
-            include = ['VTKPythonAlgorithmBase']
-            for node in wrap_gen.get_tree():
-                name = node.name
-                if name in ignore:
-                    continue
-                if (name not in include and not name.startswith('vtk')) or \
-                        name.startswith('vtkQt'):
-                    continue
-                if not hasattr(vtk, name) or not hasattr(getattr(vtk, name), 'IsA'):  # noqa
-                    # We need to wrap VTK classes that are derived
-                    # from vtkObjectBase, the others are
-                    # straightforward VTK classes that can be used as
-                    # such.  All of these have an 'IsA' method so we
-                    # check for that.  Only the vtkObjectBase
-                    # subclasses support observers etc. and hence only
-                    # those make sense to wrap into TVTK.
-                    continue
-                classes.append(name)
-
-            for ti, nodes in enumerate(tree, 1):
-                for ni, node in enumerate(nodes, 1):
-                    if node.name in classes:
-                        tvtk_name = get_tvtk_name(node.name)
-                        logger.debug(
-                            'Wrapping %s as %s' % (node.name, tvtk_name))
-                        try:
-                            self._write_wrapper_class(node, tvtk_name)
-                        except Exception:
-                            print('\n\nFailed on %s\n(#%d of %d nodes, #%d of '
-                                  '%d subnodes)\n'
-                                  % (tvtk_name, ti, len(tree), ni, len(nodes)))
-                            raise
-                        helper_gen.add_class(tvtk_name, helper_file)
+        # Write the mapping of the VTK classes to the VTK modules
+        # providing them, this is used to import VTK lazily.
+        self._write_class_modules([node.name for node in nodes])
+        self.timings['helper'] = time.perf_counter() - start
 
     def write_wrapper_classes(self, names):
         """Given VTK class names in the list `names`, write out the
@@ -182,6 +293,7 @@ class TVTKGenerator:
           By default only the ``*.pyc`` files are included.
 
         """
+        start = time.perf_counter()
         cwd = os.getcwd()
         d = os.path.dirname(self.out_dir)
         os.chdir(d)
@@ -198,6 +310,7 @@ class TVTKGenerator:
             os.unlink(cwd + "/" + self.zip_name)
         shutil.move(self.zip_name, cwd)
         os.chdir(cwd)
+        self.timings['zip'] = time.perf_counter() - start
 
     def clean(self):
         """Delete the temporary directory where the code has been
@@ -214,26 +327,216 @@ class TVTKGenerator:
             print("Not removing directory:", tmp_dir)
             print("It does not contain a tvtk_classes directory!")
 
+    def print_timings(self):
+        """Print the time taken by each phase of the code generation."""
+        print('Time taken to generate the TVTK classes:')
+        for phase, seconds in self.timings.items():
+            print('  %-24s %8.3f s' % (phase, seconds))
+        # The indented entries are details of the previous phase.
+        total = sum(seconds for phase, seconds in self.timings.items()
+                    if not phase.startswith(' '))
+        print('  %-24s %8.3f s' % ('total', total))
+
     #################################################################
     # Non-public interface.
     #################################################################
+    def _get_classes(self):
+        """Return the set of names of the VTK classes to wrap."""
+        # This is another class we should not wrap and exists
+        # in version 8.1.0.
+        ignore = ['vtkOpenGLGL2PSHelperImpl'] + [
+            'vtkSOADataArrayTemplate_I%sE' % l
+            for l in 'acdfhijlmstxy']
+        include = ['VTKPythonAlgorithmBase']
+        classes = set()
+        for node in self.wrap_gen.get_tree():
+            name = node.name
+            if name in ignore:
+                continue
+            if (name not in include and not name.startswith('vtk')) or \
+                    name.startswith('vtkQt'):
+                continue
+            if not hasattr(vtk, name) or not hasattr(getattr(vtk, name), 'IsA'):  # noqa
+                # We need to wrap VTK classes that are derived
+                # from vtkObjectBase, the others are
+                # straightforward VTK classes that can be used as
+                # such.  All of these have an 'IsA' method so we
+                # check for that.  Only the vtkObjectBase
+                # subclasses support observers etc. and hence only
+                # those make sense to wrap into TVTK.
+                continue
+            classes.add(name)
+        return classes
+
+    def _write_wrapper_files(self, nodes):
+        """Write the wrapper code of the given ClassTree nodes, reusing
+        the cached code and generating the rest with `self.n_jobs`
+        processes.
+        """
+        start = time.perf_counter()
+        cache = GeneratorCache(self.cache_file)
+        self.timings['load cache'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        todo = [node for node in nodes if node.name not in cache.code]
+        names = [node.name for node in todo]
+        methods = dict((name, cache.methods[name]) for name in names
+                       if name in cache.methods)
+        parse_time = 0.0
+        if self.n_jobs == 1 or len(todo) < 2:
+            results = [self._generate_classes(names, methods)]
+        else:
+            parts = partition_classes(todo, self.n_jobs)
+            # The workers are started afresh rather than forked from this
+            # process, whose VTK objects may have running threads.
+            context = multiprocessing.get_context('spawn')
+            results = []
+            with ProcessPoolExecutor(max_workers=max(len(parts), 1),
+                                     mp_context=context) as executor:
+                futures = [
+                    executor.submit(
+                        _generate_classes_in_worker,
+                        os.path.dirname(self.out_dir),
+                        [node.name for node in part],
+                        dict((node.name, methods[node.name]) for node in part
+                             if node.name in methods)
+                    )
+                    for part in parts
+                ]
+                results = [future.result() for future in futures]
+        for code, parsed, seconds in results:
+            cache.code.update(code)
+            cache.methods.update(parsed)
+            parse_time += seconds
+        self.timings['generate %d classes' % len(todo)] = \
+            time.perf_counter() - start
+        self.timings['  (parse, all processes)'] = parse_time
+        logger.debug('%d of %d classes from the cache, %d of %d parsed',
+                     len(nodes) - len(todo), len(nodes),
+                     len(todo) - len(methods), len(todo))
+
+        start = time.perf_counter()
+        for node in nodes:
+            tvtk_name = get_tvtk_name(node.name)
+            self._write_file(camel2enthought(tvtk_name) + '.py',
+                             cache.code[node.name])
+        self.timings['write files'] = time.perf_counter() - start
+
+        if self.cache_file is not None:
+            start = time.perf_counter()
+            names = set(node.name for node in nodes)
+            cache.code = dict((name, code) for name, code in
+                              cache.code.items() if name in names)
+            cache.methods = dict((name, m) for name, m in
+                                 cache.methods.items() if name in names)
+            cache.save()
+            self.timings['save cache'] = time.perf_counter() - start
+
+    def _generate_classes(self, names, methods):
+        """Generate the wrapper code of the VTK classes `names`.
+
+        `methods` has the pickled parsed methods of some of the classes.
+        Return a dict of the code for each class, a dict with the
+        parsed methods of the other classes (when they can be pickled)
+        and the time spent parsing.
+
+        """
+        wrap_gen = self.wrap_gen
+        wrap_gen.parse_cache = dict(methods)
+        wrap_gen.parse_time = 0.0
+        tree = wrap_gen.get_tree()
+        # The code of a class depends on the traits of its parents, so
+        # their code is generated first even if it is not wanted.
+        needed = set(names)
+        for name in names:
+            node = tree.get_node(name)
+            while node.level != 0 and node.parents[0].name != 'object':
+                node = node.parents[0]
+                needed.add(node.name)
+        code = {}
+        try:
+            for nodes in tree.tree:
+                for node in nodes:
+                    if node.name not in needed:
+                        continue
+                    out = io.StringIO()
+                    try:
+                        wrap_gen.generate_code(node, out)
+                    except Exception:
+                        print('\n\nFailed on %s (level %d)\n'
+                              % (get_tvtk_name(node.name), node.level))
+                        raise
+                    code[node.name] = out.getvalue()
+            code = dict((name, code[name]) for name in names)
+            parsed = dict((name, m) for name, m in
+                          wrap_gen.parse_cache.items() if name not in methods)
+            return code, parsed, wrap_gen.parse_time
+        finally:
+            wrap_gen.parse_cache = None
+
+    def _write_file(self, fname, code):
+        """Write `code` to the file `fname` of the output directory unless
+        it already has this content, so the compiled file of an unchanged
+        module is reused by `build_zip`.
+        """
+        fname = os.path.join(self.out_dir, fname)
+        if os.path.exists(fname):
+            with io.open(fname, 'r', encoding='utf-8') as f:
+                if f.read() == code:
+                    return
+        with io.open(fname, 'w', encoding='utf-8') as f:
+            f.write(code)
+
+    def _write_class_modules(self, classes):
+        """Write a `vtk_class_modules.py` file mapping the VTK class
+        names in `classes` to the name of the module in the `vtkmodules`
+        package that provides the class.  Classes from elsewhere (like
+        `tvtk_local`) are skipped and nothing is written if VTK does
+        not provide the `vtkmodules` package.
+
+        """
+        mapping = {}
+        for name in classes:
+            mod_name = getattr(getattr(vtk, name), '__module__', '')
+            if mod_name.startswith('vtkmodules.'):
+                mapping[name] = mod_name
+        if not mapping:
+            return
+
+        code = 'vtk_class_modules = {\n'
+        for name in sorted(mapping):
+            code += '    %r: %r,\n' % (name, mapping[name])
+        code += '}\n'
+        self._write_file('vtk_class_modules.py', code)
+
     def _write_wrapper_class(self, node, tvtk_name):
         """Write the wrapper code to a file."""
         # The only reason this method is separate is to generate code
         # for an individual class when debugging.
         fname = camel2enthought(tvtk_name) + '.py'
-        if sys.version_info[0] > 2:
-            out = open(os.path.join(self.out_dir, fname), 'w', encoding='utf-8')
-        else:
-            out = open(os.path.join(self.out_dir, fname), 'w')
+        out = io.StringIO()
         self.wrap_gen.generate_code(node, out)
-        out.close()
+        self._write_file(fname, out.getvalue())
 
 
 ######################################################################
 # Utility functions.
 ######################################################################
 
+# The generator of a worker process.
+_worker_generator = None
+
+
+def _generate_classes_in_worker(out_dir, names, methods):
+    """Generate the code of the VTK classes `names` in a worker process,
+    see `TVTKGenerator._generate_classes`.
+    """
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = TVTKGenerator(out_dir)
+    return _worker_generator._generate_classes(names, methods)
+
+
 def main():
     usage = """usage: %prog [options] [vtk_classes]
 
@@ -259,6 +562,15 @@ code will be generated for all the VTK classes.
         dest="src", default=False,
         help="Include source files (*.py) in "
              "addition to *.pyc files in the ZIP file.")
+    parser.add_option(
+        "-j", "--jobs", action="store",
+        type="int", dest="n_jobs", default=1,
+        help="Number of processes generating the classes, "
+             "0 uses all the CPUs.")
+    parser.add_option(
+        "-c", "--cache-file", action="store",
+        type="string", dest="cache_file", default=None,
+        help="File caching the parsed classes between runs.")
     parser.add_option(
         "-v", "--verbose", action="store_true",
         dest="verbose", default=False,
@@ -278,7 +590,8 @@ code will be generated for all the VTK classes.
         logger.addHandler(ch)
 
     # Now do stuff.
-    gen = TVTKGenerator(options.out_dir)
+    gen = TVTKGenerator(options.out_dir, n_jobs=options.n_jobs,
+                        cache_file=options.cache_file)
 
     if len(args) == 0:
         gen.generate_code()
@@ -288,6 +601,8 @@ code will be generated for all the VTK classes.
     if options.zip:
         gen.build_zip(options.src)
 
+    gen.print_timings()
+
     if options.clean:
         gen.clean()
 
@@ -7,7 +7,8 @@
 from contextlib import contextmanager
 import string
 import re
-import vtk
+
+from tvtk import vtk_module as vtk
 
 vtk_major_version = vtk.vtkVersion.GetVTKMajorVersion()
 vtk_minor_version = vtk.vtkVersion.GetVTKMinorVersion()
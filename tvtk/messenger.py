@@ -6,7 +6,13 @@ function/method to be called when an object sends a particular event.
 The Messenger class is Borg.  So it is easy to instantiate and use.
 This module is also reload-safe, so if the module is reloaded the
 callback information is not lost.  Method callbacks do not have a
-reference counting problem since weak references are used.
+reference counting problem since weak references are used.  Slots whose
+instance is garbage collected are removed as soon as that happens.
+
+To make `send` cheap, the handlers to call for a particular object and
+event are computed once and cached in a dispatch table.  The table of an
+object is discarded whenever a handler is connected or disconnected for
+it.
 
 The main functionality of this module is provided by three functions,
 `connect`, `disconnect` and `send`.
@@ -112,6 +118,9 @@ class Messenger:
             # First instantiation.
             self._signals = {}
             self._catch_all = ['AnyEvent', 'all']
+        if not hasattr(self, '_dispatch'):
+            # Maps the object key to a dict of event: handlers.
+            self._dispatch = {}
 
     #################################################################
     # 'Messenger' interface.
@@ -158,14 +167,19 @@ class Messenger:
         if typ is types.FunctionType:
             slots[callback_key] = (None, callback)
         elif typ is types.MethodType:
-            obj = weakref.ref(callback.__self__)
-            name = callback.__name__
-            slots[callback_key] = (obj, name)
+            # The instance is weakly referenced and the slot is removed
+            # when the instance is gc'd.
+            obj = weakref.ref(
+                callback.__self__,
+                self._make_pruner(key, event, callback_key)
+            )
+            slots[callback_key] = (obj, callback.__func__)
         else:
             raise MessengerError(
                 "Callback must be a function or method. "\
                 "You passed a %s."%(str(callback))
             )
+        self._dispatch.pop(key, None)
 
     def disconnect(self, obj, event=None, callback=None, obj_is_hash=False):
         """Disconnects the object and its event handlers.
@@ -203,6 +217,7 @@ class Messenger:
             key = hash(obj)
         if not key in signals:
             return
+        self._dispatch.pop(key, None)
         if callback is None:
             if event is None:
                 del signals[key]
@@ -233,26 +248,24 @@ class Messenger:
 
         """
         try:
-            sigs = self._get_signals(source)
-        except (MessengerError, KeyError):
+            key = hash(source)
+        except TypeError:
             return
-        events = self._catch_all[:]
-        if event not in events:
-            events.append(event)
-        for evt in events:
-            if evt in sigs:
-                slots = sigs[evt]
-                for key in list(slots.keys()):
-                    obj, meth = slots[key]
-                    if obj: # instance method
-                        inst = obj()
-                        if inst:
-                            getattr(inst, meth)(source, event, *args, **kw_args)
-                        else:
-                            # Oops, dead reference.
-                            del slots[key]
-                    else: # normal function
-                        meth(source, event, *args, **kw_args)
+        tables = self._dispatch.get(key)
+        if tables is None:
+            if key not in self._signals:
+                return
+            tables = self._dispatch[key] = {}
+        handlers = tables.get(event)
+        if handlers is None:
+            handlers = tables[event] = self._get_handlers(key, event)
+        for obj, func in handlers:
+            if obj is None: # normal function
+                func(source, event, *args, **kw_args)
+            else: # instance method
+                inst = obj()
+                if inst is not None:
+                    func(inst, source, event, *args, **kw_args)
 
     def is_registered(self, obj):
         """Returns if the given object has registered itself with the
@@ -277,6 +290,36 @@ class Messenger:
     # Non-public interface.
     #################################################################
 
+    def _get_handlers(self, key, event):
+        """Returns a tuple of the (instance weakref, function) pairs to
+        be called when the object with the given key sends `event`.
+        The weakref is None for normal functions.
+
+        """
+        sigs = self._signals.get(key, {})
+        events = self._catch_all[:]
+        if event not in events:
+            events.append(event)
+        handlers = []
+        for evt in events:
+            if evt in sigs:
+                handlers.extend(sigs[evt].values())
+        return tuple(handlers)
+
+    def _make_pruner(self, key, event, callback_key):
+        """Returns a callback for the weak reference to the instance of
+        a method slot that removes the slot when the instance is garbage
+        collected.
+
+        """
+        def _prune(ref):
+            slots = self._signals.get(key, {}).get(event, {})
+            slot = slots.get(callback_key)
+            if slot is not None and slot[0] is ref:
+                del slots[callback_key]
+                self._dispatch.pop(key, None)
+        return _prune
+
     def _get_signals(self, obj):
         """Given an object `obj` it returns the signals of that
         object.
@@ -303,7 +346,7 @@ def connect(obj, event, callback):
 connect.__doc__ = _messenger.connect.__doc__
 
 def disconnect(obj, event=None, callback=None, obj_is_hash=False):
-    _messenger.disconnect(obj, event, callback)
+    _messenger.disconnect(obj, event, callback, obj_is_hash)
 disconnect.__doc__ = _messenger.disconnect.__doc__
 
 def send(obj, event, *args, **kw_args):
@@ -0,0 +1,369 @@
+"""Write the frames rendered by a render window to image files or to a
+video stream in background threads.
+
+The pixels of the render window are read into a small pool of reusable
+buffers and the images are encoded and written by a thread pool so that
+rendering the next frame can proceed meanwhile.  When all the buffers
+are in use, grabbing a new frame waits for a pending one to be written,
+which bounds the memory used.
+
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import queue
+import shlex
+import struct
+import subprocess
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.common import configure_input_data
+
+
+# The VTK image writers used for the formats other than PNG and NPY.
+VTK_WRITERS = {'.jpg': 'JPEGWriter', '.jpeg': 'JPEGWriter',
+               '.bmp': 'BMPWriter', '.tiff': 'TIFFWriter',
+               '.tif': 'TIFFWriter', '.ppm': 'PNMWriter'}
+
+SUPPORTED_FORMATS = ('.png', '.npy') + tuple(VTK_WRITERS)
+
+
+def _png_chunk(tag, data):
+    crc = zlib.crc32(tag + data) & 0xffffffff
+    return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', crc)
+
+
+def encode_png(image, compression=5):
+    """Return the given image encoded as PNG bytes.
+
+    The image is a (height, width, components) array of unsigned bytes
+    with the top row first and 1 (grey), 3 (RGB) or 4 (RGBA)
+    components.  The encoding is done with `zlib` which releases the
+    GIL, so images can be encoded from several threads in parallel.
+    """
+    height, width, n_comp = image.shape
+    color_type = {1: 0, 3: 2, 4: 6}[n_comp]
+    # Each row starts with the filter type, 0 is no filtering.
+    raw = np.empty((height, width*n_comp + 1), dtype=np.uint8)
+    raw[:, 0] = 0
+    raw[:, 1:] = image.reshape(height, -1)
+    header = struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0)
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', header),
+        _png_chunk(b'IDAT', zlib.compress(raw, compression)),
+        _png_chunk(b'IEND', b'')
+    ])
+
+
+def write_png(file_name, image, compression=5):
+    """Write the given image to a PNG file, see `encode_png`."""
+    data = encode_png(image, compression)
+    with open(file_name, 'wb') as f:
+        f.write(data)
+
+
+class FrameGrabber(object):
+    """Read the pixels of a render window into a bounded pool of
+    reusable buffers.  A buffer is created when none is free until there
+    are `max_pending` of them, after which grabbing a frame waits for a
+    buffer to be released.
+    """
+
+    def __init__(self, max_pending=8):
+        self._free = queue.Queue()
+        self._n_buffers = 0
+        self._max_pending = max_pending
+
+    def _grab(self, render_window, front=False):
+        """Return a buffer with the pixels of the render window (bottom
+        row first) and the (height, width) of the image.
+        """
+        buffer = self._get_buffer()
+        try:
+            width, height = render_window.size
+            render_window.get_pixel_data(0, 0, width - 1, height - 1,
+                                         front, buffer)
+        except Exception:
+            self._release(buffer)
+            raise
+        return buffer, (height, width)
+
+    def _get_buffer(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            pass
+        if self._n_buffers < self._max_pending:
+            self._n_buffers += 1
+            return tvtk.UnsignedCharArray()
+        # Wait for a frame to be written.
+        return self._free.get()
+
+    def _release(self, buffer):
+        self._free.put(buffer)
+
+
+class FrameWriter(FrameGrabber):
+    """Grab the pixels of a render window and write them to image files
+    in background threads.
+
+    The format is chosen from the extension of the file name, see
+    `SUPPORTED_FORMATS`.  Call `flush` to wait for all the frames to be
+    written and `shutdown` when done.  Errors raised while writing a
+    frame are raised by the next call to `write` or `flush`.
+
+    Example::
+
+        writer = FrameWriter()
+        for i in range(100):
+            update_scene(i)
+            writer.write(scene.render_window, 'frame%05d.png' % i)
+        writer.shutdown()
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, png_compression=5,
+                 jpeg_quality=95):
+        super(FrameWriter, self).__init__(max_pending)
+        self.png_compression = png_compression
+        self.jpeg_quality = jpeg_quality
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = []
+        # See the note on the writer classes in `write`, the classes used
+        # by `_write_vtk` are imported here.
+        from tvtk.tvtk_classes.tvtk_helper import get_class
+        self._image_class = get_class('ImageData')
+        get_class('PointData')
+
+    def write(self, render_window, file_name, front=False):
+        """Read the pixels of the render window and write them to the
+        given file in the background.  `front` selects the front buffer
+        instead of the back buffer.
+        """
+        ext = os.path.splitext(file_name)[1].lower()
+        if ext not in SUPPORTED_FORMATS:
+            raise ValueError('Unsupported image format %s.' % ext)
+        self._check_errors()
+        # The TVTK classes are imported on first use, which is not thread
+        # safe, so this is done here.
+        writer_class = None
+        if ext in VTK_WRITERS:
+            writer_class = getattr(tvtk, VTK_WRITERS[ext])
+        buffer, shape = self._grab(render_window, front)
+        future = self._executor.submit(
+            self._write_frame, buffer, shape, file_name, ext, writer_class
+        )
+        self._futures.append(future)
+
+    def flush(self):
+        """Wait for all the pending frames to be written."""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def shutdown(self):
+        """Flush the pending frames and stop the threads."""
+        try:
+            self.flush()
+        finally:
+            self._executor.shutdown()
+
+    @property
+    def pending(self):
+        """The number of frames not yet written."""
+        return len([f for f in self._futures if not f.done()])
+
+    def _check_errors(self):
+        futures = []
+        for future in self._futures:
+            if future.done():
+                future.result()
+            else:
+                futures.append(future)
+        self._futures = futures
+
+    def _write_frame(self, buffer, shape, file_name, ext, writer_class):
+        try:
+            # VTK images have the bottom row first.
+            image = buffer.to_array().reshape(shape + (-1,))
+            if ext == '.png':
+                write_png(file_name, image[::-1], self.png_compression)
+            elif ext == '.npy':
+                np.save(file_name, image[::-1])
+            else:
+                self._write_vtk(image, file_name, writer_class)
+        finally:
+            self._release(buffer)
+
+    def _write_vtk(self, image, file_name, writer_class):
+        height, width, n_comp = image.shape
+        data = self._image_class(dimensions=(width, height, 1))
+        data.point_data.scalars = image.reshape(-1, n_comp)
+        writer = writer_class(file_name=file_name)
+        if writer.is_a('vtkJPEGWriter'):
+            writer.quality = self.jpeg_quality
+        configure_input_data(writer, data)
+        writer.write()
+
+
+def rgb_to_ycbcr(image):
+    """Convert an (height, width, 3) RGB image of unsigned bytes to the
+    Y, Cb and Cr planes (ITU-R BT.601, studio swing) as unsigned bytes.
+    """
+    rgb = image.astype(np.float32)
+    matrix = np.array([[65.481, 128.553, 24.966],
+                       [-37.797, -74.203, 112.0],
+                       [112.0, -93.786, -18.214]], dtype=np.float32)/255.0
+    ycc = np.tensordot(matrix, rgb, axes=([1], [2]))
+    ycc += np.array([16.0, 128.0, 128.0], dtype=np.float32)[:, None, None]
+    return np.clip(np.rint(ycc), 0, 255).astype(np.uint8)
+
+
+class FrameStreamer(FrameGrabber):
+    """Grab the pixels of a render window and stream the frames, in
+    order, to a file or to the standard input of a command, for example
+    a video encoder.
+
+    The frames are written by a background thread.  When the consumer is
+    slower than the rendering, at most `max_pending` frames are queued
+    and grabbing the next one waits.
+
+    The `format` is either 'rgb' for raw 8 bit RGB frames, top row
+    first, or 'y4m' for a YUV4MPEG2 stream with 4:4:4 chroma.  The
+    `command` is a string or a list of arguments, its `{width}`,
+    `{height}` and `{fps}` fields are replaced using the size of the
+    first frame and the `fps`.  For example, to encode the frames with
+    ffmpeg::
+
+        streamer = FrameStreamer(
+            command='ffmpeg -y -f rawvideo -pix_fmt rgb24 '
+                    '-s {width}x{height} -r {fps} -i - movie.mp4'
+        )
+        for i in range(100):
+            update_scene(i)
+            streamer.write(scene.render_window)
+        streamer.shutdown()
+    """
+
+    def __init__(self, file_name=None, command=None, format='rgb', fps=25,
+                 cwd=None, max_pending=8):
+        super(FrameStreamer, self).__init__(max_pending)
+        if (file_name is None) == (command is None):
+            raise ValueError('Give either a file name or a command.')
+        if format not in ('rgb', 'y4m'):
+            raise ValueError("The format must be 'rgb' or 'y4m'.")
+        self.file_name = file_name
+        self.command = command
+        self.format = format
+        self.fps = fps
+        self.cwd = cwd
+        self.frames = 0
+        self._shape = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._error = None
+        self._stream = None
+        self._process = None
+
+    def write(self, render_window, front=False):
+        """Read the pixels of the render window and add them to the
+        stream.  `front` selects the front buffer instead of the back
+        buffer.
+        """
+        self._check_error()
+        buffer, shape = self._grab(render_window, front)
+        if self._shape is None:
+            self._shape = shape
+            try:
+                self._open()
+            except Exception:
+                self._release(buffer)
+                raise
+        elif shape != self._shape:
+            self._release(buffer)
+            raise ValueError('The frame size changed from %s to %s.'
+                             % (self._shape[::-1], shape[::-1]))
+        self._queue.put(buffer)
+        self.frames += 1
+
+    def shutdown(self):
+        """Wait for all the frames to be written and close the stream.
+        For a command, this waits for it to exit and raises an error if
+        it failed.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._stream is not None:
+            try:
+                self._stream.close()
+            except (IOError, OSError) as e:
+                self._error = self._error or e
+            self._stream = None
+        if self._process is not None:
+            returncode = self._process.wait()
+            self._process = None
+            if returncode != 0:
+                raise RuntimeError('The command %r exited with status %d.'
+                                   % (self.command, returncode))
+        self._check_error()
+
+    def _open(self):
+        height, width = self._shape
+        if self.command is None:
+            self._stream = open(self.file_name, 'wb')
+        else:
+            fields = dict(width=width, height=height, fps=self.fps)
+            if isinstance(self.command, str):
+                args = shlex.split(self.command.format(**fields))
+            else:
+                args = [arg.format(**fields) for arg in self.command]
+            self._process = subprocess.Popen(args, stdin=subprocess.PIPE,
+                                             cwd=self.cwd)
+            self._stream = self._process.stdin
+        if self.format == 'y4m':
+            self._stream.write(
+                ('YUV4MPEG2 W%d H%d F%d:1 Ip A1:1 C444\n'
+                 % (width, height, self.fps)).encode('ascii')
+            )
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _run(self):
+        stream = self._stream
+        while True:
+            buffer = self._queue.get()
+            if buffer is None:
+                break
+            try:
+                if self._error is None:
+                    image = buffer.to_array().reshape(self._shape + (-1,))
+                    # The frames have the top row first.
+                    image = image[::-1, :, :3]
+                    if self.format == 'y4m':
+                        stream.write(b'FRAME\n')
+                        stream.write(rgb_to_ycbcr(image).tobytes())
+                    else:
+                        stream.write(np.ascontiguousarray(image).data)
+            except Exception as e:
+                # Keep consuming the frames so the grabbing never blocks.
+                self._error = e
+            finally:
+                self._release(buffer)
+        try:
+            stream.flush()
+        except Exception as e:
+            self._error = self._error or e
+
+    def _check_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -2,7 +2,8 @@ import os
 from glob import glob
 from contextlib import contextmanager
 
-from traits.api import Bool, Directory, HasTraits, Instance, Int, Str
+from traits.api import (Any, Bool, Directory, Enum, HasTraits, Instance,
+                        Int, Range, Str)
 from traits.util.home_directory import get_home_directory
 
 
@@ -12,18 +13,41 @@ class MovieMaker(HasTraits):
     directory = Directory
     filename = Str('anim%05d.png')
     anti_alias = Bool(True, desc='if the saved images should be anti-aliased')
+    background_write = Bool(
+        False, desc='if the frames are written in background threads'
+    )
+    writer_threads = Range(1, 16, 2, desc='the number of writer threads')
+    max_pending = Range(
+        1, 256, 8, desc='the maximum number of frames waiting to be written'
+    )
+    # A command, run in the movie directory, to stream the frames to
+    # instead of writing images, see `FrameStreamer`.  The frames are also
+    # streamed when the filename ends with '.rgb' or '.y4m'.
+    stream_command = Str(desc='the command the frames are streamed to')
+    stream_format = Enum(
+        'rgb', 'y4m', desc='the format of the frames streamed to the command'
+    )
+    frame_rate = Range(1, 240, 25, desc='the frame rate of streamed movies')
 
     ##################
     # Private traits
     _subdir = Str
     _count = Int(0)
+    # The FrameWriter or FrameStreamer used when writing in the background.
+    _writer = Any
+    # The anti-aliasing setting of the render window to restore.
+    _orig_aa = Any
 
     def default_traits_view(self):
         from traitsui.api import Item, View
         view = View(
             Item('record'),
             Item('anti_alias'),
+            Item('background_write'),
             Item('filename'),
+            Item('stream_command'),
+            Item('stream_format'),
+            Item('frame_rate'),
             Item('directory'),
         )
         return view
@@ -32,6 +56,8 @@ class MovieMaker(HasTraits):
         if self.record:
             self._update_subdir()
             self._count = 0
+            if self._use_writer():
+                self._start_writer()
             self._save_scene(self._count)
 
     def animation_step(self):
@@ -40,7 +66,7 @@ class MovieMaker(HasTraits):
             self._save_scene(self._count)
 
     def animation_stop(self):
-        pass
+        self._stop_writer()
 
     @contextmanager
     def record_movie(self):
@@ -71,6 +97,16 @@ class MovieMaker(HasTraits):
         if not os.path.exists(dir):
             os.makedirs(dir)
 
+        if self._writer is not None:
+            rw = self.scene.render_window
+            rw.render()
+            front = not self.scene.off_screen_rendering
+            if self._is_streaming():
+                self._writer.write(rw, front=front)
+            else:
+                fname = os.path.join(dir, self.filename%count)
+                self._writer.write(rw, fname, front=front)
+            return
         fname = os.path.join(dir, self.filename%count)
         if not self.anti_alias:
             orig_aa = self.scene.anti_aliasing_frames
@@ -78,6 +114,92 @@ class MovieMaker(HasTraits):
         if not self.anti_alias:
             self.scene.anti_aliasing_frames = orig_aa
 
+    def _is_streaming(self):
+        """Return True if the frames are streamed to a command or file."""
+        ext = os.path.splitext(self.filename)[1].lower()
+        return bool(self.stream_command) or ext in ('.rgb', '.y4m')
+
+    def _use_writer(self):
+        """Return True if the frames can be written in the background."""
+        from tvtk.pyface.frame_writer import SUPPORTED_FORMATS
+        if self.scene is None:
+            return False
+        if self._is_streaming():
+            return True
+        ext = os.path.splitext(self.filename)[1].lower()
+        return (self.background_write and self.scene.magnification == 1
+                and ext in SUPPORTED_FORMATS)
+
+    def _start_writer(self):
+        from tvtk.pyface.frame_writer import FrameStreamer, FrameWriter
+        self._stop_writer()
+        if self._is_streaming():
+            dir = os.path.join(self.directory, self._subdir)
+            if not os.path.exists(dir):
+                os.makedirs(dir)
+            if self.stream_command:
+                self._writer = FrameStreamer(
+                    command=self.stream_command, format=self.stream_format,
+                    fps=self.frame_rate, cwd=dir,
+                    max_pending=self.max_pending
+                )
+            else:
+                format = os.path.splitext(self.filename)[1].lower()[1:]
+                self._writer = FrameStreamer(
+                    file_name=os.path.join(dir, self.filename), format=format,
+                    fps=self.frame_rate, max_pending=self.max_pending
+                )
+        else:
+            self._writer = FrameWriter(max_workers=self.writer_threads,
+                                       max_pending=self.max_pending)
+        # Set the anti-aliasing once for all the frames instead of
+        # rendering each frame twice as `TVTKScene.save` does.
+        if self.anti_alias:
+            self._orig_aa = self._set_anti_aliasing()
+
+    def _stop_writer(self):
+        """Wait for the pending frames and stop the writer."""
+        writer = self._writer
+        if writer is None:
+            return
+        self._writer = None
+        try:
+            writer.shutdown()
+        finally:
+            if self._orig_aa is not None:
+                self._restore_anti_aliasing(self._orig_aa)
+                self._orig_aa = None
+                self.scene.render_window.render()
+
+    def _set_anti_aliasing(self):
+        """Anti-alias the frames rendered from now on and return the
+        previous settings for `_restore_anti_aliasing`.
+        """
+        rw = self.scene.render_window
+        if hasattr(rw, 'aa_frames'):
+            orig = ('aa_frames', rw.aa_frames)
+            rw.aa_frames = self.scene.anti_aliasing_frames
+            return orig
+        renderers = list(rw.renderers)
+        if not all(hasattr(ren, 'use_fxaa') for ren in renderers):
+            orig = ('multi_samples', rw.multi_samples)
+            rw.multi_samples = self.scene.anti_aliasing_frames
+            return orig
+        # The multi samples of an initialized window cannot be changed,
+        # so FXAA is used instead.
+        orig = ('use_fxaa', [(ren, ren.use_fxaa) for ren in renderers])
+        for ren in renderers:
+            ren.use_fxaa = True
+        return orig
+
+    def _restore_anti_aliasing(self, orig):
+        kind, value = orig
+        if kind == 'use_fxaa':
+            for ren, use_fxaa in value:
+                ren.use_fxaa = use_fxaa
+        else:
+            setattr(self.scene.render_window, kind, value)
+
     def _directory_default(self):
         home = get_home_directory()
         return os.path.join(home, 'Documents', 'mayavi_movies')
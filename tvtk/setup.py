@@ -95,11 +95,15 @@ def gen_tvtk_classes_zip():
     sys.stdout.flush()
     cwd = os.getcwd()
     os.chdir(output_dir)
-    gen = TVTKGenerator('')
+    # Generate the classes with all the CPUs and keep the parsed VTK
+    # classes across builds.
+    cache = os.path.join(os.path.abspath(MY_DIR), 'tvtk_classes_cache.pkl')
+    gen = TVTKGenerator('', n_jobs=0, cache_file=cache)
     gen.generate_code()
     gen.build_zip(True)
     os.chdir(cwd)
     print("Done.")
+    gen.print_timings()
     print('-'*70)
     sys.path.remove(MY_DIR)
 
@@ -482,7 +482,7 @@ class HelperGenerator:
         vtk_version = v.GetVTKVersion()[:3]
         vtk_src_version = v.GetVTKSourceVersion()
         code = """
-        import vtk
+        from tvtk import vtk_module as vtk
         from tvtk import tvtk_base
         from tvtk.common import get_tvtk_name, camel2enthought
 
@@ -5,10 +5,31 @@
 # License: BSD Style.
 
 import contextlib
+import functools
 import gc
+import os
 import unittest
 import weakref
 
+
+def benchmark(func):
+    """Decorate a test which measures the performance of some code and
+    shows the results with `report`.  These are slow and are skipped
+    unless the MAYAVI_BENCHMARK environment variable is set.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kw):
+        print('\n%s:' % func.__name__)
+        return func(*args, **kw)
+    return unittest.skipUnless(os.environ.get('MAYAVI_BENCHMARK'),
+                               'set MAYAVI_BENCHMARK=1 to run')(wrapper)
+
+
+def report(text):
+    """Show a line of the results of a `benchmark` test."""
+    print('  ' + text)
+
+
 @contextlib.contextmanager
 def restore_gc_state():
     """Ensure that gc state is restored on exit of the with statement."""
@@ -5,7 +5,9 @@ Tests for array_handler.py.
 # Copyright (c) 2005-2020, Enthought, Inc.
 # License: BSD Style.
 
+import time
 import unittest
+from unittest import mock
 import vtk
 import numpy
 
@@ -17,6 +19,7 @@ from tvtk import tvtk_base
 #     should be enough, however nose 0.9.3 will not find it, unless you give
 #     it the full path.  It nose 0.10.3 works fine in this respect.
 from tvtk.tests.test_tvtk_base import Prop
+from tvtk.tests.common import benchmark, report
 
 
 def mysum(arr):
@@ -224,6 +227,56 @@ class TestArrayHandler(unittest.TestCase):
         cells = array_handler.array2vtkCellArray(a)
         self.assertEqual(cells.GetNumberOfCells(), N)
 
+    def test_arr2cell_array_offsets(self):
+        """Test offsets and connectivity to vtkCellArray conversion."""
+        offsets = numpy.array([0, 1, 3, 6, 10])
+        conn = numpy.arange(10)
+        cells = array_handler.array2vtkCellArray((offsets, conn))
+        self.assertEqual(cells.GetNumberOfCells(), 4)
+        z = numpy.array([1, 0, 2, 1, 2, 3, 3, 4, 5, 4, 6, 7, 8, 9])
+        arr = array_handler.vtk2array(cells.GetData())
+        self.assertEqual(numpy.all(arr == z), True)
+
+        # The data is copied.
+        conn[0] = 5
+        arr = array_handler.vtk2array(cells.GetData())
+        self.assertEqual(numpy.all(arr == z), True)
+
+        # Other integer types work and the passed array is reused.
+        cells1 = vtk.vtkCellArray()
+        cells = array_handler.array2vtkCellArray(
+            (offsets.astype(numpy.int32), numpy.arange(10, dtype='i2')),
+            cells1
+        )
+        self.assertTrue(cells is cells1)
+        arr = array_handler.vtk2array(cells.GetData())
+        self.assertEqual(numpy.all(arr == z), True)
+
+        self.assertRaises(AssertionError, array_handler.array2vtkCellArray,
+                          (numpy.array([1, 3]), numpy.arange(3)))
+        self.assertRaises(AssertionError, array_handler.array2vtkCellArray,
+                          (numpy.array([0, 3]), numpy.arange(4)))
+
+        # Ragged lists of tuples also work.
+        a = [(0,), (1, 2), (3, 4, 5), (6, 7, 8, 9)]
+        cells = array_handler.array2vtkCellArray(a)
+        arr = array_handler.vtk2array(cells.GetData())
+        self.assertEqual(numpy.all(arr == z), True)
+
+        # Check the conversion to the legacy layout.
+        legacy = array_handler._offsets_to_legacy(offsets, numpy.arange(10))
+        self.assertEqual(numpy.all(legacy == z), True)
+        self.assertEqual(legacy.dtype, array_handler.ID_TYPE_CODE)
+
+        # A million ragged cells should be created rapidly.
+        N = int(1e6)
+        sizes = numpy.arange(N) % 3 + 2
+        offsets = numpy.zeros(N + 1, int)
+        numpy.cumsum(sizes, out=offsets[1:])
+        conn = numpy.arange(offsets[-1]) % 1000
+        cells = array_handler.array2vtkCellArray((offsets, conn))
+        self.assertEqual(cells.GetNumberOfCells(), N)
+
     def test_arr2vtkPoints(self):
         """Test Numeric array to vtkPoints conversion."""
         a = [[0.0, 0.0, 0.0], [1.0, 1.0, 1.0]]
@@ -398,6 +451,66 @@ class TestArrayHandler(unittest.TestCase):
         del varr
         self.assertEqual(len(cache), 0)
 
+    def test_array_cache_nbytes(self):
+        """Test the memory accounting of the ArrayCache."""
+        cache = array_handler.ArrayCache()
+        self.assertEqual(cache.nbytes, 0)
+        a = numpy.zeros((10, 3))
+        b = numpy.zeros(100, numpy.int32)
+        varr = array_handler.array2vtk(a)
+        varr1 = array_handler.array2vtk(b)
+        cache.add(varr, numpy.ravel(a))
+        cache.add(varr1, b)
+        self.assertEqual(cache.nbytes, 240 + 400)
+
+        entries = sorted(cache.get_entries(), key=lambda x: x['nbytes'])
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['shape'], (10, 3))
+        self.assertEqual(entries[0]['dtype'], numpy.dtype(float))
+        self.assertEqual(entries[0]['vtk_class'], varr.GetClassName())
+        self.assertTrue(varr.IsA('vtkDoubleArray'))
+        self.assertEqual(entries[1]['shape'], (100, 1))
+        self.assertEqual(entries[1]['nbytes'], 400)
+
+        stats = cache.get_stats()
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['nbytes'], 640)
+        self.assertEqual(stats['dtypes'][numpy.dtype(numpy.int32)],
+                         dict(count=1, nbytes=400))
+
+        # Replacing the data of a cached array.
+        cache.add(varr1, numpy.zeros(10, numpy.int32))
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 280)
+
+        del varr
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 40)
+        del varr1
+        self.assertEqual(cache.nbytes, 0)
+        self.assertEqual(cache.get_entries(), [])
+
+        # The global cache is accessible.
+        self.assertTrue(array_handler.get_array_cache() is
+                        array_handler._array_cache)
+
+    def test_array_cache_budget(self):
+        """Test the soft memory budget of the ArrayCache."""
+        cache = array_handler.ArrayCache(budget=1000)
+        varr = vtk.vtkDoubleArray()
+        varr1 = vtk.vtkDoubleArray()
+        cache.add(varr, numpy.zeros(100))
+        with self.assertLogs('tvtk.array_handler', level='WARNING') as cm:
+            cache.add(varr1, numpy.zeros(100))
+        self.assertIn('exceeding the budget of 1000', cm.output[0])
+
+        cache = array_handler.ArrayCache(budget=1000, budget_action='raise')
+        cache.add(varr, numpy.zeros(100))
+        self.assertRaises(MemoryError, cache.add, varr1, numpy.zeros(100))
+        # The array is cached nevertheless.
+        self.assertTrue(varr1 in cache)
+        self.assertEqual(cache.nbytes, 1600)
+
     def test_vtk2array_appended_array(self):
         """Test the vtk2array can tolerate appending a cached array."""
         # array is cached upon array2vtk is called
@@ -428,5 +541,116 @@ class TestArrayHandler(unittest.TestCase):
         self.assertEqual(numpy.all(np == list(range(10))), True)
 
 
+class TestArrayPool(unittest.TestCase):
+    def test_reuse_same_shape(self):
+        """Test if the pooled VTK array is reused for the same shape."""
+        pool = array_handler.ArrayPool()
+        a = numpy.arange(12, dtype=float).reshape(4, 3)
+        vtk_arr = pool.array2vtk(a, 'vectors')
+        self.assertEqual(len(pool), 1)
+        self.assertTrue('vectors' in pool)
+        self.assertTrue(pool.get('vectors') is vtk_arr)
+
+        mtime = vtk_arr.GetMTime()
+        b = a + 100.0
+        vtk_arr1 = pool.array2vtk(b, 'vectors')
+        self.assertTrue(vtk_arr1 is vtk_arr)
+        self.assertTrue(vtk_arr.GetMTime() > mtime)
+        self.assertEqual(vtk_arr.GetTuple3(0), (100., 101., 102.))
+        # No copy is made, so the data is shared.
+        b[0] = [1.0, 2.0, 3.0]
+        self.assertEqual(vtk_arr.GetTuple3(0), (1., 2., 3.))
+        # The cache holds the new array and not the old one.
+        z = array_handler._array_cache.get(vtk_arr)
+        self.assertEqual(numpy.sum(z - numpy.ravel(b)), 0.0)
+        arr = array_handler.vtk2array(vtk_arr)
+        self.assertEqual(numpy.sum(arr - b), 0.0)
+
+        # Other keys get their own array.
+        vtk_arr2 = pool.array2vtk(numpy.zeros(4), 'scalars')
+        self.assertFalse(vtk_arr2 is vtk_arr)
+        self.assertEqual(len(pool), 2)
+
+        pool.remove('scalars')
+        self.assertEqual(len(pool), 1)
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+
+    def test_reuse_type_conversion(self):
+        """Test if arrays of a different dtype mapping to the same VTK
+        type are handled."""
+        pool = array_handler.ArrayPool()
+        vtk_arr = pool.array2vtk(numpy.zeros(5, 'f'))
+        vtk_arr1 = pool.array2vtk([1.0, 2.0, 3.0, 4.0, 5.0])
+        # A Python list is a float64 array and hence a different type.
+        self.assertFalse(vtk_arr1 is vtk_arr)
+        self.assertEqual(vtk_arr1.GetTuple1(4), 5.0)
+        vtk_arr2 = pool.array2vtk(numpy.ones(5))
+        self.assertTrue(vtk_arr2 is vtk_arr1)
+        self.assertEqual(vtk_arr2.GetTuple1(4), 1.0)
+
+    def test_new_array_on_shape_change(self):
+        """Test if a new array is created when the shape changes."""
+        pool = array_handler.ArrayPool()
+        vtk_arr = pool.array2vtk(numpy.zeros((10, 3)))
+        vtk_arr1 = pool.array2vtk(numpy.ones((20, 3)))
+        self.assertFalse(vtk_arr1 is vtk_arr)
+        self.assertEqual(vtk_arr1.GetNumberOfTuples(), 20)
+        vtk_arr2 = pool.array2vtk(numpy.ones(60))
+        self.assertFalse(vtk_arr2 is vtk_arr1)
+        self.assertEqual(vtk_arr2.GetNumberOfComponents(), 1)
+        self.assertRaises(AssertionError, pool.array2vtk,
+                          numpy.ones(60, complex))
+
+    def test_no_observer_buildup(self):
+        """Test that reusing an array does not pile up observers."""
+        cache = array_handler._array_cache
+        pool = array_handler.ArrayPool()
+        l1 = len(cache)
+
+        def count_delete_observers(vtk_arr):
+            # Each DeleteEvent observer of the cache calls _remove_array.
+            with mock.patch.object(cache, '_remove_array') as remove:
+                vtk_arr.InvokeEvent('DeleteEvent')
+            return remove.call_count
+
+        vtk_arr = pool.array2vtk(numpy.zeros(10))
+        n_observers = count_delete_observers(vtk_arr)
+        self.assertEqual(n_observers, 1)
+        for i in range(10):
+            pool.array2vtk(numpy.ones(10)*i)
+        self.assertEqual(len(cache), l1 + 1)
+        self.assertFalse(vtk_arr.HasObserver('ModifiedEvent'))
+        self.assertEqual(count_delete_observers(vtk_arr), n_observers)
+
+        pool.clear()
+        del vtk_arr
+        self.assertEqual(len(array_handler._array_cache), l1)
+
+    @benchmark
+    def test_benchmark_pool(self):
+        """Benchmark pooled conversions against plain array2vtk."""
+        n_iter = 2000
+        data = [numpy.random.random((1000, 3)) for i in range(4)]
+
+        t1 = time.perf_counter()
+        for i in range(n_iter):
+            array_handler.array2vtk(data[i % 4])
+        t_plain = time.perf_counter() - t1
+
+        pool = array_handler.ArrayPool()
+        first = pool.array2vtk(data[0])
+        t1 = time.perf_counter()
+        for i in range(n_iter):
+            vtk_arr = pool.array2vtk(data[i % 4])
+        t_pool = time.perf_counter() - t1
+        self.assertTrue(vtk_arr is first)
+
+        report("array2vtk: %.0f conversions/sec (%d VTK arrays allocated)"
+               % (n_iter/t_plain, n_iter))
+        report("ArrayPool: %.0f conversions/sec (1 VTK array allocated)"
+               % (n_iter/t_pool))
+
+
 if __name__ == "__main__":
     unittest.main()
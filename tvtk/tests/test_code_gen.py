@@ -0,0 +1,198 @@
+"""Tests for the parallel and cached generation of the TVTK classes in
+code_gen.py.
+
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from tvtk import code_gen, vtk_parser
+from tvtk.code_gen import GeneratorCache, TVTKGenerator, partition_classes
+from tvtk.wrapper_gen import WrapperGenerator
+
+_wrap_gen = WrapperGenerator()
+
+# Classes whose wrapper code does not depend on uninitialized VTK
+# members and so is the same in every run.
+CLASSES = ['vtkObject', 'vtkProperty', 'vtkActor', 'vtkPlane',
+           'vtkTextProperty', 'vtkDataEncoder']
+
+
+def read_files(directory):
+    result = {}
+    for name in os.listdir(directory):
+        if name.endswith('.py'):
+            with open(os.path.join(directory, name)) as f:
+                result[name] = f.read()
+    return result
+
+
+class TestPartitionClasses(unittest.TestCase):
+    def setUp(self):
+        tree = _wrap_gen.get_tree()
+        self.nodes = [node for nodes in tree.tree for node in nodes
+                      if node.name.startswith('vtk')]
+
+    def test_partition(self):
+        nodes = self.nodes
+        names = sorted(node.name for node in nodes)
+        for n_parts in (1, 2, 3, 8):
+            parts = partition_classes(nodes, n_parts)
+            self.assertEqual(len(parts), n_parts)
+            # Every class is in one part, the parts are sorted by level.
+            self.assertEqual(
+                sorted(node.name for part in parts for node in part), names
+            )
+            for part in parts:
+                levels = [node.level for node in part]
+                self.assertEqual(levels, sorted(levels))
+            sizes = [len(part) for part in parts]
+            self.assertTrue(max(sizes) <= 1.5*len(nodes)/n_parts, sizes)
+
+    def test_subtrees_kept_together(self):
+        parts = partition_classes(self.nodes, 4)
+        part_of = dict((node.name, i) for i, part in enumerate(parts)
+                       for node in part)
+        for name in ('vtkPolyDataMapper', 'vtkOpenGLPolyDataMapper'):
+            self.assertEqual(part_of[name], part_of['vtkMapper'])
+
+    def test_small(self):
+        self.assertEqual(partition_classes([], 4), [])
+        nodes = self.nodes[:3]
+        parts = partition_classes(nodes, 8)
+        self.assertEqual(len(parts), 3)
+        self.assertEqual(sorted(node.name for part in parts for node in part),
+                         sorted(node.name for node in nodes))
+
+
+class TestGeneratorCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.tmp_dir, 'cache.pkl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def save_cache(self, **kw):
+        cache = GeneratorCache(self.file_name)
+        cache.methods = {'vtkFoo': b'methods'}
+        cache.code = {'vtkFoo': 'code'}
+        for key, value in kw.items():
+            setattr(cache, key, value)
+        cache.save()
+
+    def test_round_trip(self):
+        cache = GeneratorCache(self.file_name)
+        self.assertEqual((cache.methods, cache.code), ({}, {}))
+        self.save_cache()
+        cache = GeneratorCache(self.file_name)
+        self.assertEqual(cache.methods, {'vtkFoo': b'methods'})
+        self.assertEqual(cache.code, {'vtkFoo': 'code'})
+        self.assertEqual(os.listdir(self.tmp_dir), ['cache.pkl'])
+
+    def test_invalidation(self):
+        self.save_cache(vtk_version=('1.0.0', 'vtk version 1.0.0'))
+        cache = GeneratorCache(self.file_name)
+        self.assertEqual((cache.methods, cache.code), ({}, {}))
+
+        # A change of the generator keeps the parsed methods.
+        self.save_cache(generator_digest='changed')
+        cache = GeneratorCache(self.file_name)
+        self.assertEqual(cache.methods, {'vtkFoo': b'methods'})
+        self.assertEqual(cache.code, {})
+
+        self.save_cache(parser_digest='changed')
+        cache = GeneratorCache(self.file_name)
+        self.assertEqual(cache.methods, {})
+        self.assertEqual(cache.code, {'vtkFoo': 'code'})
+
+    def test_bad_file(self):
+        for data in (b'', b'garbage', pickle.dumps([1, 2])):
+            with open(self.file_name, 'wb') as f:
+                f.write(data)
+            cache = GeneratorCache(self.file_name)
+            self.assertEqual((cache.methods, cache.code), ({}, {}))
+
+
+class TestParsedMethods(unittest.TestCase):
+    def test_round_trip(self):
+        import vtk
+        p = vtk_parser.VTKMethodParser()
+        p.parse(vtk.vtkTextProperty)
+        parsed = p.get_parsed_methods()
+        data = pickle.dumps(parsed)
+        p.parse(vtk.vtkPlane)
+        p.set_parsed_methods(pickle.loads(data))
+        self.assertEqual(p.get_parsed_methods(), parsed)
+        self.assertIn('FontFamily', p.get_state_methods())
+        self.assertIn('Bold', p.get_toggle_methods())
+
+    def test_static_state_is_restored(self):
+        import vtk
+        mode = vtk.vtkMapper.GetResolveCoincidentTopology()
+        self.addCleanup(vtk.vtkMapper.SetResolveCoincidentTopology, mode)
+        vtk.vtkMapper.SetResolveCoincidentTopologyToPolygonOffset()
+        p = vtk_parser.VTKMethodParser()
+        p.parse(vtk.vtkMapper)
+        # The default is the initial value of VTK and the value shared by
+        # the mappers is unchanged.
+        default = p.get_state_methods()['ResolveCoincidentTopology'][0]
+        self.assertEqual(default[0], 'Off')
+        self.assertEqual(vtk.vtkMapper.GetResolveCoincidentTopology(),
+                         vtk.VTK_RESOLVE_POLYGON_OFFSET)
+
+
+class TestTVTKGenerator(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmp_dir, 'cache.pkl')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_generate_classes_uses_parse_cache(self):
+        gen = TVTKGenerator(os.path.join(self.tmp_dir, 'out'))
+        code, parsed, seconds = gen._generate_classes(['vtkPlane'], {})
+        self.assertEqual(list(code), ['vtkPlane'])
+        self.assertIn('class Plane(ImplicitFunction)', code['vtkPlane'])
+        self.assertTrue(seconds > 0)
+        # The ancestors are parsed too.
+        self.assertEqual(sorted(parsed), ['vtkImplicitFunction', 'vtkObject',
+                                          'vtkObjectBase', 'vtkPlane'])
+
+        with mock.patch.object(vtk_parser.VTKMethodParser, 'parse') as parse:
+            code2, parsed2, seconds = gen._generate_classes(['vtkPlane'],
+                                                            parsed)
+        self.assertFalse(parse.called)
+        self.assertEqual(parsed2, {})
+        self.assertEqual(code2, code)
+
+    def test_parallel_and_cached_generation(self):
+        results = []
+        for n_jobs, cache_file in ((1, None), (2, self.cache_file),
+                                   (2, self.cache_file)):
+            out_dir = os.path.join(self.tmp_dir, 'out%d' % len(results))
+            gen = TVTKGenerator(out_dir, n_jobs=n_jobs,
+                                cache_file=cache_file)
+            tree = gen.wrap_gen.get_tree()
+            gen._write_wrapper_files([tree.get_node(name)
+                                      for name in CLASSES])
+            results.append(read_files(gen.out_dir))
+
+        serial, parallel, cached = results
+        modules = [code_gen.camel2enthought(name[3:]) + '.py'
+                   for name in CLASSES]
+        self.assertEqual(sorted(serial), sorted(modules))
+        self.assertEqual(parallel, serial)
+        self.assertEqual(cached, serial)
+        # The last run used the cache only.
+        self.assertIn('generate 0 classes', gen.timings)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,9 +6,12 @@
 # License: BSD Style.
 
 from six.moves import reload_module
+import gc
+import time
 import unittest
 
 from tvtk import messenger
+from tvtk.tests.common import benchmark, report
 
 
 #################################################################
@@ -146,6 +149,72 @@ class TestMessenger(unittest.TestCase):
         # Clean up.
         messenger.disconnect(c1)
 
+    def test_dead_ref_pruned_without_send(self):
+        """Test if slots of gc'd instances are removed eagerly."""
+        class C:
+            def foo(self, o, e):
+                pass
+        c = C()
+        c1 = C()
+        messenger.connect(c1, 'foo', c.foo)
+        m = messenger.Messenger()
+        slots = m._signals[hash(c1)]['foo']
+        self.assertEqual(len(slots), 1)
+        del c
+        gc.collect()
+        self.assertEqual(len(slots), 0)
+
+        # Clean up.
+        messenger.disconnect(c1)
+
+    def test_dispatch_table_invalidation(self):
+        """Test if connecting/disconnecting updates the handlers called."""
+        a1, a2 = A(), A()
+        b = A()
+        messenger.connect(b, 'evt', a1.callback)
+        messenger.send(b, 'evt', 1)
+        self.assertEqual(a1.args, (1,))
+        self.assertEqual(a2.args, None)
+
+        messenger.connect(b, 'evt', a2.callback)
+        messenger.send(b, 'evt', 2)
+        self.assertEqual(a1.args, (2,))
+        self.assertEqual(a2.args, (2,))
+
+        messenger.connect(b, 'all', a2.catch_all_cb)
+        messenger.send(b, 'other')
+        self.assertEqual(a2.did_catch_all, 1)
+        self.assertEqual(a1.event, 'evt')
+
+        messenger.disconnect(b, 'evt', a1.callback)
+        messenger.send(b, 'evt', 3)
+        self.assertEqual(a1.args, (2,))
+        self.assertEqual(a2.args, (3,))
+
+        messenger.disconnect(b)
+        messenger.send(b, 'evt', 4)
+        self.assertEqual(a2.args, (3,))
+
+        # Sending from an unhashable object does nothing.
+        messenger.send([], 'evt')
+
+    @benchmark
+    def test_benchmark_send(self):
+        """Benchmark the number of sends/sec with many listeners."""
+        for n_listeners in (1, 10, 100):
+            source = A()
+            listeners = [A() for i in range(n_listeners)]
+            for l in listeners:
+                messenger.connect(source, 'ModifiedEvent', l.callback)
+            messenger.connect(source, 'ModifiedEvent', callback)
+            n = 20000 // n_listeners
+            t1 = time.perf_counter()
+            for i in range(n):
+                messenger.send(source, 'ModifiedEvent')
+            dt = time.perf_counter() - t1
+            report("%d listeners: %d sends/sec" % (n_listeners, n/dt))
+            messenger.disconnect(source)
+
 
 if __name__ == "__main__":
     unittest.main()
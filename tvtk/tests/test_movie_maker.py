@@ -1,10 +1,51 @@
+import hashlib
 import mock
 import os
 import shutil
+import sys
 import tempfile
+import time
 import unittest
 
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.pyface.frame_writer import (
+    FrameStreamer, FrameWriter, rgb_to_ycbcr, write_png
+)
 from tvtk.pyface.movie_maker import MovieMaker
+from tvtk.pyface.tvtk_scene import TVTKScene
+
+
+class FakeRenderWindow(object):
+    """Stands in for a render window, the pixels of the frame `i` are all
+    set to `i`, the top left pixel is 255 and the others in the top row
+    are 128.
+    """
+    def __init__(self, size=(40, 30)):
+        self.size = size
+        self.count = 0
+
+    def get_pixel_data(self, x0, y0, x1, y1, front, array):
+        w, h = x1 - x0 + 1, y1 - y0 + 1
+        image = np.full((h, w, 3), self.count, dtype=np.uint8)
+        # VTK images have the bottom row first.
+        image[-1] = 128
+        image[-1, 0] = 255
+        array.from_array(image.reshape(-1, 3))
+        self.count += 1
+
+
+def read_image(file_name):
+    """Read an image file with VTK and return it with the top row first."""
+    reader = tvtk.PNGReader() if file_name.endswith('.png') else \
+        tvtk.JPEGReader()
+    reader.file_name = file_name
+    reader.update()
+    out = reader.output
+    w, h, _ = out.dimensions
+    img = out.point_data.scalars.to_array().reshape(h, w, -1)
+    return img[::-1]
 
 
 class TestMovieMaker(unittest.TestCase):
@@ -81,5 +122,208 @@ class TestMovieMaker(unittest.TestCase):
         self.assertEqual(mm._subdir, 'movie002')
 
 
+class TestFrameWriter(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_write_png(self):
+        for n_comp in (3, 4):
+            image = np.random.randint(0, 256, (7, 11, n_comp)).astype('uint8')
+            fname = os.path.join(self.root, 'img.png')
+            write_png(fname, image)
+            np.testing.assert_array_equal(read_image(fname), image)
+
+    def test_write_frames(self):
+        rw = FakeRenderWindow()
+        writer = FrameWriter(max_workers=2, max_pending=3)
+        for i, ext in enumerate(('.png', '.npy', '.jpg') * 4):
+            writer.write(rw, os.path.join(self.root, 'f%02d%s' % (i, ext)))
+        writer.shutdown()
+
+        # The buffers are reused.
+        self.assertTrue(writer._n_buffers <= 3)
+        self.assertEqual(writer.pending, 0)
+        for i, ext in enumerate(('.png', '.npy', '.jpg') * 4):
+            fname = os.path.join(self.root, 'f%02d%s' % (i, ext))
+            if ext == '.npy':
+                img = np.load(fname)
+            else:
+                img = read_image(fname)
+            self.assertEqual(img.shape, (30, 40, 3))
+            if ext != '.jpg':
+                self.assertEqual(tuple(img[0, 0]), (255, 255, 255))
+                self.assertEqual(tuple(img[0, 1]), (128, 128, 128))
+                self.assertEqual(img[1:].min(), i)
+                self.assertEqual(img[1:].max(), i)
+            else:
+                self.assertTrue(abs(int(img[10, 10, 0]) - i) < 3)
+
+    def test_errors_are_raised(self):
+        rw = FakeRenderWindow()
+        writer = FrameWriter()
+        self.assertRaises(ValueError, writer.write, rw, 'frame.xyz')
+        writer.write(rw, os.path.join(self.root, 'no', 'frame.png'))
+        self.assertRaises(IOError, writer.flush)
+        writer.shutdown()
+
+    def test_movie_maker_stops_writer(self):
+        # Given
+        mm = MovieMaker(record=True, directory=self.root,
+                        background_write=True)
+        mm._save_scene = mock.MagicMock()
+        writer = mock.MagicMock()
+
+        def start_writer():
+            mm._writer = writer
+
+        mm._use_writer = mock.MagicMock(return_value=True)
+        mm._start_writer = start_writer
+
+        # When
+        with mm.record_movie():
+            mm.animation_step()
+
+        # Then
+        writer.shutdown.assert_called_once_with()
+        self.assertIsNone(mm._writer)
+        self.assertEqual(mm._save_scene.call_count, 2)
+
+    def test_background_frames_are_anti_aliased(self):
+        # Given
+        ren = tvtk.Renderer()
+        rw = FakeRenderWindow()
+        rw.renderers, rw.multi_samples = [ren], 0
+        rw.render = mock.Mock()
+        scene = mock.Mock(spec=TVTKScene, render_window=rw,
+                          anti_aliasing_frames=8, magnification=1,
+                          off_screen_rendering=True)
+        mm = MovieMaker(record=True, directory=self.root,
+                        background_write=True, scene=scene)
+
+        # When
+        mm.animation_start()
+
+        # Then FXAA is used as the multi samples of an initialized
+        # window cannot be changed.
+        self.assertTrue(ren.use_fxaa)
+        self.assertEqual(rw.multi_samples, 0)
+        mm.animation_stop()
+        self.assertFalse(ren.use_fxaa)
+        self.assertIsNone(mm._orig_aa)
+
+
+# A stand-in for a video encoder, it writes the MD5 checksum of every
+# frame of raw RGB data read from its standard input to a file.
+CHECKSUM_FRAMES = """
+import hashlib, sys, time
+width, height = int(sys.argv[1]), int(sys.argv[2])
+delay, out = float(sys.argv[3]), sys.argv[4]
+size = width*height*3
+with open(out, 'w') as f:
+    while True:
+        data = sys.stdin.buffer.read(size)
+        if len(data) < size:
+            break
+        f.write(hashlib.md5(data).hexdigest() + '\\n')
+        time.sleep(delay)
+"""
+
+
+def frame_checksums(n_frames, size=(40, 30)):
+    """The checksums of the frames streamed from a FakeRenderWindow."""
+    rw = FakeRenderWindow(size)
+    result = []
+    for i in range(n_frames):
+        array = tvtk.UnsignedCharArray()
+        rw.get_pixel_data(0, 0, size[0] - 1, size[1] - 1, False, array)
+        image = array.to_array().reshape(size[1], size[0], 3)[::-1]
+        result.append(hashlib.md5(image.tobytes()).hexdigest())
+    return result
+
+
+class TestFrameStreamer(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def stream_to_command(self, n_frames, delay=0.0, max_pending=8):
+        out = os.path.join(self.root, 'checksums.txt')
+        command = [sys.executable, '-c', CHECKSUM_FRAMES, '{width}',
+                   '{height}', str(delay), out]
+        streamer = FrameStreamer(command=command, max_pending=max_pending)
+        rw = FakeRenderWindow()
+        for i in range(n_frames):
+            streamer.write(rw)
+        streamer.shutdown()
+        with open(out) as f:
+            return streamer, f.read().split()
+
+    def test_stream_to_command(self):
+        streamer, checksums = self.stream_to_command(20)
+        self.assertEqual(checksums, frame_checksums(20))
+        self.assertEqual(streamer.frames, 20)
+
+    def test_back_pressure(self):
+        t1 = time.perf_counter()
+        streamer, checksums = self.stream_to_command(10, delay=0.02,
+                                                     max_pending=2)
+        self.assertTrue(time.perf_counter() - t1 > 0.18)
+        self.assertEqual(checksums, frame_checksums(10))
+        self.assertEqual(streamer._n_buffers, 2)
+
+    def test_stream_to_file(self):
+        fname = os.path.join(self.root, 'movie.rgb')
+        streamer = FrameStreamer(file_name=fname)
+        rw = FakeRenderWindow()
+        for i in range(5):
+            streamer.write(rw)
+        streamer.shutdown()
+        data = np.fromfile(fname, dtype=np.uint8).reshape(5, 30, 40, 3)
+        self.assertEqual(tuple(data[3, 0, 0]), (255, 255, 255))
+        self.assertEqual(data[3, 1:].min(), 3)
+
+    def test_stream_y4m(self):
+        fname = os.path.join(self.root, 'movie.y4m')
+        streamer = FrameStreamer(file_name=fname, format='y4m', fps=30)
+        rw = FakeRenderWindow()
+        for i in range(3):
+            streamer.write(rw)
+        streamer.shutdown()
+        with open(fname, 'rb') as f:
+            data = f.read()
+        header = b'YUV4MPEG2 W40 H30 F30:1 Ip A1:1 C444\n'
+        self.assertTrue(data.startswith(header))
+        frame_size = len(b'FRAME\n') + 40*30*3
+        self.assertEqual(len(data), len(header) + 3*frame_size)
+        # White and black have the extreme luma values.
+        ycc = rgb_to_ycbcr(np.array([[[255, 255, 255], [0, 0, 0]]], 'uint8'))
+        self.assertEqual(ycc[:, 0, 0].tolist(), [235, 128, 128])
+        self.assertEqual(ycc[:, 0, 1].tolist(), [16, 128, 128])
+
+    def test_errors(self):
+        self.assertRaises(ValueError, FrameStreamer)
+        self.assertRaises(ValueError, FrameStreamer, file_name='a.rgb',
+                          format='mp4')
+        # A command that exits without reading the frames.
+        streamer = FrameStreamer(command=[sys.executable, '-c',
+                                          'import sys; sys.exit(1)'])
+        rw = FakeRenderWindow(size=(400, 300))
+        with self.assertRaises((IOError, RuntimeError)):
+            for i in range(20):
+                streamer.write(rw)
+            streamer.shutdown()
+
+        streamer = FrameStreamer(file_name=os.path.join(self.root, 'a.rgb'))
+        streamer.write(FakeRenderWindow(size=(4, 3)))
+        self.assertRaises(ValueError, streamer.write,
+                          FakeRenderWindow(size=(3, 3)))
+        streamer.shutdown()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -286,6 +286,158 @@ class TestTVTKBase(unittest.TestCase):
         # Then
         self.assertEqual(p.opacity, 0.4)
 
+    def test_update_traits_sets_changed_traits_only(self):
+        """Test if update_traits only sets traits changed in VTK."""
+        set_traits = []
+
+        class CountingProp(Prop):
+            def __setattr__(self, name, value):
+                if not name.startswith('_'):
+                    set_traits.append(name)
+                super(CountingProp, self).__setattr__(name, value)
+
+        p = CountingProp()
+        obj = p._vtk_obj
+        del set_traits[:]
+        obj.SetOpacity(0.5)
+        self.assertEqual(p.opacity, 0.5)
+        self.assertEqual(set_traits, ['opacity'])
+
+        del set_traits[:]
+        obj.SetRepresentationToPoints()
+        obj.SetColor(1.0, 0.0, 0.0)
+        self.assertEqual(p.representation, 'points')
+        self.assertEqual(p.color, (1.0, 0.0, 0.0))
+        self.assertIn('representation', set_traits)
+        self.assertIn('color', set_traits)
+        self.assertNotIn('opacity', set_traits)
+        self.assertNotIn('edge_visibility', set_traits)
+
+        # A forced update does not set anything.
+        del set_traits[:]
+        p.update_traits()
+        self.assertEqual(set_traits, [])
+
+        # Setting a trait syncs all the traits again since VTK may
+        # settle on a different value.
+        p.opacity = 0.25
+        self.assertEqual(obj.GetOpacity(), 0.25)
+        del set_traits[:]
+        p.update_traits()
+        self.assertEqual(len(set_traits), len(p._updateable_traits_))
+
+    def test_deferred_update(self):
+        """Test if trait updates are coalesced by deferred_update."""
+        p = Prop()
+        vp = tvtk_base.deref_vtk(p)
+        calls = []
+        p.on_trait_change(lambda: calls.append(1), 'opacity')
+
+        with tvtk_base.deferred_update():
+            for i in range(10):
+                vp.SetOpacity(0.1*i)
+            vp.SetColor(1.0, 0.0, 0.0)
+            self.assertEqual(p.opacity, 1.0)
+            with tvtk_base.deferred_update():
+                vp.SetRepresentationToWireframe()
+            # Still deferred as the outer context is active.
+            self.assertEqual(p.representation, 'surface')
+            # Explicit updates are not deferred.
+            p.update_traits()
+            self.assertAlmostEqual(p.opacity, 0.9)
+            vp.SetOpacity(0.5)
+            self.assertAlmostEqual(p.opacity, 0.9)
+
+        self.assertEqual(p.opacity, 0.5)
+        self.assertEqual(p.color, (1.0, 0.0, 0.0))
+        self.assertEqual(p.representation, 'wireframe')
+        self.assertEqual(len(calls), 2)
+
+        # Updates are immediate again.
+        vp.SetOpacity(0.4)
+        self.assertEqual(p.opacity, 0.4)
+
+        # Test flush_updates.
+        with tvtk_base.deferred_update():
+            vp.SetOpacity(0.3)
+            tvtk_base.flush_updates()
+            self.assertEqual(p.opacity, 0.3)
+
+        # Dirty objects are not kept alive.
+        with tvtk_base.deferred_update():
+            vp.SetOpacity(0.2)
+            ref = weakref.ref(p)
+            del p
+            self.assertEqual(ref(), None)
+
+    def test_batch(self):
+        """Test if batch applies the VTK setters once on exit."""
+        updates = []
+
+        class CountingProp(Prop):
+            def update_traits(self, obj=None, event=None):
+                if not self._in_set:
+                    updates.append(self)
+                super(CountingProp, self).update_traits(obj, event)
+
+        props = [CountingProp() for i in range(5)]
+        # Count the effective VTK setter calls using the ModifiedEvent.
+        modified = []
+        for p in props:
+            p._vtk_obj.AddObserver(
+                'ModifiedEvent', lambda o, e: modified.append(o)
+            )
+
+        # Without batching, every trait assignment calls the setter.
+        p = props[0]
+        for i in range(10):
+            p.opacity = 0.05*(i + 1)
+        self.assertEqual(len(modified), 10)
+
+        del updates[:]
+        del modified[:]
+        with tvtk_base.batch():
+            for p in props:
+                for i in range(10):
+                    p.opacity = 0.01*(i + 1)
+                p.representation = 'wireframe'
+                p.edge_visibility = True
+            # The traits change but VTK does not.
+            self.assertEqual(p.opacity, 0.1)
+            self.assertEqual(p._vtk_obj.GetOpacity(), 1.0)
+            self.assertEqual(len(modified), 0)
+            self.assertEqual(updates, [])
+
+        # Three setters were called for each object.
+        self.assertEqual(len(modified), 3*len(props))
+        self.assertEqual(updates, props)
+        for p in props:
+            vp = p._vtk_obj
+            self.assertAlmostEqual(vp.GetOpacity(), 0.1)
+            self.assertEqual(vp.GetRepresentation(), 1)
+            self.assertEqual(vp.GetEdgeVisibility(), 1)
+
+        # Updates from VTK after the batch work as before.
+        p.opacity = 0.5
+        self.assertEqual(p._vtk_obj.GetOpacity(), 0.5)
+        p._vtk_obj.SetOpacity(0.6)
+        self.assertEqual(p.opacity, 0.6)
+
+    def test_batch_nested(self):
+        """Test if nested batch contexts apply the setters at the end."""
+        p = Prop()
+        vp = p._vtk_obj
+        with tvtk_base.batch():
+            with tvtk_base.batch():
+                p.opacity = 0.5
+            self.assertEqual(vp.GetOpacity(), 1.0)
+            # Changes made by VTK are deferred.
+            vp.SetRepresentationToPoints()
+            self.assertEqual(p.representation, 'surface')
+        self.assertEqual(vp.GetOpacity(), 0.5)
+        self.assertEqual(p.opacity, 0.5)
+        self.assertEqual(p.representation, 'points')
+
     def test_strict_traits(self):
         """Test if TVTK objects use strict traits."""
         p = Prop()
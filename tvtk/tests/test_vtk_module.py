@@ -0,0 +1,111 @@
+"""
+Tests for the lazy import support of vtk_module.py.
+"""
+# Copyright (c) 2020, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import subprocess
+import sys
+import unittest
+
+try:
+    import vtkmodules
+except ImportError:
+    vtkmodules = None
+
+from tvtk import vtk_module
+from tvtk.tests.common import benchmark, report
+
+
+def run_python(code, **env):
+    """Run the given code in a fresh Python process with the additional
+    environment variables and return the standard output and error."""
+    environ = dict(os.environ)
+    for key in ('TVTK_LAZY_IMPORT', 'TVTK_IMPORT_PROFILE'):
+        environ.pop(key, None)
+    environ.update(env)
+    proc = subprocess.Popen(
+        [sys.executable, '-c', code], env=environ,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+    out, err = proc.communicate()
+    if proc.returncode != 0:
+        raise RuntimeError(err)
+    return out, err
+
+
+def get_result(out):
+    """Return the words of the line starting with RESULT in the output,
+    other lines like warnings printed by TVTK are ignored."""
+    for line in out.splitlines():
+        if line.startswith('RESULT '):
+            return line.split()[1:]
+    raise AssertionError('No RESULT line in the output:\n%s' % out)
+
+
+COUNT_KITS = """
+import sys
+from tvtk.api import tvtk
+p = tvtk.Property(color=(1, 0, 0))
+assert p.color == (1.0, 0.0, 0.0)
+a = tvtk.to_tvtk(tvtk.to_vtk(p))
+assert a is p
+from tvtk import vtk_module
+n_kits = len([x for x in sys.modules if x.startswith('vtkmodules.vtk')])
+print('RESULT', vtk_module.lazy_import, n_kits)
+"""
+
+IMPORT_TIME = """
+import time
+t1 = time.perf_counter()
+import %s
+print('RESULT', time.perf_counter() - t1)
+"""
+
+
+@unittest.skipIf(vtkmodules is None or sys.version_info < (3, 7),
+                 "Lazy import requires vtkmodules and Python 3.7")
+class TestLazyImport(unittest.TestCase):
+    def test_lazy_import_loads_fewer_modules(self):
+        """Test if the lazy mode imports only the VTK modules needed."""
+        out, err = run_python(COUNT_KITS)
+        lazy, n_all = get_result(out)
+        self.assertEqual(lazy, 'False')
+
+        out, err = run_python(COUNT_KITS, TVTK_LAZY_IMPORT='1')
+        lazy, n_lazy = get_result(out)
+        self.assertEqual(lazy, 'True')
+        self.assertTrue(int(n_lazy) < int(n_all))
+
+    def test_lazy_import_fallback(self):
+        """Test if names that are not classes are still available."""
+        code = ("from tvtk import vtk_module as vtk\n"
+                "print('RESULT', vtk.VTK_FLOAT, 'vtkObject' in dir(vtk),\n"
+                "      hasattr(vtk, 'vtkFooBar'))\n")
+        out, err = run_python(code, TVTK_LAZY_IMPORT='1')
+        self.assertEqual(get_result(out), [str(vtk_module.VTK_FLOAT), 'True',
+                                       'False'])
+
+    def test_import_profile(self):
+        """Test if the import profile mode reports the VTK modules."""
+        out, err = run_python(
+            COUNT_KITS, TVTK_LAZY_IMPORT='1', TVTK_IMPORT_PROFILE='1'
+        )
+        self.assertIn('tvtk: imported vtkmodules.vtkRenderingCore in', err)
+
+    @benchmark
+    def test_benchmark_import_time(self):
+        """Benchmark the cold import time of tvtk.api and mayavi.mlab."""
+        env = dict(ETS_TOOLKIT='null')
+        for module in ('tvtk.api', 'mayavi.mlab'):
+            for lazy in ('', '1'):
+                out, err = run_python(IMPORT_TIME % module,
+                                      TVTK_LAZY_IMPORT=lazy, **env)
+                report("import %s (lazy=%s): %.3f seconds" %
+                       (module, bool(lazy), float(get_result(out)[0])))
+
+
+if __name__ == "__main__":
+    unittest.main()
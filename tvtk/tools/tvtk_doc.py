@@ -136,7 +136,33 @@ def get_tvtk_class_doc(obj):
     return doc
 
 # GLOBALS
-TVTK_CLASSES, TVTK_SOURCES, TVTK_FILTERS, TVTK_SINKS = get_tvtk_class_names()
+# The lists of class names returned by `get_tvtk_class_names`.  Finding
+# these requires instantiating every VTK class, so this is done lazily the
+# first time one of the `TVTK_CLASSES`, `TVTK_SOURCES`, `TVTK_FILTERS` or
+# `TVTK_SINKS` module attributes is accessed.
+_CLASS_NAMES = ('TVTK_CLASSES', 'TVTK_SOURCES', 'TVTK_FILTERS', 'TVTK_SINKS')
+_class_names = None
+
+
+def _get_class_names(name):
+    global _class_names
+    if _class_names is None:
+        _class_names = get_tvtk_class_names()
+    return _class_names[_CLASS_NAMES.index(name)]
+
+
+def __getattr__(name):
+    if name in _CLASS_NAMES:
+        return _get_class_names(name)
+    raise AttributeError(
+        "module '%s' has no attribute '%s'" % (__name__, name)
+    )
+
+
+if sys.version_info < (3, 7):
+    # Module level __getattr__ is not supported.
+    TVTK_CLASSES, TVTK_SOURCES, TVTK_FILTERS, TVTK_SINKS = \
+        get_tvtk_class_names()
 
 ################################################################################
 # `DocSearch` class.
@@ -291,7 +317,7 @@ class TVTKClassChooser(HasTraits):
     completions = List(Str)
 
     # List of available class names as strings.
-    available = List(TVTK_CLASSES)
+    available = List(Str)
 
     ########################################
     # Private traits.
@@ -363,6 +389,9 @@ class TVTKClassChooser(HasTraits):
         else:
             self.doc = _search_help_doc
 
+    def _available_default(self):
+        return list(_get_class_names('TVTK_CLASSES'))
+
     def _finder_default(self):
         return DocSearch()
 
@@ -389,19 +418,22 @@ class TVTKClassChooser(HasTraits):
 # `TVTKSourceChooser` class.
 ################################################################################
 class TVTKSourceChooser(TVTKClassChooser):
-    available = List(TVTK_SOURCES)
+    def _available_default(self):
+        return list(_get_class_names('TVTK_SOURCES'))
 
 ################################################################################
 # `TVTKFilterChooser` class.
 ################################################################################
 class TVTKFilterChooser(TVTKClassChooser):
-    available = List(TVTK_FILTERS)
+    def _available_default(self):
+        return list(_get_class_names('TVTK_FILTERS'))
 
 ################################################################################
 # `TVTKSinkChooser` class.
 ################################################################################
 class TVTKSinkChooser(TVTKClassChooser):
-    available = List(TVTK_SINKS)
+    def _available_default(self):
+        return list(_get_class_names('TVTK_SINKS'))
 
 
 def main():
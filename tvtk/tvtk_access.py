@@ -35,7 +35,7 @@ from tvtk.tvtk_classes.vtk_version import vtk_build_version
 
 # Make sure VTK is installed.
 try:
-    import vtk
+    from tvtk import vtk_module as vtk
 except ImportError as m:
     msg = '%s\n%s\nDo you have vtk installed properly?\n' \
           'VTK (and build instructions) can be obtained from http://www.vtk.org\n' \
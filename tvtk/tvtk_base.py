@@ -13,10 +13,9 @@ import os
 import logging
 from contextlib import contextmanager
 
-import vtk
-
 from traits import api as traits
 from . import messenger
+from . import vtk_module as vtk
 
 # Setup a logger for this module.
 logger = logging.getLogger(__name__)
@@ -261,6 +260,113 @@ def global_disable_update():
         _DISABLE_UPDATE = False
 
 
+# The nesting level of `deferred_update` and the objects whose traits are
+# to be updated when it exits.
+_DEFER_UPDATE = 0
+_dirty_objects = weakref.WeakValueDictionary()
+
+
+@contextmanager
+def deferred_update():
+    '''Coalesce the trait updates due to changes in VTK.
+
+    Inside this context, a ModifiedEvent fired by a wrapped VTK object
+    merely marks the TVTK object as dirty instead of calling its
+    `update_traits`.  When the (outermost) context exits, the traits of
+    each dirty object are updated once.  This is useful when a VTK
+    object is modified many times in a row, for example by a filter
+    that is updated repeatedly.  Use `flush_updates` to update the
+    dirty objects before the context exits.
+
+    Explicit calls to `update_traits` are not deferred.
+
+    '''
+    global _DEFER_UPDATE
+    _DEFER_UPDATE += 1
+    try:
+        yield
+    finally:
+        _DEFER_UPDATE -= 1
+        if _DEFER_UPDATE == 0:
+            flush_updates()
+
+
+def flush_updates():
+    '''Update the traits of all the objects marked dirty inside a
+    `deferred_update` context.
+    '''
+    while len(_dirty_objects) > 0:
+        objects = list(_dirty_objects.values())
+        _dirty_objects.clear()
+        for obj in objects:
+            obj.update_traits()
+
+
+# The nesting level of `batch` and the setter calls queued in it, keyed
+# on the id of the TVTK object.
+_BATCH = 0
+_batched_calls = {}
+
+
+@contextmanager
+def batch():
+    '''Queue the changes made to the VTK objects by trait assignments and
+    apply them when the (outermost) context exits.
+
+    Inside this context, setting a trait of a TVTK object changes the
+    trait but the corresponding VTK setter is only queued.  When the
+    context exits, the queued setters of each object are called in order
+    (only the last call is made when the same setter is queued many
+    times) and `update_traits` is called once for every object touched.
+    Trait updates due to changes in VTK are also deferred as done by
+    `deferred_update`.  This saves a lot of work when many traits of
+    many objects are set at once, for example, when styling a large
+    number of actors.
+
+    Note that the wrapped VTK objects are not changed until the context
+    exits.  Calling a wrapped method that modifies the VTK object inside
+    the context first applies the changes queued for that object.
+
+    '''
+    global _BATCH
+    with deferred_update():
+        _BATCH += 1
+        try:
+            yield
+        finally:
+            _BATCH -= 1
+            if _BATCH == 0:
+                _apply_batched_calls()
+
+
+def _apply_batched_calls():
+    """Call the setters queued inside a `batch` context."""
+    while len(_batched_calls) > 0:
+        calls = list(_batched_calls.values())
+        _batched_calls.clear()
+        for obj, setters in calls:
+            obj._apply_setters(setters.items())
+
+
+def _call_setter(method, val):
+    """Call the VTK setter `method` with `val` unpacking it if needed."""
+    try:
+        method(val)
+    except TypeError:
+        if hasattr(val, '__len__'):
+            method(*val)
+        else:
+            raise
+
+
+def _is_same_value(a, b):
+    """Returns True if `a` and `b` are surely equal values."""
+    try:
+        return type(a) is type(b) and bool(a == b)
+    except Exception:
+        return False
+
+
 ######################################################################
 # Utility functions.
 ######################################################################
@@ -308,6 +414,10 @@ class TVTKBase(traits.HasStrictTraits):
     # Stores the names of the traits that need to be updated.
     _updateable_traits_ = traits.Tuple
 
+    # The values last obtained from the VTK object by `update_traits`.
+    # Traits whose value did not change in VTK are not set again.
+    _vtk_values = traits.Python
+
     # List of trait names that are to be included in the full traits view of
     # this object.
     _full_traitnames_list_ = traits.List
@@ -346,8 +456,9 @@ class TVTKBase(traits.HasStrictTraits):
           creating the object.
 
         """
-        # Initialize the Python attribute.
+        # Initialize the Python attributes.
         self._in_set = 0
+        self._vtk_values = None
         if obj:
             self._vtk_obj = obj
         else:
@@ -387,7 +498,7 @@ class TVTKBase(traits.HasStrictTraits):
         """
         self.update_traits()
         d = self.__dict__.copy()
-        for i in ['_vtk_obj', '_in_set', 'reference_count',
+        for i in ['_vtk_obj', '_in_set', '_vtk_values', 'reference_count',
                   'global_warning_display', '__sync_trait__']:
             d.pop(i, None)
         return d
@@ -484,18 +595,29 @@ class TVTKBase(traits.HasStrictTraits):
         tuples containing the trait name followed by the name of the
         get method to use on the wrapped VTK object.
 
+        Only the traits whose value in the VTK object changed since
+        the last update are set.
+
         The `obj` and `event` parameters may be ignored and are not
         used in the function.  They exist only for compatibility with
-        the VTK observer callback functions.
+        the VTK observer callback functions.  When called for an event
+        inside a `deferred_update` context, the object is only marked
+        for a later update.
 
         """
         if self._in_set or _DISABLE_UPDATE:
             return
         if not hasattr(self, '_updateable_traits_'):
             return
+        if _DEFER_UPDATE and event is not None:
+            _dirty_objects[id(self)] = self
+            return
 
         self._in_set = self.DOING_UPDATE
         vtk_obj = self._vtk_obj
+        last = self._vtk_values
+        if last is None:
+            last = self._vtk_values = {}
 
         # Save the warning state and turn it off!
         warn = vtk.vtkObject.GetGlobalWarningDisplay()
@@ -516,6 +638,8 @@ class TVTKBase(traits.HasStrictTraits):
                 # value (e.g. vtkImageConvolve.GetKernel3x3 and alike)
                 pass
             else:
+                if name in last and _is_same_value(last[name], val):
+                    continue
                 try:
                     setattr(self, name, val)
                 except traits.TraitError:
@@ -523,6 +647,8 @@ class TVTKBase(traits.HasStrictTraits):
                         pass
                     else:
                         raise
+                else:
+                    last[name] = val
 
         # Reset the warning state.
         vtk.vtkObject.SetGlobalWarningDisplay(warn)
@@ -553,16 +679,23 @@ class TVTKBase(traits.HasStrictTraits):
         """
         if self._in_set == self.DOING_UPDATE:
             return
+        if _BATCH:
+            key = id(self)
+            if key not in _batched_calls:
+                _batched_calls[key] = (self, {})
+            setters = _batched_calls[key][1]
+            # Only the last value set is of interest.
+            setters.pop(method, None)
+            setters[method] = val
+            return
         vtk_obj = self._vtk_obj
+        # The trait value may differ from the value VTK settles on, so
+        # all the traits are synced on the next update.
+        self._vtk_values = None
         self._in_set += 1
         mtime = self._wrapped_mtime(vtk_obj) + 1
         try:
-            method(val)
-        except TypeError:
-            if hasattr(val, '__len__'):
-                method(*val)
-            else:
-                raise
+            _call_setter(method, val)
         finally:
             self._in_set -= 1
         if force_update or self._wrapped_mtime(vtk_obj) > mtime:
@@ -588,6 +721,11 @@ class TVTKBase(traits.HasStrictTraits):
 
         """
         vtk_obj = self._vtk_obj
+        if _BATCH and id(self) in _batched_calls:
+            # Apply the queued changes first to preserve the order.
+            obj, setters = _batched_calls.pop(id(self))
+            self._apply_setters(setters.items())
+        self._vtk_values = None
         self._in_set += 1
         mtime = self._wrapped_mtime(vtk_obj) + 1
         try:
@@ -598,6 +736,19 @@ class TVTKBase(traits.HasStrictTraits):
             self.update_traits()
         return ret
 
+    def _apply_setters(self, setters):
+        """Call the given sequence of (VTK setter, value) pairs queued in
+        a `batch` context and update the traits once.
+        """
+        self._vtk_values = None
+        self._in_set += 1
+        try:
+            for method, val in setters:
+                _call_setter(method, val)
+        finally:
+            self._in_set -= 1
+        self.update_traits()
+
     def _wrapped_mtime(self, vtk_obj):
         """A simple wrapper for the mtime so tvtk can be used for
         `vtk.vtkObjectBase` subclasses that neither have an
@@ -1,10 +1,15 @@
 # Wrapped in a try/except in those situations where someone hasn't installed
 # as an egg.  What do we do then?  For now, we just punt since we don't want
-# to define the version number in two places.
+# to define the version number in two places.  importlib.metadata is used
+# when available since importing pkg_resources is slow.
 try:
-    import pkg_resources
-    version = pkg_resources.require('Mayavi')[0].version
+    from importlib.metadata import version as _get_version
+    version = _get_version('mayavi')
+except ImportError:
+    try:
+        import pkg_resources
+        version = pkg_resources.require('Mayavi')[0].version
+    except:
+        version = ''
 except:
     version = ''
-
-
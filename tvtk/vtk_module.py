@@ -6,17 +6,85 @@ imports everything from that.  In order to add local classes to the TVTK build
 one may simply provide a tvtk_local.py module somewhere with any classes that
 need to be wrapped.
 
+If the environment variable `TVTK_LAZY_IMPORT` is set, VTK is not imported as
+a whole.  Instead, each VTK class is imported on first use from the VTK module
+(e.g. `vtkmodules.vtkCommonCore`) that provides it.  This considerably reduces
+the time taken to import TVTK.  The mapping from class names to modules is
+generated along with the TVTK classes and this requires VTK to provide the
+`vtkmodules` package and Python 3.7 or above.  Anything that is not in the
+mapping is looked up after importing all of VTK, so the module behaves the same
+in both cases.
+
+If the environment variable `TVTK_IMPORT_PROFILE` is also set, the time taken
+to import each VTK module is printed to `sys.stderr`.  The times are also
+available in the `import_times` dictionary.
+
 """
 
 # Author: Prabhu Ramachandran <prabhu [at] aero.iitb.ac.in>
 # Copyright (c) 2007-2020,  Enthought, Inc.
 # License: BSD Style.
 
-from vtk import *
-try:
-    from vtk.util.vtkAlgorithm import VTKPythonAlgorithmBase
-except ImportError:
-    pass
+import os
+import sys
+
+lazy_import = False
+if os.environ.get('TVTK_LAZY_IMPORT') and sys.version_info >= (3, 7):
+    try:
+        import vtkmodules
+        from tvtk.tvtk_classes.vtk_class_modules import vtk_class_modules
+    except ImportError:
+        pass
+    else:
+        lazy_import = True
+
+
+if lazy_import:
+    import importlib
+    import time
+
+    _profile = bool(os.environ.get('TVTK_IMPORT_PROFILE'))
+
+    # Time taken to import each VTK module that was imported lazily.
+    import_times = {}
+
+    def _import_module(name):
+        if name in sys.modules:
+            return sys.modules[name]
+        t1 = time.perf_counter()
+        mod = importlib.import_module(name)
+        import_times[name] = dt = time.perf_counter() - t1
+        if _profile:
+            print('tvtk: imported %s in %.4f seconds' % (name, dt),
+                  file=sys.stderr)
+        return mod
+
+    def __getattr__(name):
+        mod_name = vtk_class_modules.get(name)
+        if mod_name is None:
+            if name.startswith('__'):
+                raise AttributeError(name)
+            # Not a class we know of, look in all of VTK.
+            mod_name = 'vtk'
+        try:
+            value = getattr(_import_module(mod_name), name)
+        except AttributeError:
+            raise AttributeError(
+                "module '%s' has no attribute '%s'" % (__name__, name)
+            )
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        vtk = _import_module('vtk')
+        return sorted(set(globals()) | set(dir(vtk)))
+
+else:
+    from vtk import *
+    try:
+        from vtk.util.vtkAlgorithm import VTKPythonAlgorithmBase
+    except ImportError:
+        pass
 
 try:
     from tvtk_local import *
@@ -18,6 +18,12 @@ from . import vtk_module as vtk
 from .common import is_version_62, is_version_9
 
 
+# Classes never instantiated to find the default values of their methods.
+# Deleting a vtkDataEncoder can hang as its threads may miss the signal
+# to stop, which happens much more often when the CPUs are busy.
+NO_INSTANCE_CLASSES = ('vtkDataEncoder', 'vtkWebApplication')
+
+
 class VTKMethodParser:
     """This class provides useful methods for parsing methods of a VTK
     class or instance.
@@ -115,6 +121,11 @@ class VTKMethodParser:
         else:
             self._tree = None
         self._state_patn = re.compile('To[A-Z0-9]')
+        # The default of these states, shared by all the instances, is
+        # changed by the constructors of other classes.  Their initial
+        # value in VTK is used so the default does not depend on the
+        # classes parsed before.
+        self._static_states = {('vtkMapper', 'ResolveCoincidentTopology'): 0}
         self._initialize()
 
     #################################################################
@@ -294,6 +305,27 @@ class VTKMethodParser:
         """
         return self.other_meths
 
+    def get_parsed_methods(self):
+        """Return a dict of the categories of methods found by the last
+        call to `parse`.  These are plain Python objects which can be
+        pickled and restored later with `set_parsed_methods`.
+
+        """
+        return dict(toggle_meths=self.toggle_meths,
+                    state_meths=self.state_meths,
+                    get_set_meths=self.get_set_meths,
+                    get_meths=self.get_meths,
+                    other_meths=self.other_meths)
+
+    def set_parsed_methods(self, parsed):
+        """Set the categories of methods from a dict returned by
+        `get_parsed_methods`, instead of calling `parse`.
+
+        """
+        self._initialize()
+        for name, value in parsed.items():
+            setattr(self, name, value)
+
     @staticmethod
     def get_method_signature(method):
         """Returns information on the Python method signature given
@@ -570,7 +602,10 @@ class VTKMethodParser:
                 # We do not try to inspect viewers, because they'll
                 # trigger segfaults during the inspection
                 for key, values in sm.items():
-                    default = getattr(obj, 'Get%s'%key)()
+                    current = getattr(obj, 'Get%s'%key)()
+                    static = (klass_name, key) in self._static_states
+                    default = self._static_states.get((klass_name, key),
+                                                      current)
                     for x in values[:]:
                         try:
                             getattr(obj, 'Set%sTo%s'%(key, x[0]))()
@@ -586,6 +621,8 @@ class VTKMethodParser:
                             x[1] = val
                             if val == default:
                                 values.insert(0, [x[0], val])
+                    if static:
+                        getattr(obj, 'Set%s'%key)(current)
         return meths
 
     def _find_get_set_methods(self, klass, methods):
@@ -729,9 +766,12 @@ class VTKMethodParser:
         If the class is abstract, it uses the class tree to return an
         instantiable subclass.  This is necessary to get the values of
         the 'state' methods and the ranges for the Get/Set methods.
+        None is returned for the classes in `NO_INSTANCE_CLASSES`.
 
         """
         obj = None
+        if klass.__name__ in NO_INSTANCE_CLASSES:
+            return obj
         try:
             obj = klass()
         except (TypeError, NotImplementedError):
@@ -8,8 +8,10 @@ VTK classes.
 
 from __future__ import print_function
 
+import pickle
 import re
 import sys
+import time
 import vtk
 import textwrap
 import keyword
@@ -219,6 +221,12 @@ class WrapperGenerator:
         self.parser = vtk_parser.VTKMethodParser()
         self.special = special_gen.SpecialGenerator(self.indent)
         self.dm = indenter.VTKDocMassager()
+        # A dict of the pickled methods parsed for each VTK class name.
+        # If it is not None, the classes in it are not parsed again and
+        # the other classes are added to it.
+        self.parse_cache = None
+        # The total time spent parsing the VTK classes.
+        self.parse_time = 0.0
 
     #################################################################
     # `WrapperGenerator` interface.
@@ -347,9 +355,32 @@ class WrapperGenerator:
             '''%locals()
             out.write(indent.format(decl))
 
+    def _parse(self, klass):
+        """Parse the methods of the VTK class `klass` with the parser,
+        using `self.parse_cache` when it is set.
+        """
+        start = time.perf_counter()
+        cache = self.parse_cache
+        name = klass.__name__
+        if cache is not None and name in cache:
+            self.parser.set_parsed_methods(pickle.loads(cache[name]))
+        else:
+            self.parser.parse(klass)
+            if cache is not None:
+                try:
+                    cache[name] = pickle.dumps(
+                        self.parser.get_parsed_methods(),
+                        pickle.HIGHEST_PROTOCOL
+                    )
+                except (TypeError, pickle.PicklingError):
+                    # Some of the defaults are VTK objects which cannot
+                    # be pickled, these classes are always parsed.
+                    pass
+        self.parse_time += time.perf_counter() - start
+
     def _gen_methods(self, node, out):
         klass = self.get_tree().get_class(node.name)
-        self.parser.parse(klass)
+        self._parse(klass)
 
         if klass.__name__ == 'vtkCamera':
             # 'vtkCamera.Roll' has conflicting signatures --